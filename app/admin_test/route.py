@@ -1,7 +1,7 @@
 import random, asyncio
 from fastapi import APIRouter, HTTPException
 from app.utils.circuit_breaker import cb, CircuitBreakerError
-from app.utils.cb_utils import force_open, force_close, state
+from app.utils.cb_utils import force_open, force_close, metrics, state
 
 router = APIRouter(prefix="/cb")
 demo_cb = cb("demo")
@@ -23,6 +23,10 @@ async def call():
 async def get_state():
     return {"state": demo_cb.current_state.name}
 
+@router.get("/metrics")
+async def get_metrics():
+    return metrics("demo")
+
 @router.post("/open")
 async def open_it():
     force_open("demo")
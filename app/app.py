@@ -1,19 +1,77 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.default.route import router as DefaultRouter
 from app.user.route import router as UserRouter
 from app.admin_test.route import router as CbRouter
+from app.jobs.route import router as JobsRouter
+from app.ops.route import router as OpsRouter
+from app.settings import db
+from app.settings.caching import close_cache
+from app.settings.jobs import start_jobs, stop_jobs
+from app.settings.logging import setup_logging, stop_logging
 from app.settings.monitor import Monitor
 from app.settings.config import config
+from app.settings.ratelimiter import close_limiter
+from app.middlewares.admission import AdmissionMiddleware
 from app.middlewares.auth import TokenMiddleware
+from app.middlewares.metrics import MetricsMiddleware
+from app.middlewares.profiling import ProfilingMiddleware
+from app.middlewares.request_context import RequestContextMiddleware
+from app.migrations.associations import migrations
+from app.utils.breaker_state import start_shared_breakers, stop_shared_breakers
+from app.utils.cpu_pool import shutdown_cpu_pool
+from app.utils.fast_json import FastJSONResponse
+from app.utils.loop_monitor import start_loop_monitor, stop_loop_monitor
+from app.utils.metrics import start_metrics, stop_metrics
 
 monitor = Monitor()
 
-app = FastAPI(title=config.APP_NAME, version=config.APP_VERSION, description="Base FastAPI app")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # importing the app has no side effects: every subsystem is started here, per worker
+    setup_logging()
+    config.log_defaults()
+    monitor.start()
+    # a database that is down at boot must not crash-loop the worker: /ready reports it
+    try:
+        await db.warm_up()
+        await migrations()
+    except Exception as e:
+        logging.error("[DB] startup warm-up / migrations failed, continuing: %s", e)
+    await start_shared_breakers()
+    await start_metrics()
+    await start_loop_monitor()
+    await start_jobs()
+    yield
+    # running jobs finish (or go back to the queue) while their dependencies are still up
+    await stop_jobs()
+    await stop_loop_monitor()
+    await stop_metrics()
+    await stop_shared_breakers()
+    await close_limiter()
+    await close_cache()
+    db.close()
+    shutdown_cpu_pool()
+    stop_logging()
 
+app = FastAPI(title=config.APP_NAME, version=config.APP_VERSION, description="Base FastAPI app",
+              default_response_class=FastJSONResponse, lifespan=lifespan)
+
+# added first so it runs inside TokenMiddleware and sees the request's role
+app.add_middleware(AdmissionMiddleware)
+# inside TokenMiddleware too: only admins may start a profile; covers admission control and rate limiting
+app.add_middleware(ProfilingMiddleware)
 app.add_middleware(TokenMiddleware)
+# wraps auth and admission control, so their 401 / 503 responses are counted too
+app.add_middleware(MetricsMiddleware)
+# outermost: request id and latency cover the whole request
+app.add_middleware(RequestContextMiddleware)
 
 
 app.include_router(router=DefaultRouter, tags=["default"])
 app.include_router(router=UserRouter, tags=["user"])
+app.include_router(router=JobsRouter, tags=["jobs"])
 
 app.include_router(router=CbRouter, tags=["Test Routes"])
+app.include_router(router=OpsRouter, tags=["ops"])
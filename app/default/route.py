@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-import asyncio
-import time
+from fastapi.responses import FileResponse, Response
 import os
+from typing import Optional
+from app.jobs.tasks import slow_job
 from app.settings.ratelimiter import rate_limiter
 from app.settings.db import get_db
+from app.settings.jobs import jobs
+from app.utils.metrics import CONTENT_TYPE, render
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 
+# resolved from this file, so importing the app does not depend on the working directory
+_STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
 router = APIRouter()
-router.mount("/static", StaticFiles(directory="app/static"), name="static")
+router.mount("/static", StaticFiles(directory=_STATIC_DIR), name="static")
 
 
 @router.get("/health", dependencies=[Depends(rate_limiter)])
@@ -19,7 +24,7 @@ async def get_health():
 
 @router.get("/status")
 async def get_status():
-    index_file_path = os.path.join("app/static", "status.html")
+    index_file_path = os.path.join(_STATIC_DIR, "status.html")
     return FileResponse(index_file_path)
 
 @router.get("/ready")
@@ -34,13 +39,17 @@ async def ready(db: AsyncIOMotorDatabase = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=503, detail=str(e))
 
-async def slow_job(tag: str):
-    await asyncio.sleep(5)
-    print(f"[{tag}] finished at", time.time())
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint: request, cache, rate limiter, circuit breaker and
+    Mongo pool metrics of every worker on this host (see app/utils/metrics.py).
+    """
+    return Response(render(), media_type=CONTENT_TYPE)
 
 @router.get("/api/test")
-async def background_tasks(background: BackgroundTasks):
-    start = time.time()
-    background.add_task(slow_job, "Background Task 1")
-    return {"message":"This is background task"}
+async def background_tasks(idempotency_key: Optional[str] = Header(None)):
+    # runs on the job worker pool (app/jobs), not as part of this request
+    job = await jobs.enqueue(slow_job, "Background Task 1", idempotency_key=idempotency_key)
+    return {"message":"This is background task", "job_id": job["id"], "status": job["status"]}
 
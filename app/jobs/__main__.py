@@ -0,0 +1,46 @@
+"""
+Standalone job worker: runs the worker pool outside the API workers, so background
+work never competes with request handling and survives API worker recycling.
+
+    JOBS_STORAGE_TYPE=redis JOBS_RUN_IN_APP=false python -m app.jobs
+
+Runs JOBS_CONCURRENCY jobs at a time; start more processes to scale out. On SIGTERM
+it stops claiming jobs, waits JOBS_SHUTDOWN_GRACE_SECONDS for running ones and puts
+the rest back in the queue.
+"""
+
+import asyncio
+import logging
+import signal
+from app.settings import db
+from app.settings.config import config
+from app.settings.jobs import start_jobs, stop_jobs
+from app.settings.logging import setup_logging, stop_logging
+import app.jobs.tasks  # noqa: F401  registers the handlers
+
+
+async def main() -> None:
+    setup_logging()
+    config.log_defaults()
+    if config.JOBS_STORAGE_TYPE != "redis":
+        logging.error("[Jobs] JOBS_STORAGE_TYPE=%s is not shared between processes, use redis",
+                      config.JOBS_STORAGE_TYPE)
+        stop_logging()
+        return
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopped.set)
+
+    await start_jobs(in_app=False)
+    logging.info("[Jobs] worker started, concurrency %s", config.JOBS_CONCURRENCY)
+    await stopped.wait()
+    logging.info("[Jobs] worker stopping")
+    await stop_jobs()
+    db.close()
+    stop_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
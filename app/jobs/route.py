@@ -0,0 +1,16 @@
+from fastapi import APIRouter, HTTPException
+from app.settings.jobs import jobs
+
+router = APIRouter(prefix="/api/jobs")
+
+# args, kwargs and result may carry per-user data: any caller holding the id only sees these
+_PUBLIC_FIELDS = ("id", "status", "attempts", "error", "started_at", "finished_at")
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Status of a queued job: state, attempts so far, last error and run times."""
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {field: job[field] for field in _PUBLIC_FIELDS}
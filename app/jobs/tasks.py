@@ -0,0 +1,17 @@
+"""
+Job handlers. A handler is registered on the queue with `@jobs.task` and runs on
+the worker pool, in the API workers (JOBS_RUN_IN_APP) or in `python -m app.jobs`.
+Arguments and results are stored as JSON, and a handler may run more than once
+(retries, a lost worker): keep handlers idempotent.
+"""
+
+import asyncio
+import logging
+import time
+from app.settings.jobs import jobs
+
+
+@jobs.task
+async def slow_job(tag: str):
+    await asyncio.sleep(5)
+    logging.info("[%s] finished at %s", tag, time.time())
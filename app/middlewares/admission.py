@@ -0,0 +1,108 @@
+"""
+Adaptive admission control (load shedding) for FastAPI
+
+When a worker is overloaded, every request it accepts makes every other request
+slower. This middleware caps the number of requests in flight per worker and
+rejects the excess with `503` + `Retry-After` before routing, so the requests
+that are admitted keep their normal latency and clients / load balancers retry
+elsewhere or later. The cap is not a fixed number: it follows observed latency
+(see `app.utils.adaptive_limit.GradientLimit`).
+
+Requests from priority roles may use the whole limit. Everyone else is shed once
+in-flight requests reach `limit * (1 - ADMISSION_PRIORITY_RESERVE)`, so priority
+traffic still gets through while the rest is being shed. Without priority roles
+nothing is reserved.
+
+Environment Variables:
+    - ADMISSION_ENABLED: "true" / "false" (default "false").
+    - ADMISSION_INITIAL_LIMIT / ADMISSION_MIN_LIMIT / ADMISSION_MAX_LIMIT: bounds of the
+      per-worker concurrency limit (defaults 50 / 5 / 500).
+    - ADMISSION_PRIORITY_ROLES: Comma-separated roles that may use the reserved share.
+    - ADMISSION_PRIORITY_RESERVE: Share of the limit reserved for priority roles (default 0.2).
+    - ADMISSION_EXEMPT_PATHS: Paths never shed nor counted, `/prefix/*` allowed
+      (default "/health,/ready,/metrics,/ops/*").
+    - ADMISSION_RETRY_AFTER_SECONDS: `Retry-After` sent with a 503 (default 1).
+
+Usage:
+    Add `AdmissionMiddleware` before `TokenMiddleware` so it runs inside it and sees
+    the role set on the request state. Current limit, in-flight and shed counts are
+    served by `GET /ops/admission` (`admission_stats()`).
+"""
+
+import time
+from typing import Any, Dict
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.middlewares.auth import PathRules, string_to_list
+from app.settings.config import get_config
+from app.utils.adaptive_limit import GradientLimit
+
+config = get_config()
+
+# One limit per worker, shared by every request it serves
+limiter = GradientLimit(
+    initial=int(config.ADMISSION_INITIAL_LIMIT),
+    min_limit=int(config.ADMISSION_MIN_LIMIT),
+    max_limit=int(config.ADMISSION_MAX_LIMIT),
+)
+
+_counters = {"admitted": 0, "shed_priority": 0, "shed_normal": 0}
+
+
+class AdmissionMiddleware:
+    """
+    Middleware to shed requests beyond the adaptive concurrency limit.
+
+    Exempt paths are passed through untouched. Every other request either takes an
+    in-flight slot until its response is complete, or is answered with 503 at once.
+    The time to the start of the response is fed back into the limit.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.enabled = str(config.ADMISSION_ENABLED).lower() in ("true", "1", "yes")
+        self.exempt = PathRules(string_to_list(config.ADMISSION_EXEMPT_PATHS))
+        self.priority_roles = frozenset(role.strip() for role in string_to_list(config.ADMISSION_PRIORITY_ROLES) if role.strip())
+        # nothing to reserve for when no role has priority
+        self.normal_share = 1 - float(config.ADMISSION_PRIORITY_RESERVE) if self.priority_roles else 1.0
+        self.retry_after = str(config.ADMISSION_RETRY_AFTER_SECONDS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.enabled or self.exempt.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        role = scope.get("state", {}).get("role")
+        priority = isinstance(role, str) and role in self.priority_roles
+        limit = limiter.limit if priority else limiter.limit * self.normal_share
+        if limiter.in_flight >= limit:
+            _counters["shed_priority" if priority else "shed_normal"] += 1
+            await self._shed(scope, receive, send)
+            return
+
+        _counters["admitted"] += 1
+        limiter.in_flight += 1
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                limiter.observe(time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.in_flight -= 1
+
+    async def _shed(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            status_code=503,
+            content={"error": "Server is overloaded, retry later"},
+            headers={"Retry-After": self.retry_after},
+        )
+        await response(scope, receive, send)
+
+
+def admission_stats() -> Dict[str, Any]:
+    """Current limit, in-flight requests and admitted / shed counts of this worker."""
+    return {**limiter.stats(), **_counters}
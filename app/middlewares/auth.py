@@ -7,25 +7,90 @@ public key cryptography to verify token integrity and authorizes requests based
 Environment Variables:
     - public-key: RSA public key used to verify JWT tokens.
     - public-endpoints: Comma-separated list of routes that bypass authentication.
+                        An entry ending in `/*` (e.g. `/static/*`) matches every path below it.
     - ENVIRONMENT: Environment name (e.g., 'local' to bypass token validation during development).
     - roles: Comma-separated list of allowed roles for access.
+    - ADMIN_ROLES: Comma-separated roles allowed on admin-only routes (`require_admin`).
+    - AUTH_TOKEN_CACHE_SIZE: Max number of verified tokens kept in memory (0 disables the cache).
+    - AUTH_TOKEN_CACHE_MAX_TTL: Max seconds a verified token is trusted without re-verification.
+    - AUTH_DECODE_IN_THREAD: If "true", tokens missing from the cache are verified on the
+      bounded CPU pool (`app.utils.cpu_pool`) instead of on the event loop (default "false").
 
 Usage:
     Add `TokenMiddleware` to your FastAPI app's middleware stack to enforce token-based access control.
+
+    The middleware is a plain ASGI app: public paths and allowed roles are compiled once when
+    the middleware is built, public routes are passed through before any header is parsed, and
+    responses (including streaming ones) are never wrapped.
 """
 
 import logging
-from fastapi import Request
+from typing import Iterable
+from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from jose import JWTError
-from starlette.middleware.base import BaseHTTPMiddleware
 from jose.jwt import decode
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.settings.config import get_config
+from app.utils.cpu_pool import run_cpu_bound
+from app.utils.token_cache import TokenCache
 
 config = get_config()
+logger = logging.getLogger(__name__)
+
+# Verified tokens, so repeated requests with the same token skip the RS256 check
+token_cache = TokenCache(
+    maxsize=int(config.AUTH_TOKEN_CACHE_SIZE),
+    max_ttl=int(config.AUTH_TOKEN_CACHE_MAX_TTL),
+)
+
+_BEARER = "Bearer "
+_PREFIX_END = object()  # marks the end of a `/prefix/*` rule in the trie
+
+
+class PathRules:
+    """
+    Precompiled public endpoint rules.
+
+    Exact paths live in a frozenset; `/prefix/*` entries are stored in a trie keyed by
+    path segment, so a lookup costs one set probe plus at most one step per segment.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        exact = set()
+        self._trie: dict = {}
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern:
+                continue
+            if pattern.endswith("*"):
+                node = self._trie
+                for segment in _segments(pattern.rstrip("*")):
+                    node = node.setdefault(segment, {})
+                node[_PREFIX_END] = True
+            else:
+                exact.add(pattern)
+        self.exact = frozenset(exact)
+
+    def match(self, path: str) -> bool:
+        if path in self.exact:
+            return True
+        node = self._trie
+        if not node:
+            return False
+        if _PREFIX_END in node:
+            return True
+        for segment in _segments(path):
+            node = node.get(segment)
+            if node is None:
+                return False
+            if _PREFIX_END in node:
+                return True
+        return False
+
 
 # Middleware class to handle JWT validation for all incoming requests
-class TokenMiddleware(BaseHTTPMiddleware): 
+class TokenMiddleware:
     """
     Middleware to enforce JWT-based authentication and role-based authorization.
 
@@ -33,71 +98,121 @@ class TokenMiddleware(BaseHTTPMiddleware):
     Authorization header, and verifies it using the public key. It sets user-specific
     attributes (e.g., role, user_id) on the request state for downstream access.
     """
-    
-    async def dispatch(self, request: Request, call_next):
-        
-        public_endpoints = config.public_endpoints  # Add your public endpoint(s) here
-        public_endpoints = string_to_list(public_endpoints)
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.public_endpoints = PathRules(string_to_list(config.public_endpoints))
+        self.roles = frozenset(role.strip() for role in string_to_list(config.ROLES))
+        self.local = config.ENVIRONMENT.lower() == "local"
+        self.decode_in_thread = str(config.AUTH_DECODE_IN_THREAD).lower() in ("true", "1", "yes")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
         # Check if the request path is one of the public endpoints
-        if request.url.path in public_endpoints:
+        if self.public_endpoints.match(scope["path"]):
             # Skip token validation for this route
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
 
         # Allow local development to bypass token validation
-        if config.ENVIRONMENT.lower() == "local":
+        if self.local:
             # Set a default role for local development
-            request.state.role = "local-user"
-            response = await call_next(request)
-            return response
+            state["role"] = "local-user"
+            await self.app(scope, receive, send)
+            return
 
         # Get the token from the Authorization header (Bearer token)
-        authorization = request.headers.get("Authorization")
-        
+        authorization = _get_header(scope, b"authorization")
+
         if not authorization:
-            return JSONResponse(status_code=401, content={"error": "Token is missing"})
-        
-        if not authorization.startswith("Bearer "):
-            return JSONResponse(status_code=401, content={"error": "Invalid token format"})
+            await _reject(scope, receive, send, "Token is missing")
+            return
 
-        token = authorization[len("Bearer "):]
+        if not authorization.startswith(_BEARER):
+            await _reject(scope, receive, send, "Invalid token format")
+            return
+
+        token = authorization[len(_BEARER):]
 
         # Decode and validate the token directly inside the middleware
         try:
-            # Load the public key from environment variables
-            public_key = config.public_key
+            claims = token_cache.get(token)
+
+            if claims is None:
+                # Decode the JWT token using the public key (RS256 algorithm)
+                if self.decode_in_thread:
+                    # RS256 verification is CPU work: keep it off the event loop
+                    payload = await run_cpu_bound(decode, token, config.public_key, algorithms=["RS256"])
+                else:
+                    payload = decode(token, config.public_key, algorithms=["RS256"])
+
+                claims = {
+                    "role": payload.get("extension_Roles"),
+                    "user_id": payload.get("user_id"),
+                }
+                token_cache.set(token, claims, payload.get("exp"))
 
-            # Decode the JWT token using the public key (RS256 algorithm)
-            payload = decode(token, public_key, algorithms=["RS256"])
+        except JWTError as e:
+            logger.error("%s", e)
+            await _reject(scope, receive, send, f"Token decode error: {str(e)}")
+            return
 
-            role = payload.get("extension_Roles")
+        role = claims["role"]
+        user_id = claims["user_id"]
 
-            user_id = payload.get("user_id")
+        # a claim sent as a JSON array is not a role (and is unhashable)
+        if not isinstance(role, str) or role not in self.roles:
+            await _reject(scope, receive, send, "You are not allowed to use this API")
+            return
 
-            roles = config.roles
-            
-            roles = string_to_list(roles)
+        logger.debug("successfully verified token")
 
-            if role not in roles:
-                return JSONResponse(status_code=401, content={"error": "You are not allowed to use this API"})
-            
-            logging.info(f"successfully verified token")
-            
-            if role:
-                request.state.role = role
-                
-            if user_id:
-                request.state.user_id = user_id
+        if role:
+            state["role"] = role
+
+        if user_id:
+            state["user_id"] = user_id
+
+        await self.app(scope, receive, send)
+
+
+def _get_header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _reject(scope: Scope, receive: Receive, send: Send, error: str) -> None:
+    response = JSONResponse(status_code=401, content={"error": error})
+    await response(scope, receive, send)
+
+
+def _segments(path: str) -> list:
+    path = path.strip("/")
+    return path.split("/") if path else []
 
-        except JWTError as e:
-            logging.error(str(e))
-            return JSONResponse(status_code=401, content={"error": f"Token decode error: {str(e)}"})
 
-        response = await call_next(request)
-        return response
-    
 def string_to_list(string):
     if isinstance(string, str):
         return string.split(",")
-    return string
\ No newline at end of file
+    return string
+
+
+_ADMIN_ROLES = frozenset(role.strip() for role in string_to_list(config.ADMIN_ROLES) if role.strip())
+
+
+def is_admin(role: str | None) -> bool:
+    """True for one of ADMIN_ROLES; local development (no token validation) counts as admin."""
+    return (isinstance(role, str) and role in _ADMIN_ROLES) or config.ENVIRONMENT.lower() == "local"
+
+
+async def require_admin(request: Request):
+    """Route dependency: 403 unless the authenticated role is one of ADMIN_ROLES."""
+    if not is_admin(getattr(request.state, "role", None)):
+        raise HTTPException(status_code=403, detail="Admin role required")
\ No newline at end of file
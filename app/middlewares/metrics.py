@@ -0,0 +1,74 @@
+"""
+HTTP Metrics Middleware for FastAPI
+
+Counts every request by method, route template and status, and records its
+latency in a fixed-bucket histogram (`app.utils.metrics`). Routes are labelled
+by their template (`/api/user/{id}`), never by the raw path, so the number of
+series stays bounded; requests answered before routing (401, 503 from load
+shedding, 404) are labelled `unmatched`. Methods outside the standard set
+are labelled `other` for the same reason.
+
+Environment Variables:
+    - METRICS_ENABLED: If "false", requests pass through uninstrumented (default "true").
+    - METRICS_LATENCY_BUCKETS: Histogram buckets in seconds.
+
+Usage:
+    Add `MetricsMiddleware` after every middleware that can answer a request on its
+    own (auth, admission control), so those responses are counted too. Metrics are
+    served by `GET /metrics`.
+"""
+
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.settings.config import get_config
+from app.utils.metrics import Counter, Gauge, Histogram
+
+config = get_config()
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by method, route template and status.",
+                   ("method", "route", "status"))
+LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency in seconds, until the response is complete.",
+                    ("method", "route"))
+IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served.")
+
+_UNMATCHED = "unmatched"
+_OTHER_METHOD = "other"
+_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+class MetricsMiddleware:
+    """
+    Middleware to count requests and observe their latency per route template.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.enabled = str(config.METRICS_ENABLED).lower() in ("true", "1", "yes")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        in_progress = IN_PROGRESS.labels()
+        in_progress.inc()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            # set by the router once the request matched a route
+            route = scope.get("route")
+            path = getattr(route, "path", _UNMATCHED) if route is not None else _UNMATCHED
+            method = scope["method"] if scope["method"] in _METHODS else _OTHER_METHOD
+            REQUESTS.labels(method, path, status).inc()
+            LATENCY.labels(method, path).observe(elapsed)
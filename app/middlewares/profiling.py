@@ -0,0 +1,124 @@
+"""
+Request Profiling Middleware for FastAPI
+
+Captures where the time of individual requests goes, without a redeploy, using
+the sampling profiler in `app.utils.profiler`:
+
+- on demand: a request sent with the `X-Profile` header by an admin role is
+  sampled; its response carries `X-Profile-Id` (the request id)
+- slow requests: with PROFILER_SLOW_REQUEST_MS set, every request is sampled and
+  the stacks of those slower than the threshold are kept
+
+Captured requests are kept in memory (the last PROFILER_MAX_CAPTURES, per worker)
+and served by the admin-only `GET /ops/profile/requests` routes as collapsed stacks.
+Samples taken while the request waits (I/O, other requests) are counted as `<waiting>`.
+The header of a non-admin request is ignored: it never starts the sampler.
+
+Environment Variables:
+    - PROFILER_HEADER: Request header that asks for a profile (default "X-Profile").
+    - PROFILER_SLOW_REQUEST_MS: Keep the profile of every request slower than this,
+      0 disables (default 0).
+    - PROFILER_MAX_CAPTURES: Captured requests kept per worker (default 20).
+    - ADMIN_ROLES: Roles allowed to trigger a profile with the header.
+
+Usage:
+    Add `ProfilingMiddleware` inside `TokenMiddleware` (and `RequestContextMiddleware`),
+    so the role and request id are set before sampling starts. The time spent in
+    admission control and rate limiting is included, token verification is not.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.middlewares.auth import is_admin
+from app.settings.config import get_config
+from app.settings.logging import request_id
+from app.utils.profiler import collapsed, unwatch, watch
+
+config = get_config()
+
+# at most this many header-triggered requests are sampled at once
+_MAX_ON_DEMAND = 8
+_ID_HEADER = b"x-profile-id"
+
+captures: Deque[Dict[str, Any]] = deque(maxlen=int(config.PROFILER_MAX_CAPTURES))
+_on_demand = 0
+
+
+class ProfilingMiddleware:
+    """
+    Middleware to sample requests asked for with the profiling header, or all requests
+    when slow-request capture is enabled, and keep the profiles worth keeping.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.header = config.PROFILER_HEADER.lower().encode("latin-1")
+        self.slow = float(config.PROFILER_SLOW_REQUEST_MS) / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        global _on_demand
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = request_id.get()
+        # auth has run: only an admin's header takes one of the on-demand slots
+        requested = (
+            _on_demand < _MAX_ON_DEMAND
+            and rid is not None
+            and any(key == self.header for key, _ in scope["headers"])
+            and is_admin(scope.get("state", {}).get("role"))
+        )
+        if not requested and not self.slow:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        if requested:
+            _on_demand += 1
+        watched = watch(asyncio.current_task())
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if requested:
+                    message["headers"] = [*message.get("headers", ()), (_ID_HEADER, rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            unwatch(watched)
+            if requested:
+                _on_demand -= 1
+            latency = time.perf_counter() - watched.started
+            reason = "requested" if requested else "slow" if self.slow and latency >= self.slow else None
+            if reason is not None:
+                captures.append({
+                    "request_id": rid,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "latency_ms": round(latency * 1000, 3),
+                    "reason": reason,
+                    "samples": watched.samples,
+                    "at": time.time(),
+                    "stacks": watched.stacks,
+                })
+
+
+def list_captures() -> List[Dict[str, Any]]:
+    """Captured requests of this worker, newest first, without their stacks."""
+    return [{key: value for key, value in capture.items() if key != "stacks"} for capture in reversed(captures)]
+
+
+def capture_stacks(rid: str) -> Optional[str]:
+    """Collapsed stacks of the captured request `rid`, or None."""
+    for capture in captures:
+        if capture["request_id"] == rid:
+            return collapsed(capture["stacks"])
+    return None
@@ -0,0 +1,73 @@
+"""
+Request Context Middleware for FastAPI
+
+Gives every request an id and a start time, so every log record written while
+the request is served carries `request_id` and `latency_ms`
+(see `app.settings.logging`). The id is taken from the incoming `X-Request-ID`
+header when present, otherwise generated, and is echoed in the response.
+
+Environment Variables:
+    - LOG_ACCESS: If "true"/"1"/"yes", log one `app.access` record per request with
+                  method, path, status and latency (default "false").
+
+Usage:
+    Add `RequestContextMiddleware` last, so it wraps every other middleware and the
+    latency covers the whole request, rejected ones included.
+"""
+
+import logging
+import os
+import time
+import uuid
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.settings.logging import request_id, request_started
+
+access_logger = logging.getLogger("app.access")
+
+_HEADER = b"x-request-id"
+_MAX_ID_LENGTH = 128
+
+
+class RequestContextMiddleware:
+    """
+    Middleware to set the request id / start time context variables for each request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.access_log = os.getenv("LOG_ACCESS", "False").lower() in ("true", "1", "yes")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = _incoming_id(scope) or uuid.uuid4().hex
+        started = time.perf_counter()
+        id_token = request_id.set(rid)
+        started_token = request_started.set(started)
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", ()), (_HEADER, rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if self.access_log and access_logger.isEnabledFor(logging.INFO):
+                access_logger.info("%s %s %d", scope["method"], scope["path"], status,
+                                   extra={"method": scope["method"], "path": scope["path"], "status": status})
+            request_id.reset(id_token)
+            request_started.reset(started_token)
+
+
+def _incoming_id(scope: Scope) -> str | None:
+    for key, value in scope["headers"]:
+        if key == _HEADER:
+            value = value.decode("latin-1")
+            return value if 0 < len(value) <= _MAX_ID_LENGTH else None
+    return None
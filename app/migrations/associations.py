@@ -1,6 +1,5 @@
 from app.settings.db import get_db
 
-db = get_db()
-
 async def migrations():
+    db = get_db()
     await db.users.create_index("id", unique=True)
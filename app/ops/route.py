@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.middlewares.admission import admission_stats
+from app.middlewares.auth import require_admin
+from app.middlewares.profiling import capture_stacks, list_captures
+from app.settings.config import config
+from app.settings.db import pool_stats
+from app.settings.jobs import jobs_stats
+from app.settings.logging import logging_stats
+from app.utils.batch_loader import loader_stats
+from app.utils.loop_monitor import loop_monitor
+from app.utils.profiler import collapsed, profile, sampler_stats
+from app.utils.write_coalescer import writer_stats
+
+# every ops route exposes worker internals: admins only
+router = APIRouter(prefix="/ops", dependencies=[Depends(require_admin)])
+
+_PROFILE_MAX_SECONDS = float(config.PROFILER_MAX_SECONDS)
+
+@router.get("/db/pool")
+async def get_pool_stats():
+    """Mongo connection pool counters, to size MONGODB_MAX_POOL_SIZE from data."""
+    return {
+        "pool": pool_stats.stats(),
+        "loaders": loader_stats(),
+        "writers": writer_stats(),
+    }
+
+
+@router.get("/admission")
+async def get_admission_stats():
+    """Adaptive concurrency limit, requests in flight and shed counts of the serving worker."""
+    return admission_stats()
+
+
+@router.get("/logging")
+async def get_logging_stats():
+    """Log records waiting for the logging thread, and those dropped, sampled out or rate-limited."""
+    return logging_stats()
+
+
+@router.get("/jobs")
+async def get_jobs_stats():
+    """Jobs waiting and running in the job store, and the outcomes of the serving worker's pool."""
+    return await jobs_stats()
+
+
+@router.get("/loop")
+async def get_loop_stats():
+    """Event loop lag percentiles of the serving worker and the stacks of its recent stalls."""
+    return {**loop_monitor.stats(), "recent_stalls": loop_monitor.recent_stalls()}
+
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def get_profile(
+    seconds: float = Query(10, gt=0, le=_PROFILE_MAX_SECONDS),
+    threads: str = Query("loop", pattern="^(loop|all)$"),
+):
+    """
+    Sample the serving worker for `seconds` and return collapsed stacks
+    (flamegraph.pl / speedscope input). `threads=all` adds every other thread.
+    """
+    return collapsed(await profile(seconds, all_threads=threads == "all"))
+
+
+@router.get("/profile/requests")
+async def get_profiled_requests():
+    """Requests profiled on demand (profiling header) or for being slow, newest first."""
+    return {"sampler": sampler_stats(), "requests": list_captures()}
+
+
+@router.get("/profile/requests/{request_id}", response_class=PlainTextResponse)
+async def get_profiled_request(request_id: str):
+    """Collapsed stacks of one profiled request."""
+    stacks = capture_stacks(request_id)
+    if stacks is None:
+        raise HTTPException(status_code=404, detail="No profile for this request on this worker")
+    return stacks
@@ -1,15 +1,46 @@
 from app.settings.config import config
-from cachetools import TTLCache
 from redis.asyncio import from_url
+from app.utils.async_cache import MemoryTTLCache
+from app.utils.codecs import CacheCodec
 from app.utils.redis_cache import AsyncRedisTTLCache
+from app.utils.tiered_cache import TieredCache
 
 
+_policy = dict(
+    stale_ttl=int(config.CACHING_STALE_TIME_IN_SECONDS),
+    early_expiry_beta=float(config.CACHING_EARLY_EXPIRY_BETA),
+)
+
+if config.CACHING_STORAGE_TYPE in ("redis", "tiered"):
+    codec = CacheCodec(
+        codec=config.CACHING_CODEC,
+        compression=config.CACHING_COMPRESSION,
+        threshold=int(config.CACHING_COMPRESSION_THRESHOLD_BYTES),
+    )
+    redis = from_url(config.REDIS_URL)
 
 if config.CACHING_STORAGE_TYPE == "redis":
-    redis = from_url(config.REDIS_URL, encoding="utf8", decode_responses=True)
-    cache = AsyncRedisTTLCache(redis, ttl=int(config.CACHING_EXPIRY_TIME_IN_SECONDS))
+    cache = AsyncRedisTTLCache(redis, ttl=int(config.CACHING_EXPIRY_TIME_IN_SECONDS), codec=codec, **_policy)
+elif config.CACHING_STORAGE_TYPE == "tiered":
+    cache = TieredCache(
+        redis,
+        ttl=int(config.CACHING_EXPIRY_TIME_IN_SECONDS),
+        l1_maxsize=int(config.CACHING_L1_LIMIT),
+        l1_ttl=int(config.CACHING_L1_EXPIRY_TIME_IN_SECONDS),
+        channel=config.CACHING_INVALIDATION_CHANNEL,
+        codec=codec,
+        **_policy,
+    )
 else:
-    cache = TTLCache(
+    cache = MemoryTTLCache(
         maxsize=int(config.CACHING_LIMIT),
         ttl=int(config.CACHING_EXPIRY_TIME_IN_SECONDS),
+        **_policy,
     )
+
+async def close_cache() -> None:
+    """Stop the invalidation listener and close the Redis client (called from the app lifespan)."""
+    if isinstance(cache, TieredCache):
+        await cache.close()
+    if config.CACHING_STORAGE_TYPE in ("redis", "tiered"):
+        await redis.aclose()
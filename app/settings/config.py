@@ -1,12 +1,13 @@
 import os
-from app.settings.logging import logger
-from typing import Any
+import logging
+from typing import Any, List
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Config:
     def __init__(self)->None:
+        self._defaulted: List[str] = []
 
         self.APP_NAME = self._get("APP_NAME", default="fastAPI App")
         self.APP_VERSION = self._get("APP_VERSION", default="0.0.1")
@@ -14,11 +15,31 @@ class Config:
         self.RATE_LIMIT_REQUESTS_COUNT = self._get("RATE_LIMIT_REQUESTS_COUNT", default=40)
         self.RATE_LIMIT_REQUESTS_TIME_IN_SECONDS = self._get("RATE_LIMIT_REQUESTS_TIME_IN_SECONDS", default=60)
         self.RATE_LIMIT_REQUESTS_STORAGE_TYPE = self._get("RATE_LIMIT_REQUESTS_STORAGE_TYPE", default="memory")
+        self.RATE_LIMIT_STRATEGY = self._get("RATE_LIMIT_STRATEGY", default="sliding_window")
+        self.RATE_LIMIT_MEMORY_SHARDS = self._get("RATE_LIMIT_MEMORY_SHARDS", default=16)
+        self.RATE_LIMIT_MAX_TRACKED_KEYS = self._get("RATE_LIMIT_MAX_TRACKED_KEYS", default=100000)
+        self.RATE_LIMIT_USER_REQUESTS_COUNT = self._get("RATE_LIMIT_USER_REQUESTS_COUNT", default=0)
+        self.RATE_LIMIT_ROUTE_REQUESTS_COUNT = self._get("RATE_LIMIT_ROUTE_REQUESTS_COUNT", default=0)
+        self.RATE_LIMIT_FAIL_MODE = self._get("RATE_LIMIT_FAIL_MODE", default="open")
+        self.RATE_LIMIT_BATCH_WINDOW_MS = self._get("RATE_LIMIT_BATCH_WINDOW_MS", default=0)
+        self.RATE_LIMIT_REDIS_TIMEOUT_MS = self._get("RATE_LIMIT_REDIS_TIMEOUT_MS", default=200)
+        self.RATE_LIMIT_SHM_PATH = self._get("RATE_LIMIT_SHM_PATH", default="")
+        self.RATE_LIMIT_SHM_SLOTS = self._get("RATE_LIMIT_SHM_SLOTS", default=65536)
+        self.RATE_LIMIT_SHM_STRIPES = self._get("RATE_LIMIT_SHM_STRIPES", default=64)
         self.REDIS_URL = self._get("REDIS_URL", default="")
 
         self.CACHING_LIMIT = self._get("CACHING_LIMIT", default=1024)
         self.CACHING_EXPIRY_TIME_IN_SECONDS = self._get("CACHING_EXPIRY_TIME_IN_SECONDS", default=60)
         self.CACHING_STORAGE_TYPE = self._get("CACHING_STORAGE_TYPE", default="memory")
+        self.CACHING_NEGATIVE_EXPIRY_TIME_IN_SECONDS = self._get("CACHING_NEGATIVE_EXPIRY_TIME_IN_SECONDS", default=5)
+        self.CACHING_L1_LIMIT = self._get("CACHING_L1_LIMIT", default=256)
+        self.CACHING_L1_EXPIRY_TIME_IN_SECONDS = self._get("CACHING_L1_EXPIRY_TIME_IN_SECONDS", default=5)
+        self.CACHING_INVALIDATION_CHANNEL = self._get("CACHING_INVALIDATION_CHANNEL", default="acache:invalidate")
+        self.CACHING_STALE_TIME_IN_SECONDS = self._get("CACHING_STALE_TIME_IN_SECONDS", default=0)
+        self.CACHING_EARLY_EXPIRY_BETA = self._get("CACHING_EARLY_EXPIRY_BETA", default=0)
+        self.CACHING_CODEC = self._get("CACHING_CODEC", default="msgpack")
+        self.CACHING_COMPRESSION = self._get("CACHING_COMPRESSION", default="none")
+        self.CACHING_COMPRESSION_THRESHOLD_BYTES = self._get("CACHING_COMPRESSION_THRESHOLD_BYTES", default=1024)
 
         self.NEW_RELIC_APP_NAME = self._get("NEW_RELIC_APP_NAME", default=self.APP_NAME)
         self.NEW_RELIC_LICENSE_KEY = self._get("NEW_RELIC_LICENSE_KEY")
@@ -30,14 +51,80 @@ class Config:
         self.MONGODB_CONNECTION_TIMEOUT_MS = self._get("MONGODB_CONNECTION_TIMEOUT_MS", default=30000)
         self.MONGODB_NAME = self._get("MONGODB_NAME")
 
+        self.USER_BULK_MAX_ITEMS = self._get("USER_BULK_MAX_ITEMS", default=1000)
+        self.USER_BATCH_GET_MAX_IDS = self._get("USER_BATCH_GET_MAX_IDS", default=100)
+        self.USER_PAGE_DEFAULT_LIMIT = self._get("USER_PAGE_DEFAULT_LIMIT", default=50)
+        self.USER_PAGE_MAX_LIMIT = self._get("USER_PAGE_MAX_LIMIT", default=500)
+        self.USER_EXPORT_BATCH_SIZE = self._get("USER_EXPORT_BATCH_SIZE", default=500)
+        self.LOADER_WINDOW_MS = self._get("LOADER_WINDOW_MS", default=0)
+        self.LOADER_MAX_BATCH_SIZE = self._get("LOADER_MAX_BATCH_SIZE", default=100)
+        self.WRITE_COALESCING_ENABLED = self._get("WRITE_COALESCING_ENABLED", default="false")
+        self.WRITE_COALESCING_WINDOW_MS = self._get("WRITE_COALESCING_WINDOW_MS", default=5)
+        self.WRITE_COALESCING_MAX_DOCS = self._get("WRITE_COALESCING_MAX_DOCS", default=100)
+        self.WRITE_COALESCING_WRITE_CONCERN = self._get("WRITE_COALESCING_WRITE_CONCERN", default="")
+
         self.public_key = self._get("public-key", default="")
         self.public_endpoints = self._get("public_endpoints", default="/,/docs,/health,/status")
         self.ENVIRONMENT = self._get("ENVIRONMENT", default="local")
         self.ROLES = self._get("ROLES")
+        self.AUTH_TOKEN_CACHE_SIZE = self._get("AUTH_TOKEN_CACHE_SIZE", default=10000)
+        self.AUTH_TOKEN_CACHE_MAX_TTL = self._get("AUTH_TOKEN_CACHE_MAX_TTL", default=300)
+        self.ADMIN_ROLES = self._get("ADMIN_ROLES", default="admin")
+        self.AUTH_DECODE_IN_THREAD = self._get("AUTH_DECODE_IN_THREAD", default="false")
+        self.CPU_POOL_THREADS = self._get("CPU_POOL_THREADS", default=2)
+
+        self.ADMISSION_ENABLED = self._get("ADMISSION_ENABLED", default="false")
+        self.ADMISSION_INITIAL_LIMIT = self._get("ADMISSION_INITIAL_LIMIT", default=50)
+        self.ADMISSION_MIN_LIMIT = self._get("ADMISSION_MIN_LIMIT", default=5)
+        self.ADMISSION_MAX_LIMIT = self._get("ADMISSION_MAX_LIMIT", default=500)
+        self.ADMISSION_PRIORITY_ROLES = self._get("ADMISSION_PRIORITY_ROLES", default="")
+        self.ADMISSION_PRIORITY_RESERVE = self._get("ADMISSION_PRIORITY_RESERVE", default=0.2)
+        self.ADMISSION_EXEMPT_PATHS = self._get("ADMISSION_EXEMPT_PATHS", default="/health,/ready,/metrics,/ops/*")
+        self.ADMISSION_RETRY_AFTER_SECONDS = self._get("ADMISSION_RETRY_AFTER_SECONDS", default=1)
+
+        self.METRICS_ENABLED = self._get("METRICS_ENABLED", default="true")
+        self.METRICS_MULTIPROC_DIR = self._get("METRICS_MULTIPROC_DIR", default="")
+        self.METRICS_COLLECT_INTERVAL_SECONDS = self._get("METRICS_COLLECT_INTERVAL_SECONDS", default=5)
+        self.METRICS_LATENCY_BUCKETS = self._get("METRICS_LATENCY_BUCKETS", default="0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10")
+
+        self.PROFILER_INTERVAL_MS = self._get("PROFILER_INTERVAL_MS", default=5)
+        self.PROFILER_MAX_SECONDS = self._get("PROFILER_MAX_SECONDS", default=60)
+        self.PROFILER_HEADER = self._get("PROFILER_HEADER", default="X-Profile")
+        self.PROFILER_SLOW_REQUEST_MS = self._get("PROFILER_SLOW_REQUEST_MS", default=0)
+        self.PROFILER_MAX_CAPTURES = self._get("PROFILER_MAX_CAPTURES", default=20)
+
+        self.LOOP_MONITOR_ENABLED = self._get("LOOP_MONITOR_ENABLED", default="true")
+        self.LOOP_MONITOR_INTERVAL_MS = self._get("LOOP_MONITOR_INTERVAL_MS", default=100)
+        self.LOOP_STALL_THRESHOLD_MS = self._get("LOOP_STALL_THRESHOLD_MS", default=200)
+        self.LOOP_STALL_MAX_CAPTURES = self._get("LOOP_STALL_MAX_CAPTURES", default=20)
 
         self.CIRCUIT_BREAKER_FAIL_MAX_COUNT = self._get("CIRCUIT_BREAKER_FAIL_MAX_COUNT", default=3)
         self.CIRCUIT_BREAKER_RESET_TIMEOUT = self._get("CIRCUIT_BREAKER_RESET_TIMEOUT", default=30)
         self.CIRCUIT_BREAKER_PREFIX_NAME = self._get("CIRCUIT_BREAKER_PREFIX_NAME", default="cb")
+        self.CIRCUIT_BREAKER_WINDOW_SECONDS = self._get("CIRCUIT_BREAKER_WINDOW_SECONDS", default=60)
+        self.CIRCUIT_BREAKER_WINDOW_BUCKETS = self._get("CIRCUIT_BREAKER_WINDOW_BUCKETS", default=10)
+        self.CIRCUIT_BREAKER_FAILURE_RATE = self._get("CIRCUIT_BREAKER_FAILURE_RATE", default=0.5)
+        self.CIRCUIT_BREAKER_SLOW_CALL_SECONDS = self._get("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", default=0)
+        self.CIRCUIT_BREAKER_SLOW_CALL_RATE = self._get("CIRCUIT_BREAKER_SLOW_CALL_RATE", default=1.0)
+        self.CIRCUIT_BREAKER_HALF_OPEN_CALLS = self._get("CIRCUIT_BREAKER_HALF_OPEN_CALLS", default=1)
+        self.CIRCUIT_BREAKER_SHARED_STATE = self._get("CIRCUIT_BREAKER_SHARED_STATE", default="")
+        self.CIRCUIT_BREAKER_CHANNEL = self._get("CIRCUIT_BREAKER_CHANNEL", default="cb:state")
+
+        self.BULKHEAD_MAX_CONCURRENT = self._get("BULKHEAD_MAX_CONCURRENT", default=10)
+        self.BULKHEAD_MAX_QUEUE = self._get("BULKHEAD_MAX_QUEUE", default=20)
+        self.BULKHEAD_QUEUE_TIMEOUT_SECONDS = self._get("BULKHEAD_QUEUE_TIMEOUT_SECONDS", default=1)
+
+        self.JOBS_STORAGE_TYPE = self._get("JOBS_STORAGE_TYPE", default="memory")
+        self.JOBS_KEY_PREFIX = self._get("JOBS_KEY_PREFIX", default="jobs")
+        self.JOBS_RUN_IN_APP = self._get("JOBS_RUN_IN_APP", default="true")
+        self.JOBS_CONCURRENCY = self._get("JOBS_CONCURRENCY", default=4)
+        self.JOBS_POLL_INTERVAL_MS = self._get("JOBS_POLL_INTERVAL_MS", default=500)
+        self.JOBS_MAX_ATTEMPTS = self._get("JOBS_MAX_ATTEMPTS", default=3)
+        self.JOBS_RETRY_BASE_DELAY_SECONDS = self._get("JOBS_RETRY_BASE_DELAY_SECONDS", default=1)
+        self.JOBS_RETRY_MAX_DELAY_SECONDS = self._get("JOBS_RETRY_MAX_DELAY_SECONDS", default=60)
+        self.JOBS_TIMEOUT_SECONDS = self._get("JOBS_TIMEOUT_SECONDS", default=300)
+        self.JOBS_RESULT_TTL_SECONDS = self._get("JOBS_RESULT_TTL_SECONDS", default=86400)
+        self.JOBS_SHUTDOWN_GRACE_SECONDS = self._get("JOBS_SHUTDOWN_GRACE_SECONDS", default=10)
 
 
 
@@ -46,9 +133,19 @@ class Config:
         value = os.getenv(key)
         if value is None:
             if default is not None:
-                logger.warning("[Config] Environment Variable '%s' not set, using default: '%s'", key, default)
+                self._defaulted.append(key)
                 return default
             raise EnvironmentError(f"Missing required Environment Variable: '{key}'")
         return value
+
+    def log_defaults(self) -> None:
+        """One summary line for every variable that fell back to its default (logged at startup)."""
+        if self._defaulted:
+            logging.warning("[Config] %d Environment Variables not set, using defaults: %s",
+                            len(self._defaulted), ", ".join(self._defaulted))
     
 config = Config()
+
+
+def get_config() -> Config:
+    return config
@@ -1,20 +1,136 @@
-import atexit
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
 from app.settings.config import config
+from app.utils.batch_loader import reset_loaders
+from app.utils.write_coalescer import reset_writers
 
 _config = config
 
-_client: AsyncIOMotorClient = AsyncIOMotorClient(
-    _config.MONGODB_CONNECTION_STRING,
-    maxPoolSize=int(_config.MONGODB_MAX_POOL_SIZE),
-    minPoolSize=int(_config.MONGODB_MIN_POOL_SIZE),
-    serverSelectionTimeoutMS=int(_config.MONGODB_CONNECTION_TIMEOUT_MS)
-)
 
-# 2. close pool automatically when the process exits
-atexit.register(_client.close)
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters from pymongo's CMAP monitoring events, used to size
+    MONGODB_MAX_POOL_SIZE from data. Events arrive on driver threads, hence the lock.
+    """
 
-# 3. FastAPI dependency
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.checked_out_max = 0
+        self.waiting = 0
+        self.waiting_max = 0
+        self.check_outs = 0
+        self.check_out_failures = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.pool_clears = 0
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+            self.waiting_max = max(self.waiting_max, self.waiting)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+            self.checked_out_max = max(self.checked_out_max, self.checked_out)
+            self.check_outs += 1
+            wait = event.duration or 0.0
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.check_out_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    # the listener interface requires every event; these carry nothing we count
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    # expose for introspection
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "max_pool_size": int(_config.MONGODB_MAX_POOL_SIZE),
+                "min_pool_size": int(_config.MONGODB_MIN_POOL_SIZE),
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "checked_out_max": self.checked_out_max,
+                "wait_queue": self.waiting,
+                "wait_queue_max": self.waiting_max,
+                "check_outs": self.check_outs,
+                "check_out_failures": self.check_out_failures,
+                "avg_wait_ms": round(self.wait_total / self.check_outs * 1000, 3) if self.check_outs else 0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+                "pool_clears": self.pool_clears,
+            }
+
+
+pool_stats = PoolStats()
+
+_client: Optional[AsyncIOMotorClient] = None
+
+def get_client() -> AsyncIOMotorClient:
+    """The worker's Motor client, built on first use (a mongodb+srv URI means DNS lookups)."""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(
+            _config.MONGODB_CONNECTION_STRING,
+            maxPoolSize=int(_config.MONGODB_MAX_POOL_SIZE),
+            minPoolSize=int(_config.MONGODB_MIN_POOL_SIZE),
+            serverSelectionTimeoutMS=int(_config.MONGODB_CONNECTION_TIMEOUT_MS),
+            event_listeners=[pool_stats],
+        )
+    return _client
+
+# FastAPI dependency
 def get_db() -> AsyncIOMotorDatabase:
     """Return the database handle; Motor connects on first use."""
-    return _client[_config.MONGODB_NAME]
+    return get_client()[_config.MONGODB_NAME]
+
+async def warm_up() -> None:
+    """Open `minPoolSize` connections now instead of on the first requests (one concurrent ping each)."""
+    db = get_db()
+    await asyncio.gather(*(db.command("ping") for _ in range(max(1, int(_config.MONGODB_MIN_POOL_SIZE)))))
+    logging.info("[DB] connection pool warmed up: %s", pool_stats.stats())
+
+def close() -> None:
+    """Close the client and its pool (called from the app lifespan)."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+    reset_loaders()
+    reset_writers()
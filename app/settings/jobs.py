@@ -0,0 +1,50 @@
+import logging
+from typing import Any, Dict
+from app.settings.config import config
+from app.utils.job_queue import JobQueue, MemoryJobStore, RedisJobStore, WorkerPool
+
+
+_RUN_IN_APP = str(config.JOBS_RUN_IN_APP).lower() in ("true", "1", "yes")
+
+if config.JOBS_STORAGE_TYPE == "redis":
+    from redis.asyncio import from_url
+
+    store = RedisJobStore(
+        from_url(config.REDIS_URL),
+        prefix=config.JOBS_KEY_PREFIX,
+        result_ttl=int(config.JOBS_RESULT_TTL_SECONDS),
+    )
+else:
+    store = MemoryJobStore(result_ttl=int(config.JOBS_RESULT_TTL_SECONDS))
+
+jobs = JobQueue(store, max_attempts=int(config.JOBS_MAX_ATTEMPTS))
+
+worker_pool = WorkerPool(
+    jobs,
+    concurrency=int(config.JOBS_CONCURRENCY),
+    poll_interval=int(config.JOBS_POLL_INTERVAL_MS) / 1000,
+    timeout=float(config.JOBS_TIMEOUT_SECONDS),
+    base_delay=float(config.JOBS_RETRY_BASE_DELAY_SECONDS),
+    max_delay=float(config.JOBS_RETRY_MAX_DELAY_SECONDS),
+)
+
+async def start_jobs(in_app: bool = True) -> None:
+    """
+    Start the worker pool: from the app lifespan when JOBS_RUN_IN_APP is set, or from
+    the standalone worker process (`python -m app.jobs`, `in_app=False`).
+    The memory store is meant for tests and ENVIRONMENT=local only.
+    """
+    if config.JOBS_STORAGE_TYPE != "redis" and config.ENVIRONMENT.lower() != "local":
+        logging.error("[Jobs] JOBS_STORAGE_TYPE=%s keeps jobs in this process: they are lost on restart "
+                      "and not shared between workers, use redis", config.JOBS_STORAGE_TYPE)
+    if _RUN_IN_APP or not in_app:
+        await worker_pool.start()
+
+async def stop_jobs() -> None:
+    """Drain the worker pool for JOBS_SHUTDOWN_GRACE_SECONDS and close the store."""
+    await worker_pool.stop(grace=float(config.JOBS_SHUTDOWN_GRACE_SECONDS))
+    await store.close()
+
+async def jobs_stats() -> Dict[str, Any]:
+    """Queue depth (shared by every process using the store) and this process's pool outcomes."""
+    return {"storage": config.JOBS_STORAGE_TYPE, **await store.counts(), "pool": worker_pool.stats()}
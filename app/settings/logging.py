@@ -1,16 +1,52 @@
-
 """
 Logging Setup Module
 
 This module provides a function `setup_logging` that configures both console 
 and rotating file logging based on environment variables. 
 It supports configurable log levels and optional info-level logging to file.
+Nothing is configured at import: the app lifespan calls `setup_logging()`.
+
+Logging never writes to a file or to stdout on the event loop thread. The root
+logger only has a `QueueHandler`, which merges the message with its arguments
+and puts the record on a bounded queue; a `QueueListener` thread runs the
+console and file handlers. When the queue is full, records are dropped (and
+counted) or the caller blocks, per LOG_QUEUE_FULL_POLICY.
+
+Records logged while a request is served carry its `request_id` and the
+`latency_ms` since it started (set by `RequestContextMiddleware`); the JSON
+formatter (LOG_FORMAT=json) writes them as fields, one JSON object per line.
+
+Hot-path loggers can be sampled (LOG_SAMPLING) or rate-limited (LOG_RATE_LIMIT).
+Both only thin out records below WARNING, and they run before a record is
+queued, so a suppressed record costs almost nothing.
 """
 
 
+import atexit
+import copy
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Optional
+from app.utils.fast_json import dumps
+
+# Set by `app.middlewares.request_context.RequestContextMiddleware` for every request
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+request_started: ContextVar[Optional[float]] = ContextVar("request_started", default=None)
+
+# attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "request_id", "latency_ms"}
+
+_listener: Optional["LogListener"] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+_logger_filters: list = []
+_atexit_registered = False
 
 
 def setup_logging():
@@ -20,6 +56,7 @@ def setup_logging():
     This function configures the root logger with:
     - A console handler that logs messages according to the LOG_LEVEL environment variable.
     - A rotating file handler that logs messages based on LOG_INFO_TO_LOGS_FILE and LOG_FILE.
+    Both run on a background thread, fed through a bounded queue.
 
     Environment Variables:
         LOG_LEVEL (str): The log level for console output (DEBUG, INFO, WARNING, ERROR, CRITICAL).
@@ -27,6 +64,16 @@ def setup_logging():
         LOG_INFO_TO_LOGS_FILE (str): If "true"/"1"/"yes", includes WARNING level in file logs.
                                      Otherwise, logs only ERROR and CRITICAL to file.
         LOG_FILE (str): Path to the log file. Defaults to 'app_logs.log'.
+        LOG_FILE_MAX_BYTES (int): Rotate the log file at this size. Defaults to 10 MB.
+        LOG_FILE_BACKUP_COUNT (int): Rotated files kept. Defaults to 5.
+        LOG_FORMAT (str): "text" or "json" (one JSON object per line). Defaults to text.
+        LOG_QUEUE_SIZE (int): Records waiting for the logging thread. Defaults to 10000.
+        LOG_QUEUE_FULL_POLICY (str): "drop" (count and drop the record) or "block"
+                                     (wait for room). Defaults to drop.
+        LOG_SAMPLING (str): Per-logger share of records below WARNING to keep,
+                            e.g. "app.access=0.1,app.middlewares.auth=0.01".
+        LOG_RATE_LIMIT (str): Per-logger max records per second below WARNING, for each
+                              logging call site, e.g. "app.access=100".
 
     Returns:
         logging.Logger: The configured root logger.
@@ -43,16 +90,25 @@ def setup_logging():
     log_info_to_file = os.getenv(
         "LOG_INFO_TO_LOGS_FILE", "False").lower() in ("true", "1", "yes")
     log_file = os.getenv("LOG_FILE", "app_logs.log")
+    log_json = os.getenv("LOG_FORMAT", "text").lower() == "json"
 
-    # Remove existing handlers to avoid duplicates
+    # Stop a previous pipeline and remove existing handlers to avoid duplicates
+    stop_logging()
     for handler in logging.root.handlers[:]:
         logging.root.removeHandler(handler)
+    for logger, log_filter in _logger_filters:
+        logger.removeFilter(log_filter)
+    _logger_filters.clear()
 
     # Set up the main logger
     local_logger = logging.getLogger()
 
     # Set up rotating file handler
-    file_handler = RotatingFileHandler(log_file)
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=int(os.getenv("LOG_FILE_MAX_BYTES", 10 * 1024 * 1024)),
+        backupCount=int(os.getenv("LOG_FILE_BACKUP_COUNT", 5)),
+    )
 
     # Set log level for file handler
     if log_info_to_file:
@@ -61,24 +117,46 @@ def setup_logging():
     else:
         file_handler.setLevel(logging.ERROR)    # includes only ERROR, CRITICAL
 
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(filename)s - %(lineno)d - %(message)s'
-        if log_info_to_file else
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    if log_json:
+        file_formatter = JsonFormatter()
+    else:
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(filename)s - %(lineno)d - %(message)s'
+            if log_info_to_file else
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
     file_handler.setFormatter(file_formatter)
-    local_logger.addHandler(file_handler)
 
     # Console handler (show everything from log_level and up)
     console_handler = logging.StreamHandler()
-    if log_level == "DEBUG":
+    if log_json:
+        console_formatter = JsonFormatter()
+    elif log_level == "DEBUG":
         console_formatter = logging.Formatter(
             '%(asctime)s - %(levelname)s - %(filename)s - %(lineno)d - %(message)s')
     else:
         console_formatter = logging.Formatter(
             '%(asctime)s - %(levelname)s - %(message)s')
     console_handler.setFormatter(console_formatter)
-    local_logger.addHandler(console_handler)
+
+    # The event loop only enqueues; the handlers above run on the listener thread
+    global _listener, _queue_handler, _atexit_registered
+    _queue_handler = BoundedQueueHandler(
+        queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", 10000))),
+        block=os.getenv("LOG_QUEUE_FULL_POLICY", "drop").lower() == "block",
+    )
+    _queue_handler.addFilter(RequestContextFilter())
+    local_logger.addHandler(_queue_handler)
+    _listener = LogListener(_queue_handler.queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    if not _atexit_registered:
+        atexit.register(stop_logging)  # records still queued when the process exits
+        _atexit_registered = True
+
+    for name, rate in _parse_rules(os.getenv("LOG_SAMPLING", "")).items():
+        _add_logger_filter(name, SamplingFilter(rate))
+    for name, per_second in _parse_rules(os.getenv("LOG_RATE_LIMIT", "")).items():
+        _add_logger_filter(name, RateLimitFilter(per_second))
 
     # Set root logger level
     local_logger.setLevel(log_level)
@@ -89,4 +167,163 @@ def setup_logging():
     return local_logger
 
 
-logger = setup_logging()
+def stop_logging() -> None:
+    """Write out every queued record and stop the logging thread (app shutdown)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def logging_stats() -> Dict[str, Any]:
+    """Queue depth and the number of records dropped, sampled out or rate-limited."""
+    stats: Dict[str, Any] = {"queued": 0, "dropped": 0, "sampled_out": 0, "rate_limited": 0}
+    if _queue_handler is not None:
+        stats["queued"] = _queue_handler.queue.qsize()
+        stats["dropped"] = _queue_handler.dropped
+    for _, log_filter in _logger_filters:
+        if isinstance(log_filter, SamplingFilter):
+            stats["sampled_out"] += log_filter.suppressed
+        else:
+            stats["rate_limited"] += log_filter.suppressed
+    return stats
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler on a bounded queue that drops (or blocks) when the logging thread falls behind."""
+
+    def __init__(self, log_queue: queue.Queue, block: bool = False):
+        super().__init__(log_queue)
+        self.block = block
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # merge the arguments now, while they still hold their values; formatting
+        # (and any traceback) is left to the logging thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            if self._unreported:
+                self.queue.put_nowait(_dropped_record(self._unreported))
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+
+def _dropped_record(count: int) -> logging.LogRecord:
+    return logging.LogRecord("app.logging", logging.WARNING, __file__, 0,
+                             "[Logging] queue full, dropped %d log records", (count,), None)
+
+
+class LogListener(QueueListener):
+    """QueueListener whose stop waits for room in a full queue instead of failing."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class RequestContextFilter(logging.Filter):
+    """Adds `request_id` and `latency_ms` (time since the request started) to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        started = request_started.get()
+        record.latency_ms = None if started is None else round((time.perf_counter() - started) * 1000, 3)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, request context and any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "latency_ms": getattr(record, "latency_ms", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return dumps(entry).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a random `rate` share of records below WARNING."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or random.random() < self.rate:
+            return True
+        self.suppressed += 1
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """At most `per_second` records below WARNING per call site (token bucket, burst of one second)."""
+
+    def __init__(self, per_second: float, max_sites: int = 1000):
+        super().__init__()
+        self.per_second = per_second
+        self.max_sites = max_sites
+        self.suppressed = 0
+        self._buckets: Dict[Any, list] = {}
+        self._lock = threading.Lock()  # loggers are also used from worker threads
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_sites:
+                    self._buckets.clear()
+                bucket = self._buckets[key] = [self.per_second, now]
+            tokens = min(self.per_second, bucket[0] + (now - bucket[1]) * self.per_second)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return True
+            bucket[0] = tokens
+        self.suppressed += 1
+        return False
+
+
+def _parse_rules(value: str) -> Dict[str, float]:
+    """Parse "a=0.1,b=5" into {"a": 0.1, "b": 5.0}."""
+    rules = {}
+    for item in value.split(","):
+        name, _, number = item.partition("=")
+        if name.strip() and number.strip():
+            rules[name.strip()] = float(number)
+    return rules
+
+
+def _add_logger_filter(name: str, log_filter: logging.Filter) -> None:
+    logger = logging.getLogger(None if name == "root" else name)
+    logger.addFilter(log_filter)
+    _logger_filters.append((logger, log_filter))
@@ -1,5 +1,94 @@
-from newrelic import agent
+"""
+Monitoring: the New Relic agent and the app metrics served by `GET /metrics`.
+
+Subsystems keep their own counters (`stats()` / `metrics()`); the collector below
+mirrors them into `app.utils.metrics` at scrape time, and in multiprocess mode
+every few seconds in every worker, so the hot paths pay nothing extra.
+"""
+
+from app.middlewares.admission import admission_stats
+from app.middlewares.auth import token_cache
+from app.settings.caching import cache
+from app.settings.db import pool_stats
+from app.settings.logging import logging_stats
+from app.settings.ratelimiter import limiter_stats
+from app.utils import bulkhead, circuit_breaker
+from app.utils.metrics import Counter, Gauge, register_collector
+
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result (hit, stale_hit, miss).",
+                        ("cache", "result"))
+RATE_LIMIT_DECISIONS = Counter("rate_limit_decisions_total", "Rate limiter decisions (allowed, rejected, storage_error).",
+                               ("decision",))
+ADMISSION_LIMIT = Gauge("admission_concurrency_limit", "Adaptive concurrency limit, summed over workers.")
+ADMISSION_SHED = Counter("admission_shed_total", "Requests shed with 503 by admission control.", ("priority",))
+BREAKER_STATE = Gauge("circuit_breaker_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open (max over workers).",
+                      ("name",), mode="max")
+BREAKER_CALLS = Counter("circuit_breaker_calls_total", "Calls through a circuit breaker by outcome (call, failure, rejection).",
+                        ("name", "outcome"))
+BULKHEAD_ACTIVE = Gauge("bulkhead_active_calls", "Calls holding a bulkhead slot.", ("name",))
+BULKHEAD_REJECTED = Counter("bulkhead_rejected_total", "Calls rejected by a bulkhead (full queue or queue timeout).", ("name",))
+POOL_CONNECTIONS = Gauge("mongo_pool_connections", "Mongo pool connections by state (open, checked_out, wait_queue).",
+                         ("state",))
+POOL_CHECK_OUTS = Counter("mongo_pool_check_outs_total", "Mongo pool check-outs by result (ok, failed).", ("result",))
+LOG_RECORDS_DROPPED = Counter("log_records_dropped_total", "Log records dropped because the logging queue was full.")
+
+_CACHE_RESULTS = (("hits", "hit"), ("stale_hits", "stale_hit"), ("misses", "miss"))
+
+_BREAKER_STATES = {
+    circuit_breaker.CircuitBreakerState.CLOSED: 0,
+    circuit_breaker.CircuitBreakerState.HALF_OPEN: 1,
+    circuit_breaker.CircuitBreakerState.OPEN: 2,
+}
+
+
+def collect_app_metrics() -> None:
+    """Copy the counters each subsystem keeps into the metrics registry."""
+    for name, stats in (("response", cache.stats()), ("token", token_cache.stats())):
+        for key, result in _CACHE_RESULTS:
+            if key in stats:
+                CACHE_LOOKUPS.labels(name, result).set(stats[key])
+
+    limiter = limiter_stats()
+    if limiter is not None:
+        RATE_LIMIT_DECISIONS.labels("allowed").set(limiter["allowed"])
+        RATE_LIMIT_DECISIONS.labels("rejected").set(limiter["rejected"])
+        RATE_LIMIT_DECISIONS.labels("storage_error").set(limiter["storage_errors"])
+
+    admission = admission_stats()
+    ADMISSION_LIMIT.labels().set(admission["limit"])
+    ADMISSION_SHED.labels("true").set(admission["shed_priority"])
+    ADMISSION_SHED.labels("false").set(admission["shed_normal"])
+
+    for breaker in circuit_breaker.breakers():
+        metrics = breaker.metrics()
+        BREAKER_STATE.labels(breaker.name).set(_BREAKER_STATES[breaker.current_state])
+        BREAKER_CALLS.labels(breaker.name, "call").set(metrics["calls"])
+        BREAKER_CALLS.labels(breaker.name, "failure").set(metrics["failures"])
+        BREAKER_CALLS.labels(breaker.name, "rejection").set(metrics["rejections"])
+
+    for name, metrics in bulkhead.all_metrics().items():
+        BULKHEAD_ACTIVE.labels(name).set(metrics["active"])
+        BULKHEAD_REJECTED.labels(name).set(metrics["rejected"] + metrics["timed_out"])
+
+    pool = pool_stats.stats()
+    for state in ("open", "checked_out", "wait_queue"):
+        POOL_CONNECTIONS.labels(state).set(pool[state])
+    POOL_CHECK_OUTS.labels("ok").set(pool["check_outs"])
+    POOL_CHECK_OUTS.labels("failed").set(pool["check_out_failures"])
+
+    LOG_RECORDS_DROPPED.labels().set(logging_stats()["dropped"])
+
 
 class Monitor:
+    """New Relic agent and metric collectors, started from the app lifespan (importing the agent alone costs ~60ms)."""
+
     def __init__(self):
-        agent.initialize()
\ No newline at end of file
+        self.started = False
+
+    def start(self):
+        if self.started:
+            return
+        register_collector(collect_app_metrics)
+        from newrelic import agent
+        agent.initialize()
+        self.started = True
\ No newline at end of file
@@ -1,7 +1,14 @@
+import os
 import time
+import mmap
+import struct
 import asyncio
+import hashlib
+import logging
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Tuple
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Sequence, Tuple
 from fastapi import Request, HTTPException
 from app.settings.config import config
 
@@ -9,8 +16,24 @@ from app.settings.config import config
 
 try:
     import redis.asyncio as aioredis   # redis‑py ≥ 4.2
+    from redis.exceptions import RedisError
 except ImportError:
     aioredis = None  # Redis not installed – in‑memory fallback will be used
+    RedisError = OSError
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # no POSIX locks (e.g. Windows) – shared memory backend unavailable
+
+# errors that mean "the storage is unreachable", handled by RATE_LIMIT_FAIL_MODE
+STORAGE_ERRORS = (RedisError, OSError, asyncio.TimeoutError)
+
+
+class Limit(NamedTuple):
+    key: str
+    limit: int
+    seconds: int
 
 
 
@@ -20,22 +43,259 @@ class BaseStorage(ABC):
         """Increase token count by `tokens`. Return (new_count, is_new_bucket)."""
         pass
 
+    @abstractmethod
+    async def get(self, key: str) -> float:
+        """Return the current count of a bucket written by `incr` (0 if missing/expired)."""
+        pass
+
+    @abstractmethod
+    async def take(self, key: str, tokens: float, capacity: int, refill_rate: float) -> bool:
+        """Token bucket: remove `tokens` if available. Return True when they were taken."""
+        pass
+
+    @abstractmethod
+    async def gcra(self, keys: Sequence[str], intervals: Sequence[float], tolerances: Sequence[float], quantity: int) -> int:
+        """
+        GCRA over several keys at once. Admit up to `quantity` requests one by one, each
+        only if every key allows it, and return how many were admitted.
+        """
+        pass
+
+    async def close(self) -> None:
+        """Release connections / mappings held by the storage."""
+
 
 class MemoryStorage(BaseStorage):
-    def __init__(self):
-        self._buckets = {}
-        self._lock = asyncio.Lock()
+    """
+    In-process storage, sharded by key hash.
+
+    No operation awaits while touching a bucket, so each one is atomic on the event loop
+    and needs no lock. Buckets are re-inserted on every write, which keeps each shard in
+    least-recently-used order: every call sweeps a few expired buckets off the front of
+    one shard, and a shard holding its share of `max_keys` evicts its oldest bucket.
+    """
+
+    def __init__(self, shards: int = 16, max_keys: int = 100_000, sweep_batch: int = 8):
+        self._shards = [{} for _ in range(max(1, shards))]
+        self._shard_cap = max(1, max_keys // len(self._shards))
+        self._sweep_batch = sweep_batch
+        self._sweep_cursor = 0
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def _shard(self, key: str) -> dict:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _sweep(self, now: float) -> None:
+        shard = self._shards[self._sweep_cursor]
+        self._sweep_cursor = (self._sweep_cursor + 1) % len(self._shards)
+        for _ in range(self._sweep_batch):
+            if not shard:
+                return
+            key = next(iter(shard))
+            if shard[key][-1] > now:
+                return
+            del shard[key]
+
+    def _store(self, shard: dict, key: str, entry: tuple) -> None:
+        if len(shard) >= self._shard_cap:
+            del shard[next(iter(shard))]
+        shard[key] = entry
 
     async def incr(self, key, tokens, ttl):
-        async with self._lock:
-            now = time.time()
-            count, expires = self._buckets.get(key, (0.0, 0))
-            if now > expires:
-                count = 0.0
-                expires = now + ttl
+        now = time.time()
+        self._sweep(now)
+        shard = self._shard(key)
+        count, expires = shard.pop(key, (0.0, 0))
+        is_new = now > expires
+        if is_new:
+            count = 0.0
+            expires = now + ttl
+        count += tokens
+        self._store(shard, key, (count, expires))
+        return count, is_new
+
+    async def get(self, key):
+        entry = self._shard(key).get(key)
+        if entry is None or entry[-1] <= time.time():
+            return 0.0
+        return entry[0]
+
+    async def take(self, key, tokens, capacity, refill_rate):
+        now = time.time()
+        self._sweep(now)
+        shard = self._shard(key)
+        entry = shard.pop(key, None)
+        level = capacity
+        if entry is not None:
+            level = min(capacity, entry[0] + (now - entry[1]) * refill_rate)
+        allowed = level >= tokens
+        if allowed:
+            level -= tokens
+        # a bucket that would be full again carries no state, so it may be swept then
+        self._store(shard, key, (level, now, now + (capacity - level) / refill_rate))
+        return allowed
+
+    async def gcra(self, keys, intervals, tolerances, quantity):
+        now = time.time()
+        self._sweep(now)
+        # theoretical arrival time per key; a TAT in the past means a fresh key
+        tats = []
+        for key in keys:
+            entry = self._shard(key).get(key)
+            tats.append(max(entry[0], now) if entry is not None else now)
+
+        admitted = 0
+        while admitted < quantity and all(tat - now <= tau for tat, tau in zip(tats, tolerances)):
+            tats = [tat + interval for tat, interval in zip(tats, intervals)]
+            admitted += 1
+
+        if admitted:
+            for key, tat in zip(keys, tats):
+                shard = self._shard(key)
+                shard.pop(key, None)
+                # once the TAT has passed the key holds no state and may be swept
+                self._store(shard, key, (tat, tat))
+        return admitted
+
+
+class SharedMemoryStorage(BaseStorage):
+    """
+    Host-wide storage shared by every worker process, with no network I/O.
+
+    A fixed-size open-addressing hash table of counters lives in a memory-mapped file
+    (under /dev/shm by default). Slots are split into stripes, each guarded by an fcntl
+    byte-range lock, so workers only contend when their keys share a stripe. A key that
+    finds neither its slot nor a free/expired one within `MAX_PROBE` slots evicts the
+    probed slot that expires first.
+    """
+
+    MAGIC = b"RLSHM001"
+    HEADER = struct.Struct("<8sII")   # magic, slots, stripes
+    SLOT = struct.Struct("<Qddd")     # key hash (0 = empty), value, aux, expires
+    MAX_PROBE = 32
+
+    def __init__(self, path: str, slots: int = 65536, stripes: int = 64):
+        self.stripes = max(1, min(stripes, slots))
+        self.stripe_size = max(1, slots // self.stripes)
+        self.slots = self.stripe_size * self.stripes
+        size = self.HEADER.size + self.slots * self.SLOT.size
+        # the geometry is part of the file name, so a resized table never remaps a live one
+        self.path = f"{path}-{self.slots}x{self.stripes}"
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self.HEADER.size, 0)
+        try:
+            header = os.pread(self._fd, self.HEADER.size, 0)
+            if len(header) < self.HEADER.size or self.HEADER.unpack(header)[0] != self.MAGIC:
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, self.HEADER.pack(self.MAGIC, self.slots, self.stripes), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self.HEADER.size, 0)
+        self._mm = mmap.mmap(self._fd, size)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # stable across processes, unlike hash(); 0 is reserved for empty slots
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    @contextmanager
+    def _locked(self, hashes):
+        # stripes are always locked in ascending order, so multi-key calls cannot deadlock
+        stripes = sorted({h % self.stripes for h in hashes})
+        for stripe in stripes:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, self.HEADER.size + stripe)
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self.HEADER.size + stripe)
+
+    def _slot(self, h: int, now: float) -> int:
+        """Byte offset of the slot for hash `h`. The caller holds its stripe lock."""
+        base = (h % self.stripes) * self.stripe_size
+        start = (h // self.stripes) % self.stripe_size
+        free = victim = None
+        victim_expires = float("inf")
+        for i in range(min(self.MAX_PROBE, self.stripe_size)):
+            offset = self.HEADER.size + (base + (start + i) % self.stripe_size) * self.SLOT.size
+            slot_hash, _, _, expires = self.SLOT.unpack_from(self._mm, offset)
+            if slot_hash == h:
+                return offset
+            if slot_hash == 0:
+                # end of the probe chain: the key is not stored
+                return offset if free is None else free
+            if expires <= now:
+                if free is None:
+                    free = offset
+            elif expires < victim_expires:
+                victim, victim_expires = offset, expires
+        return victim if free is None else free
+
+    def _read(self, offset: int, h: int, now: float):
+        slot_hash, value, aux, expires = self.SLOT.unpack_from(self._mm, offset)
+        if slot_hash != h or expires <= now:
+            return None
+        return value, aux, expires
+
+    async def incr(self, key, tokens, ttl):
+        h = self._hash(key)
+        now = time.time()
+        with self._locked([h]):
+            offset = self._slot(h, now)
+            entry = self._read(offset, h, now)
+            is_new = entry is None
+            count, _, expires = (0.0, 0.0, now + ttl) if is_new else entry
             count += tokens
-            self._buckets[key] = (count, expires)
-            return count, now > expires
+            self.SLOT.pack_into(self._mm, offset, h, count, 0.0, expires)
+        return count, is_new
+
+    async def get(self, key):
+        h = self._hash(key)
+        now = time.time()
+        with self._locked([h]):
+            entry = self._read(self._slot(h, now), h, now)
+        return 0.0 if entry is None else entry[0]
+
+    async def take(self, key, tokens, capacity, refill_rate):
+        h = self._hash(key)
+        now = time.time()
+        with self._locked([h]):
+            offset = self._slot(h, now)
+            entry = self._read(offset, h, now)
+            level = capacity
+            if entry is not None:
+                level = min(capacity, entry[0] + (now - entry[1]) * refill_rate)
+            allowed = level >= tokens
+            if allowed:
+                level -= tokens
+            self.SLOT.pack_into(self._mm, offset, h, level, now, now + (capacity - level) / refill_rate)
+        return allowed
+
+    async def gcra(self, keys, intervals, tolerances, quantity):
+        hashes = [self._hash(key) for key in keys]
+        now = time.time()
+        with self._locked(hashes):
+            offsets = [self._slot(h, now) for h in hashes]
+            tats = []
+            for offset, h in zip(offsets, hashes):
+                entry = self._read(offset, h, now)
+                tats.append(now if entry is None else max(entry[0], now))
+
+            admitted = 0
+            while admitted < quantity and all(tat - now <= tau for tat, tau in zip(tats, tolerances)):
+                tats = [tat + interval for tat, interval in zip(tats, intervals)]
+                admitted += 1
+
+            if admitted:
+                for offset, h, tat in zip(offsets, hashes, tats):
+                    self.SLOT.pack_into(self._mm, offset, h, tat, 0.0, tat)
+        return admitted
+
+    async def close(self):
+        self._mm.close()
+        os.close(self._fd)
 
 
 class RedisStorage(BaseStorage):
@@ -47,48 +307,316 @@ class RedisStorage(BaseStorage):
     return new
     """
 
+    TOKEN_BUCKET_LUA = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local tokens = tonumber(ARGV[3])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'level', 'ts')
+    local level = capacity
+    if state[1] then
+        level = math.min(capacity, tonumber(state[1]) + (now - tonumber(state[2])) * rate)
+    end
+    local allowed = 0
+    if level >= tokens then
+        level = level - tokens
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'level', level, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - level) / rate * 1000) + 1000)
+    return allowed
+    """
+
+    # ARGV[1] = quantity, then (emission interval, tolerance) for every key
+    GCRA_LUA = """
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local quantity = tonumber(ARGV[1])
+    local tats = {}
+    for i = 1, #KEYS do
+        local tat = tonumber(redis.call('GET', KEYS[i]) or 0)
+        if tat < now then
+            tat = now
+        end
+        tats[i] = tat
+    end
+    local admitted = 0
+    while admitted < quantity do
+        for i = 1, #KEYS do
+            if tats[i] - now > tonumber(ARGV[2 * i + 1]) then
+                quantity = admitted
+            end
+        end
+        if admitted < quantity then
+            for i = 1, #KEYS do
+                tats[i] = tats[i] + tonumber(ARGV[2 * i])
+            end
+            admitted = admitted + 1
+        end
+    end
+    if admitted > 0 then
+        for i = 1, #KEYS do
+            redis.call('SET', KEYS[i], tats[i], 'PX', math.ceil((tats[i] - now) * 1000) + 1)
+        end
+    end
+    return admitted
+    """
+
     def __init__(self):
-        redis_client = aioredis.from_url(config.REDIS_URL)
+        timeout = int(config.RATE_LIMIT_REDIS_TIMEOUT_MS) / 1000
+        redis_client = aioredis.from_url(config.REDIS_URL, socket_timeout=timeout, socket_connect_timeout=timeout)
         self.redis = redis_client
         self.script = self.redis.register_script(self.LUA)
+        self.token_bucket = self.redis.register_script(self.TOKEN_BUCKET_LUA)
+        self.gcra_script = self.redis.register_script(self.GCRA_LUA)
 
     async def incr(self, key, tokens, ttl):
         new_val = float(await self.script(keys=[key], args=[tokens, ttl]))
         return new_val, False
 
+    async def get(self, key):
+        value = await self.redis.get(key)
+        return 0.0 if value is None else float(value)
+
+    async def take(self, key, tokens, capacity, refill_rate):
+        return bool(await self.token_bucket(keys=[key], args=[capacity, refill_rate, tokens]))
+
+    async def gcra(self, keys, intervals, tolerances, quantity):
+        args = [quantity]
+        for interval, tau in zip(intervals, tolerances):
+            args += [interval, tau]
+        return int(await self.gcra_script(keys=list(keys), args=args))
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class GCRABatcher:
+    """
+    Pre-aggregates GCRA checks locally for `window_ms` before flushing them.
+
+    Requests for the same set of limits that arrive within the window wait on one
+    storage call that asks for all of them at once; the first `admitted` waiters are
+    let through, the rest are rejected.
+    """
+
+    def __init__(self, storage: BaseStorage, window_ms: int):
+        self.storage = storage
+        self.window = window_ms / 1000
+        self._pending: Dict[tuple, List[asyncio.Future]] = {}
+        self._flushes = set()  # strong refs so in-flight flushes are not garbage collected
+
+    async def gcra(self, keys, intervals, tolerances) -> bool:
+        batch_key = (tuple(keys), tuple(intervals), tuple(tolerances))
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiters = self._pending.get(batch_key)
+        if waiters is None:
+            waiters = self._pending[batch_key] = []
+            loop.call_later(self.window, self._schedule_flush, batch_key)
+        waiters.append(future)
+        return await future
+
+    def _schedule_flush(self, batch_key: tuple) -> None:
+        task = asyncio.ensure_future(self._flush(batch_key))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch_key: tuple) -> None:
+        waiters = self._pending.pop(batch_key)
+        keys, intervals, tolerances = batch_key
+        try:
+            admitted = await self.storage.gcra(keys, intervals, tolerances, len(waiters))
+        except Exception as e:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        for i, waiter in enumerate(waiters):
+            if not waiter.done():
+                waiter.set_result(i < admitted)
+
 
 class RateLimiter:
+    """
+    Strategies
+    ----------
+    fixed_window   : counter reset every `seconds` (allows 2x `limit` across a window boundary)
+    sliding_window : current window count plus the previous window weighted by overlap
+    token_bucket   : bucket of `limit` tokens refilled at `limit / seconds` per second
+    gcra           : generic cell rate algorithm, one timestamp per key; several limits are
+                     checked in a single storage call (one Redis round trip)
+
+    When the storage is unreachable the request is allowed (`fail_mode="open"`) or
+    rejected (`fail_mode="closed"`).
+    """
+
+    STRATEGIES = ("fixed_window", "sliding_window", "token_bucket", "gcra")
+
     def __init__(
         self,
         limit: int,
         *,
         seconds: int = 0,
-        storage: BaseStorage
+        storage: BaseStorage,
+        strategy: str = "sliding_window",
+        fail_mode: str = "open",
+        batch_window_ms: int = 0
     ):
         if seconds <= 0:
             raise ValueError("Must specify a positive time window using `seconds`.")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown rate limit strategy '{strategy}', expected one of {self.STRATEGIES}.")
+        if fail_mode not in ("open", "closed"):
+            raise ValueError("`fail_mode` must be 'open' or 'closed'.")
 
         self.capacity = limit
         self.refill_rate = limit / seconds
         self.storage = storage
         self.ttl = seconds
+        self.strategy = strategy
+        self.fail_mode = fail_mode
+        self.batcher = GCRABatcher(storage, batch_window_ms) if strategy == "gcra" and batch_window_ms > 0 else None
+        self._storage_down = False
+        # decisions, for metrics
+        self.allowed = 0
+        self.rejected = 0
+        self.storage_errors = 0
 
     async def allow(self, key: str) -> bool:
-        current, _ = await self.storage.incr(key, 1, self.ttl)  # add just 1 hit
-        return current <= self.capacity
+        return await self.check([Limit(key, self.capacity, self.ttl)])
+
+    async def check(self, limits: Sequence[Limit]) -> bool:
+        """Return True when the request fits within every one of `limits`."""
+        try:
+            if self.strategy == "gcra":
+                allowed = await self._gcra(limits)
+            else:
+                allowed = True
+                for limit in limits:
+                    if not await self._allow_one(limit):
+                        allowed = False
+                        break
+        except STORAGE_ERRORS as e:
+            self.storage_errors += 1
+            if not self._storage_down:
+                self._storage_down = True
+                logging.error("[RateLimiter] storage unavailable, failing %s: %s", self.fail_mode, e)
+            return self.fail_mode == "open"
+
+        if self._storage_down:
+            self._storage_down = False
+            logging.warning("[RateLimiter] storage available again")
+        if allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return allowed
+
+    # expose for introspection
+    def stats(self) -> Dict[str, int]:
+        return {"allowed": self.allowed, "rejected": self.rejected, "storage_errors": self.storage_errors}
+
+    async def _gcra(self, limits: Sequence[Limit]) -> bool:
+        keys = [limit.key for limit in limits]
+        intervals = [limit.seconds / limit.limit for limit in limits]
+        # tolerance of `seconds - interval` admits a burst of exactly `limit` requests
+        tolerances = [limit.seconds - interval for limit, interval in zip(limits, intervals)]
+        if self.batcher is not None:
+            return await self.batcher.gcra(keys, intervals, tolerances)
+        return await self.storage.gcra(keys, intervals, tolerances, 1) == 1
+
+    async def _allow_one(self, limit: Limit) -> bool:
+        key, capacity, seconds = limit
+        if self.strategy == "token_bucket":
+            return await self.storage.take(key, 1, capacity, capacity / seconds)
+
+        if self.strategy == "sliding_window":
+            now = time.time()
+            window = int(now // seconds)
+            overlap = 1 - (now % seconds) / seconds
+            # window buckets live for two windows so the next one can still weigh them
+            current, _ = await self.storage.incr(f"{key}:{window}", 1, seconds * 2)
+            previous = await self.storage.get(f"{key}:{window - 1}")
+            if previous * overlap + current <= capacity:
+                return True
+            # rejected hits are handed back so they do not weigh on the next window
+            await self.storage.incr(f"{key}:{window}", -1, seconds * 2)
+            return False
+
+        current, _ = await self.storage.incr(key, 1, seconds)  # add just 1 hit
+        return current <= capacity
+
 
 
+def _shm_dir() -> str:
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
 
 def _build_storage(storage_type: str) -> BaseStorage:
     if storage_type == "redis":
         if aioredis is None:
             raise RuntimeError("Redis backend requested but redis-py is not installed.")
         return RedisStorage()
-    return MemoryStorage()
+    if storage_type == "shared_memory":
+        if fcntl is None:
+            raise RuntimeError("Shared memory backend requested but fcntl is not available on this platform.")
+        return SharedMemoryStorage(
+            path=config.RATE_LIMIT_SHM_PATH or os.path.join(_shm_dir(), "fastapi-base-ratelimit"),
+            slots=int(config.RATE_LIMIT_SHM_SLOTS),
+            stripes=int(config.RATE_LIMIT_SHM_STRIPES),
+        )
+    return MemoryStorage(
+        shards=int(config.RATE_LIMIT_MEMORY_SHARDS),
+        max_keys=int(config.RATE_LIMIT_MAX_TRACKED_KEYS),
+    )
+
+_limiter: RateLimiter | None = None
+
+def get_limiter() -> RateLimiter:
+    """The worker's limiter, built on first use (the storage may open Redis or a shared memory file)."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(
+            limit=int(config.RATE_LIMIT_REQUESTS_COUNT),
+            seconds=int(config.RATE_LIMIT_REQUESTS_TIME_IN_SECONDS),
+            storage=_build_storage(config.RATE_LIMIT_REQUESTS_STORAGE_TYPE),
+            strategy=config.RATE_LIMIT_STRATEGY,
+            fail_mode=config.RATE_LIMIT_FAIL_MODE,
+            batch_window_ms=int(config.RATE_LIMIT_BATCH_WINDOW_MS),
+        )
+    return _limiter
+
+def limiter_stats() -> Dict[str, int] | None:
+    """Decision counts of the worker's limiter, or None when it has not been built yet."""
+    return _limiter.stats() if _limiter is not None else None
 
-limiter = RateLimiter(limit=int(config.RATE_LIMIT_REQUESTS_COUNT), seconds=int(config.RATE_LIMIT_REQUESTS_TIME_IN_SECONDS), storage=_build_storage(config.RATE_LIMIT_REQUESTS_STORAGE_TYPE))
+async def close_limiter() -> None:
+    """Release the limiter's storage (called from the app lifespan)."""
+    global _limiter
+    if _limiter is not None:
+        await _limiter.storage.close()
+        _limiter = None
+
+_USER_LIMIT = int(config.RATE_LIMIT_USER_REQUESTS_COUNT)
+_ROUTE_LIMIT = int(config.RATE_LIMIT_ROUTE_REQUESTS_COUNT)
 
 async def rate_limiter(request: Request):
-    client_ip = request.client.host
-    if not await limiter.allow(client_ip):
+    """
+    Per-IP limit, plus optional per-`user_id` and per-route limits
+    (RATE_LIMIT_USER_REQUESTS_COUNT / RATE_LIMIT_ROUTE_REQUESTS_COUNT, 0 disables).
+    """
+    limiter = get_limiter()
+    seconds = limiter.ttl
+    limits = [Limit(f"ip:{request.client.host}", limiter.capacity, seconds)]
+
+    user_id = getattr(request.state, "user_id", None)
+    if _USER_LIMIT and user_id:
+        limits.append(Limit(f"user:{user_id}", _USER_LIMIT, seconds))
+
+    route = request.scope.get("route")
+    if _ROUTE_LIMIT and route is not None:
+        limits.append(Limit(f"route:{route.path}", _ROUTE_LIMIT, seconds))
+
+    if not await limiter.check(limits):
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
\ No newline at end of file
@@ -1,30 +1,154 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 import asyncio
+from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo.errors import DuplicateKeyError
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from app.settings.caching import cache
-from cachetools_async import cached
+from app.settings.config import config
+from app.utils.batch_loader import collection_loader
+from app.utils.fast_json import FastJSONResponse, dumps
+from app.utils.write_coalescer import collection_writer
+from app.utils.route_cache import route_cache, invalidates, invalidate
 from app.settings.db import get_db
 from app.user.schema import UserRequest
 
+_DUPLICATE_KEY = 11000
+_BULK_MAX_ITEMS = int(config.USER_BULK_MAX_ITEMS)
+_BATCH_GET_MAX_IDS = int(config.USER_BATCH_GET_MAX_IDS)
+_PAGE_DEFAULT_LIMIT = int(config.USER_PAGE_DEFAULT_LIMIT)
+_PAGE_MAX_LIMIT = int(config.USER_PAGE_MAX_LIMIT)
+_EXPORT_BATCH_SIZE = int(config.USER_EXPORT_BATCH_SIZE)
+_WRITE_COALESCING = str(config.WRITE_COALESCING_ENABLED).lower() in ("true", "1", "yes")
+
 
 router = APIRouter()
 
 @router.post("/api/user", status_code=status.HTTP_201_CREATED)
+@invalidates(cache, keys=["user:{user.id}"])
 async def create_user(user: UserRequest, db: AsyncIOMotorDatabase = Depends(get_db)):
     doc = dict(user.model_dump())
     try:
-        result = await db.users.insert_one(doc)
+        # both paths set doc["_id"]
+        if _WRITE_COALESCING:
+            # flushed together with concurrent creates as one insert_many
+            await collection_writer(db.users).insert(doc)
+        else:
+            await db.users.insert_one(doc)
     except DuplicateKeyError:
         raise HTTPException(409, "User already exists")
-    doc["_id"] = str(result.inserted_id)
-    return doc
+    return FastJSONResponse(doc, status_code=status.HTTP_201_CREATED)
 
 @router.get("/api/user/{id}")
-@cached(cache)
+@route_cache(cache, "user:{id}", etag=True, raw=True)
 async def get_user(id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
-    doc = await db.users.find_one({"id":id})
+    # concurrent lookups are coalesced into one `$in` query
+    doc = await collection_loader(db.users).load(id)
     if doc is None:
         raise HTTPException(status_code=404, detail="User not found")
-    doc["_id"] = str(doc["_id"])
     return doc
+
+@router.post("/api/users/bulk", status_code=status.HTTP_201_CREATED)
+async def create_users(users: List[UserRequest], response: Response, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Insert many users with one unordered `insert_many`. Every item gets its own
+    status ("created", "duplicate" or "error"); the response is 207 unless all were created.
+    """
+    if not users:
+        raise HTTPException(422, "At least one user is required")
+    if len(users) > _BULK_MAX_ITEMS:
+        raise HTTPException(422, f"At most {_BULK_MAX_ITEMS} users per request")
+
+    docs = [user.model_dump() for user in users]
+    failed = {}
+    try:
+        await db.users.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+
+    results = []
+    for index, doc in enumerate(docs):
+        error = failed.get(index)
+        if error is None:
+            results.append({"index": index, "id": doc["id"], "status": "created", "_id": str(doc["_id"])})
+        elif error.get("code") == _DUPLICATE_KEY:
+            results.append({"index": index, "id": doc["id"], "status": "duplicate"})
+        else:
+            results.append({"index": index, "id": doc["id"], "status": "error", "error": error.get("errmsg")})
+
+    created = [result["id"] for result in results if result["status"] == "created"]
+    await invalidate(cache, *(f"user:{id}" for id in created))
+    if failed:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    return {"inserted": len(created), "results": results}
+
+@router.get("/api/users/batch")
+async def get_users(ids: List[str] = Query(...), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Fetch many users with a single `$in` query. `ids` may repeat or be comma separated."""
+    ids = list(dict.fromkeys(id for value in ids for id in value.split(",") if id))
+    if len(ids) > _BATCH_GET_MAX_IDS:
+        raise HTTPException(422, f"At most {_BATCH_GET_MAX_IDS} ids per request")
+
+    found = {}
+    async for doc in db.users.find({"id": {"$in": ids}}):
+        found[doc["id"]] = doc
+    return FastJSONResponse({
+        "users": [found[id] for id in ids if id in found],
+        "missing": [id for id in ids if id not in found],
+    })
+
+@router.get("/api/users")
+async def list_users(
+    after: Optional[str] = None,
+    limit: int = Query(_PAGE_DEFAULT_LIMIT, ge=1, le=_PAGE_MAX_LIMIT),
+    fields: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    batch_size: int = Query(_EXPORT_BATCH_SIZE, ge=1, le=10 * _EXPORT_BATCH_SIZE),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """
+    Keyset pagination over the unique `id` index: pass the `next` value of a page as
+    `after` to get the following one. `fields` is a comma separated projection.
+
+    `format=ndjson` streams every user after `after` as newline-delimited JSON instead,
+    reading the cursor `batch_size` documents at a time. A batch is only fetched once the
+    previous one was handed to the client, so memory stays flat for any collection size.
+    """
+    query = {"id": {"$gt": after}} if after else {}
+    projection, drop_id = _projection(fields)
+
+    if format == "ndjson":
+        cursor = db.users.find(query, projection).sort("id", 1).batch_size(batch_size)
+        return StreamingResponse(_ndjson(cursor, batch_size), media_type="application/x-ndjson")
+
+    users = await db.users.find(query, projection).sort("id", 1).limit(limit).to_list(length=limit)
+    next_after = users[-1]["id"] if len(users) == limit else None
+    if drop_id:
+        for doc in users:
+            doc.pop("id", None)
+    return FastJSONResponse({"users": users, "next": next_after})
+
+def _projection(fields: Optional[str]):
+    """Mongo projection for `fields`, and whether `id` is only read to build the next cursor."""
+    if not fields:
+        return None, False
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    projection = {name: 1 for name in names}
+    projection["id"] = 1
+    if "_id" not in names:
+        projection["_id"] = 0
+    return projection, "id" not in names
+
+async def _ndjson(cursor, batch_size: int):
+    lines = []
+    try:
+        async for doc in cursor:
+            lines.append(dumps(doc))
+            if len(lines) >= batch_size:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+    finally:
+        # a client that disconnects mid-stream must not leave the server-side cursor open
+        await cursor.close()
@@ -0,0 +1,124 @@
+# app/utils/adaptive_limit.py
+"""
+Concurrency limit that adapts to observed latency (gradient style).
+
+Latencies are averaged over short intervals (100ms by default). The mean of the
+last interval is what requests cost right now; a slow moving average of those
+means (over ~600 intervals, about a minute) stands in for the no-load baseline.
+While latency stays near the baseline the limit grows; when requests start
+queueing inside the worker (event loop, Mongo pool) the interval mean rises and
+the limit shrinks in proportion, before latency runs away for everyone. Working
+per interval rather than per request keeps the baseline from following the
+queueing up when traffic is heavy.
+
+    gradient  = clamp(tolerance * long / short, 0.5, 1.0)
+    new_limit = limit * gradient + headroom
+    limit     = limit * (1 - smoothing) + new_limit * smoothing
+
+`headroom` (sqrt of the limit) lets the limit probe upward while latency is
+flat. The limit only changes while the worker is actually using at least half of
+it during the interval, so an idle worker does not grow a limit it has never
+been tested against.
+
+Usage
+-----
+from app.utils.adaptive_limit import GradientLimit
+
+limit = GradientLimit(initial=50, min_limit=5, max_limit=500)
+
+if limit.in_flight >= limit.limit:
+    ...  # shed
+limit.in_flight += 1
+...
+limit.observe(latency_seconds)
+limit.in_flight -= 1
+"""
+
+import math
+import time
+from typing import Any, Dict
+
+
+class GradientLimit:
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        interval: float = 0.1,
+        long_window: int = 600,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.interval = interval
+        self._long_alpha = 2 / (long_window + 1)
+        self._short = 0.0
+        self._long = 0.0
+        # current interval
+        self._started = time.monotonic()
+        self._sum = 0.0
+        self._count = 0
+        self._peak = 0
+        self.in_flight = 0
+        self.samples = 0
+        self.updates = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    # ------------------------------------------------------------------ api
+    def observe(self, latency: float) -> None:
+        """Feed the latency of one request (seconds), while it still counts as in flight."""
+        self.samples += 1
+        self._sum += latency
+        self._count += 1
+        if self.in_flight > self._peak:
+            self._peak = self.in_flight
+        now = time.monotonic()
+        if now - self._started >= self.interval:
+            self._update(self._sum / self._count, self._peak)
+            self._started = now
+            self._sum = 0.0
+            self._count = 0
+            self._peak = 0
+
+    # ------------------------------------------------------------ internals
+    def _update(self, short: float, peak: int) -> None:
+        if short <= 0:
+            return
+        self.updates += 1
+        self._short = short
+        if self.updates == 1:
+            self._long = short
+            return
+        self._long += self._long_alpha * (short - self._long)
+
+        # after a sustained drop (e.g. a faster deploy) let the baseline catch up
+        if self._long / short > 2:
+            self._long *= 0.95
+
+        if peak < self._limit / 2:
+            return  # app-limited: latency says nothing about a higher limit
+
+        gradient = max(0.5, min(1.0, self.tolerance * self._long / short))
+        new_limit = self._limit * gradient + math.sqrt(self._limit)
+        new_limit = self._limit * (1 - self.smoothing) + new_limit * self.smoothing
+        self._limit = min(max(new_limit, self.min_limit), self.max_limit)
+
+    # expose for introspection
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "latency_recent_ms": round(self._short * 1000, 3),
+            "latency_baseline_ms": round(self._long * 1000, 3),
+            "samples": self.samples,
+        }
@@ -0,0 +1,166 @@
+# app/utils/async_cache.py
+"""
+Async cache base with stampede protection.
+
+Every backend stores an envelope `[value, expires_at, delta]`, where `delta` is
+how long the value took to compute. On top of that `get_or_set` adds:
+
+- single-flight: only one coroutine per key runs the loader, the others await it
+- stale-while-revalidate: for `stale_ttl` seconds after expiry the old value is
+  served while one background refresh runs
+- probabilistic early expiration (XFetch): a value close to expiry is refreshed
+  early with a probability that grows with `delta * beta`, spreading refreshes out
+
+Usage
+-----
+from app.settings.caching import cache
+
+async def load():
+    return await db.users.find_one({"id": id})
+
+doc = await cache.get_or_set(f"user:{id}", load)
+"""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from cachetools import TLRUCache
+
+Loader = Callable[[], Awaitable[Any]]
+TTLFor = Callable[[Any], Optional[int]]
+
+
+class AsyncCache(ABC):
+    def __init__(self, ttl: int, stale_ttl: int = 0, early_expiry_beta: float = 0.0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.early_expiry_beta = early_expiry_beta
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshes = set()  # strong refs to background refresh tasks
+        # get_or_set outcomes
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------ backend
+    @abstractmethod
+    async def _load(self, key: str) -> Optional[List[Any]]:
+        """Return the stored envelope or None."""
+
+    @abstractmethod
+    async def _store(self, key: str, envelope: List[Any], ttl: float) -> None:
+        """Store an envelope for `ttl` seconds."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Drop `keys` from the cache."""
+
+    async def _fill(self, key: str, envelope: List[Any], ttl: float) -> None:
+        """Store a value just computed by a loader (a miss or a refresh); an explicit `set` uses `_store`."""
+        await self._store(key, envelope, ttl)
+
+    # ------------------------------------------------------------------ api
+    async def get(self, key: str) -> Any:
+        envelope = await self._load(key)
+        if envelope is None or envelope[1] <= time.time():
+            return None
+        return envelope[0]
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, delta: float = 0.0) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        await self._store(key, [value, time.time() + ttl, delta], ttl + self.stale_ttl)
+
+    async def get_or_set(self, key: str, loader: Loader, ttl: Optional[int] = None, ttl_for: Optional[TTLFor] = None) -> Any:
+        """
+        Return the cached value of `key`, running `loader` on a miss. `ttl_for(value)`
+        may pick the TTL from the loaded value (e.g. a short one for "not found").
+        """
+        envelope = await self._load(key)
+        if envelope is not None:
+            value, expires, delta = envelope
+            if not self._should_refresh(expires, delta):
+                self.hits += 1
+                return value
+            # stale or picked for early refresh: serve what we have, refresh once in background
+            self.stale_hits += 1
+            self._refresh(key, loader, ttl, ttl_for)
+            return value
+        self.misses += 1
+        return await self._single_flight(key, loader, ttl, ttl_for)
+
+    # expose for introspection
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "inflight": len(self._inflight),
+        }
+
+    # ------------------------------------------------------------ internals
+    def _should_refresh(self, expires: float, delta: float) -> bool:
+        now = time.time()
+        if now >= expires:
+            return True
+        if self.early_expiry_beta <= 0 or delta <= 0:
+            return False
+        # XFetch: -log(U) is exponentially distributed, so refreshes start gradually before expiry
+        return now - delta * self.early_expiry_beta * math.log(1.0 - random.random()) >= expires
+
+    def _single_flight(self, key: str, loader: Loader, ttl: Optional[int], ttl_for: Optional[TTLFor]) -> Awaitable[Any]:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._compute(key, loader, ttl, ttl_for))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return asyncio.shield(future)
+
+    async def _compute(self, key: str, loader: Loader, ttl: Optional[int], ttl_for: Optional[TTLFor]) -> Any:
+        start = time.monotonic()
+        value = await loader()
+        if ttl_for is not None:
+            ttl = ttl_for(value)
+        ttl = self.ttl if ttl is None else ttl
+        await self._fill(key, [value, time.time() + ttl, time.monotonic() - start], ttl + self.stale_ttl)
+        return value
+
+    def _refresh(self, key: str, loader: Loader, ttl: Optional[int], ttl_for: Optional[TTLFor]) -> None:
+        if key in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                await self._single_flight(key, loader, ttl, ttl_for)
+            except Exception as e:
+                logging.warning("[Cache] background refresh of '%s' failed: %s", key, e)
+
+        task = asyncio.ensure_future(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+
+class MemoryTTLCache(AsyncCache):
+    """Per-worker cache on a cachetools TLRUCache (per-entry TTL, LRU bound)."""
+
+    def __init__(self, maxsize: int, ttl: int, **kwargs):
+        super().__init__(ttl, **kwargs)
+        self._data = TLRUCache(maxsize=maxsize, ttu=lambda _key, item, now: now + item[1], timer=time.time)
+
+    async def _load(self, key):
+        item = self._data.get(key)
+        return None if item is None else item[0]
+
+    async def _store(self, key, envelope, ttl):
+        self._data[key] = (envelope, ttl)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
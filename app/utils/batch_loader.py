@@ -0,0 +1,161 @@
+# app/utils/batch_loader.py
+"""
+DataLoader-style read coalescing.
+
+Concurrent lookups by key that arrive within the same event-loop tick (or a
+short window) are collected and resolved with a single batch call, and the
+results are fanned back out to every waiting coroutine. Identical keys in a
+batch are only fetched once. Under load, hundreds of `find_one` calls competing
+for a small Mongo pool become a handful of `$in` queries.
+
+Usage
+-----
+from app.utils.batch_loader import collection_loader
+
+doc = await collection_loader(db.users).load(id)          # None if not found
+docs = await collection_loader(db.users).load_many(ids)   # same order as ids
+
+Any async `batch_fn(keys) -> {key: value}` can be wrapped directly:
+
+loader = BatchLoader(batch_fn, window_ms=2, max_batch_size=100)
+
+Loaders are per worker and hold no data between batches: they coalesce, they
+do not cache.
+
+Env Vars
+--------
+LOADER_WINDOW_MS       : how long to collect keys before a batch; 0 = the current loop tick (default 0)
+LOADER_MAX_BATCH_SIZE  : a batch is flushed as soon as it holds this many distinct keys (default 100)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.settings.config import config
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class BatchLoader:
+    def __init__(self, batch_fn: BatchFn, *, window_ms: float = 0, max_batch_size: int = 100):
+        self.batch_fn = batch_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes = set()  # strong refs to running batches
+        # metrics
+        self.requests = 0
+        self.batches = 0
+        self.keys = 0
+        self.max_seen_batch = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.errors = 0
+
+    # ------------------------------------------------------------------ api
+    async def load(self, key: Hashable) -> Any:
+        """Value of `key`, or None when the batch function did not return it."""
+        self.requests += 1
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                if self.window > 0:
+                    self._timer = loop.call_later(self.window, self._flush)
+                else:
+                    self._timer = loop.call_soon(self._flush)
+        # shared by every caller of the key: one cancelled caller must not cancel the others
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: List[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    # expose for introspection
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "keys": self.keys,
+            "pending": len(self._pending),
+            "avg_batch_size": round(self.keys / self.batches, 2) if self.batches else 0,
+            "max_batch_size": self.max_seen_batch,
+            "avg_latency_ms": round(self.total_latency / self.batches * 1000, 3) if self.batches else 0,
+            "max_latency_ms": round(self.max_latency * 1000, 3),
+            "errors": self.errors,
+        }
+
+    # ------------------------------------------------------------ internals
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future]) -> None:
+        start = time.monotonic()
+        try:
+            results = await self.batch_fn(list(batch))
+        except Exception as e:
+            self.errors += 1
+            logging.warning("[BatchLoader] batch of %d keys failed: %s", len(batch), e)
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            latency = time.monotonic() - start
+            self.batches += 1
+            self.keys += len(batch)
+            self.max_seen_batch = max(self.max_seen_batch, len(batch))
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+
+# ─────────────────── mongo ─────────────────────────────────────────────────
+_loaders: Dict[Tuple[str, str], BatchLoader] = {}
+
+
+def collection_loader(collection: AsyncIOMotorCollection, field: str = "id") -> BatchLoader:
+    """The worker's loader for documents of `collection` looked up by `field` (one `$in` per batch)."""
+    name = (collection.full_name, field)
+    loader = _loaders.get(name)
+    if loader is None:
+
+        async def batch_fn(keys):
+            return {doc[field]: doc async for doc in collection.find({field: {"$in": keys}})}
+
+        loader = BatchLoader(
+            batch_fn,
+            window_ms=float(config.LOADER_WINDOW_MS),
+            max_batch_size=int(config.LOADER_MAX_BATCH_SIZE),
+        )
+        _loaders[name] = loader
+    return loader
+
+
+def reset_loaders() -> None:
+    """Forget every collection loader: they are bound to a client (and loop) that is being closed."""
+    _loaders.clear()
+
+
+def loader_stats() -> Dict[str, Dict[str, float]]:
+    """Metrics of every collection loader, keyed by `collection.field`."""
+    return {f"{name}.{field}": loader.stats() for (name, field), loader in _loaders.items()}
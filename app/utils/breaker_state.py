@@ -0,0 +1,260 @@
+# app/utils/breaker_state.py
+"""
+Cluster-wide circuit breaker state.
+
+Every worker keeps deciding locally (the call path never waits on the network),
+but trips and forced changes are published, and every other worker adopts them
+within milliseconds. An upstream that dies is cut off everywhere once any
+worker has seen enough failures. `force_open` / `force_close` from the admin
+routes reach every worker, not just the one serving the request.
+
+Only OPEN and CLOSED are shared. OPEN carries the time it tripped, so every
+worker goes HALF_OPEN together. HALF_OPEN and its trial calls stay local. The
+last published state of each breaker is also stored, so workers that start
+later, or that resubscribe after a Redis outage, begin from the current state.
+
+Backends
+--------
+redis : Redis keys + pub/sub, shared by every worker on every pod
+local : in-process stand-in with the same semantics; several coordinators on
+        one `LocalBreakerBackend` behave like separate workers (tests, single worker)
+
+Usage
+-----
+from app.utils.breaker_state import start_shared_breakers, stop_shared_breakers
+
+await start_shared_breakers()   # app lifespan; no-op unless CIRCUIT_BREAKER_SHARED_STATE is set
+...
+await stop_shared_breakers()
+
+Env Vars
+--------
+CIRCUIT_BREAKER_SHARED_STATE : "", "redis" or "local" (default "", breakers stay per worker)
+CIRCUIT_BREAKER_CHANNEL      : pub/sub channel and key prefix (default "cb:state")
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.settings.config import config
+from app.utils import circuit_breaker
+from app.utils.circuit_breaker import CircuitBreaker, CircuitBreakerState
+
+Message = Dict[str, Any]
+
+_SHARED = (CircuitBreakerState.OPEN, CircuitBreakerState.CLOSED)
+_STATE_TTL = 24 * 3600
+
+
+# ─────────────────── backends ──────────────────────────────────────────────
+class BreakerStateBackend(ABC):
+    @abstractmethod
+    async def publish(self, message: Message) -> None:
+        """Store `message` as the breaker's current state and broadcast it."""
+
+    @abstractmethod
+    async def snapshot(self) -> Dict[str, Message]:
+        """Last stored message of every breaker, keyed by breaker name."""
+
+    @abstractmethod
+    async def listen(self, on_subscribed: Callable[[], Awaitable[None]], on_message: Callable[[Message], None]) -> None:
+        """Subscribe, await `on_subscribed()`, then call `on_message` for every broadcast until cancelled."""
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalBreakerBackend(BreakerStateBackend):
+    def __init__(self):
+        self._states: Dict[str, Message] = {}
+        self._queues: Set[asyncio.Queue] = set()
+
+    async def publish(self, message):
+        self._states[message["name"]] = message
+        for queue in self._queues:
+            queue.put_nowait(message)
+
+    async def snapshot(self):
+        return dict(self._states)
+
+    async def listen(self, on_subscribed, on_message):
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.add(queue)
+        try:
+            await on_subscribed()
+            while True:
+                on_message(await queue.get())
+        finally:
+            self._queues.discard(queue)
+
+
+class RedisBreakerBackend(BreakerStateBackend):
+    def __init__(self, redis, channel: str = "cb:state"):
+        self.redis = redis
+        self.channel = channel
+
+    def _key(self, name: str) -> str:
+        return f"{self.channel}:{name}"
+
+    async def publish(self, message):
+        data = json.dumps(message)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(message["name"]), data, ex=_STATE_TTL)
+            pipe.publish(self.channel, data)
+            await pipe.execute()
+
+    async def snapshot(self):
+        keys = [key async for key in self.redis.scan_iter(match=f"{self.channel}:*", count=500)]
+        if not keys:
+            return {}
+        states = {}
+        for data in await self.redis.mget(keys):
+            if data is not None:
+                message = json.loads(data)
+                states[message["name"]] = message
+        return states
+
+    async def listen(self, on_subscribed, on_message):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.channel)
+            await on_subscribed()
+            async for raw in pubsub.listen():
+                on_message(json.loads(raw["data"]))
+        finally:
+            await pubsub.aclose()
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+# ─────────────────── coordinator ───────────────────────────────────────────
+class SharedBreakerState:
+    """Connects this worker's breakers to a backend."""
+
+    def __init__(self, backend: BreakerStateBackend):
+        self.backend = backend
+        self._origin = uuid.uuid4().hex
+        self._latest: Dict[str, Message] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._publishes = set()  # strong refs to in-flight publishes
+        self.published = 0
+        self.received = 0
+
+    async def start(self) -> None:
+        circuit_breaker.set_hooks(self._on_transition, self._on_create)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.ensure_future(self._listen())
+
+    async def stop(self) -> None:
+        circuit_breaker.set_hooks(None, None)
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.backend.close()
+
+    # ------------------------------------------------------------ internals
+    def _on_transition(self, breaker: CircuitBreaker) -> None:
+        state = breaker.current_state
+        if state not in _SHARED:
+            return
+        message = {
+            "origin": self._origin,
+            "name": breaker.name,
+            "state": state.name,
+            "opened_at": breaker.opened_at,
+            "at": time.time(),
+        }
+        self._latest[breaker.name] = message
+        task = asyncio.ensure_future(self._publish(message))
+        self._publishes.add(task)
+        task.add_done_callback(self._publishes.discard)
+
+    async def _publish(self, message: Message) -> None:
+        try:
+            await self.backend.publish(message)
+            self.published += 1
+        except Exception as e:
+            # the local breaker already changed state; other workers decide on their own
+            logging.warning("[CircuitBreaker] could not share %s → %s: %s", message["name"], message["state"], e)
+
+    def _on_create(self, breaker: CircuitBreaker) -> None:
+        message = self._latest.get(breaker.name)
+        if message is not None:
+            self._apply(breaker, message)
+
+    def _on_message(self, message: Message) -> None:
+        if message.get("origin") == self._origin:
+            return
+        self.received += 1
+        self._adopt(message)
+
+    def _adopt(self, message: Message) -> None:
+        current = self._latest.get(message["name"])
+        if current is not None and current["at"] > message["at"]:
+            return  # older than what we already know
+        self._latest[message["name"]] = message
+        for breaker in circuit_breaker.breakers():
+            if breaker.name == message["name"]:
+                self._apply(breaker, message)
+
+    @staticmethod
+    def _apply(breaker: CircuitBreaker, message: Message) -> None:
+        breaker.apply_shared(CircuitBreakerState[message["state"]], message["opened_at"])
+
+    async def _resync(self) -> None:
+        for message in (await self.backend.snapshot()).values():
+            if message.get("origin") != self._origin:
+                self._adopt(message)
+
+    async def _listen(self) -> None:
+        backoff = 0.1
+        while True:
+            try:
+                await self.backend.listen(self._resync, self._on_message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning("[CircuitBreaker] shared state listener error, resubscribing: %s", e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+            else:
+                backoff = 0.1
+
+
+# ─────────────────── wiring ────────────────────────────────────────────────
+_shared: Optional[SharedBreakerState] = None
+
+
+async def start_shared_breakers() -> Optional[SharedBreakerState]:
+    """Share breaker state through the backend named by CIRCUIT_BREAKER_SHARED_STATE (called from the app lifespan)."""
+    global _shared
+    kind = str(config.CIRCUIT_BREAKER_SHARED_STATE).lower()
+    if not kind or _shared is not None:
+        return _shared
+    if kind == "redis":
+        from redis.asyncio import from_url
+        backend: BreakerStateBackend = RedisBreakerBackend(from_url(config.REDIS_URL), config.CIRCUIT_BREAKER_CHANNEL)
+    elif kind == "local":
+        backend = LocalBreakerBackend()
+    else:
+        raise ValueError(f"Unknown CIRCUIT_BREAKER_SHARED_STATE '{kind}' (expected redis or local)")
+    _shared = SharedBreakerState(backend)
+    await _shared.start()
+    return _shared
+
+
+async def stop_shared_breakers() -> None:
+    global _shared
+    if _shared is not None:
+        await _shared.stop()
+        _shared = None
@@ -0,0 +1,146 @@
+# app/utils/bulkhead.py
+"""
+Async bulkhead: caps how many calls to one dependency are in flight.
+
+Usage
+-----
+from app.utils.bulkhead import bulkhead, BulkheadFullError
+
+# decorator
+@bulkhead("payments")
+async def charge(...):
+    ...
+
+# inline
+try:
+    data = await bulkhead("user-api").call(fetch_user, user_id)
+except BulkheadFullError:
+    ...  # fallback / 503
+
+Each bulkhead admits `max_concurrent` calls. Further calls wait in a FIFO queue
+of at most `max_queue` callers for up to `queue_timeout` seconds. A call that
+finds the queue full is rejected immediately, before anything is scheduled, so
+a slow upstream ties up a bounded number of coroutines (and Mongo / HTTP
+connections) instead of the whole worker.
+
+Combine it with timeouts, retries and a circuit breaker through
+`app.utils.resilience.policy`.
+
+Env Vars
+--------
+BULKHEAD_MAX_CONCURRENT       : calls in flight per bulkhead (default 10)
+BULKHEAD_MAX_QUEUE            : callers allowed to wait for a slot, 0 = reject at once (default 20)
+BULKHEAD_QUEUE_TIMEOUT_SECONDS: max wait for a slot (default 1)
+"""
+
+import asyncio
+from collections import deque
+from functools import wraps
+from typing import Any, Awaitable, Callable, Deque, Dict
+from app.settings.config import config
+
+# ─────────────────── configuration ─────────────────────────────────────────
+
+_MAX_CONCURRENT = int(config.BULKHEAD_MAX_CONCURRENT)
+_MAX_QUEUE      = int(config.BULKHEAD_MAX_QUEUE)
+_QUEUE_TIMEOUT  = float(config.BULKHEAD_QUEUE_TIMEOUT_SECONDS)
+
+class BulkheadFullError(RuntimeError):
+    """Raised when a bulkhead has no free slot and its queue is full, or the queue wait timed out."""
+
+# ─────────────────── core bulkhead class ───────────────────────────────────
+class Bulkhead:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # metrics
+        self._accepted = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    # ------------------------------------------------------------------ api
+    def __call__(self, fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """Decorator usage."""
+        if not asyncio.iscoroutinefunction(fn):
+            raise TypeError("Bulkhead supports async callables only")
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await self.call(fn, *args, **kwargs)
+
+        return wrapper
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs):
+        """Inline wrapper usage: await bulkhead.call(coro, *args)."""
+        await self.acquire()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            self.release()
+
+    async def acquire(self) -> None:
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            self._accepted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._rejected += 1
+            raise BulkheadFullError(f"Bulkhead {self.name} is full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise BulkheadFullError(f"Bulkhead {self.name}: no slot within {self.queue_timeout}s") from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over just as we were cancelled
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+        self._accepted += 1
+
+    def release(self) -> None:
+        # hand the slot straight to the oldest live waiter, so the count never drops below the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    # expose for introspection
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "accepted": self._accepted,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+        }
+
+# ─────────────────── factory/cache ─────────────────────────────────────────
+_bulkheads: Dict[str, Bulkhead] = {}
+
+def bulkhead(name: str) -> Bulkhead:
+    """Get a named bulkhead (creates once, re‑uses thereafter)."""
+    if name not in _bulkheads:
+        _bulkheads[name] = Bulkhead(name, _MAX_CONCURRENT, _MAX_QUEUE, _QUEUE_TIMEOUT)
+    return _bulkheads[name]
+
+def all_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every bulkhead created in this worker, keyed by name."""
+    return {name: b.metrics() for name, b in _bulkheads.items()}
@@ -2,23 +2,20 @@
 """
 Admin / test helpers for the circuit breaker.
 Importing this does NOT mutate core logic.
+With CIRCUIT_BREAKER_SHARED_STATE set, forced states reach every worker.
 """
 
-import time
-import logging
-from app.utils.circuit_breaker import cb, CircuitBreakerState
+from typing import Any, Dict
+from app.utils.circuit_breaker import cb
 
 def force_open(name: str) -> None:
-    brk = cb(name)
-    brk._state = CircuitBreakerState.OPEN          # type: ignore
-    brk._opened_at = time.time()
-    logging.warning("[CircuitBreaker] %s forced → OPEN", brk.name)
+    cb(name).force_open()   # logged by the breaker
 
 def force_close(name: str) -> None:
-    brk = cb(name)
-    brk._state = CircuitBreakerState.CLOSED        # type: ignore
-    brk._fail_counter = 0
-    logging.warning("[CircuitBreaker] %s forced → CLOSED", brk.name)
+    cb(name).force_close()
 
 def state(name: str) -> str:
     return cb(name).current_state.name
+
+def metrics(name: str) -> Dict[str, Any]:
+    return cb(name).metrics()
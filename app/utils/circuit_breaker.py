@@ -17,27 +17,58 @@ try:
 except CircuitBreakerError:
     ...  # fallback / 503
 
+cb("user-api").metrics()   # state, window rates, calls, rejections, transitions, latency
+
+How it trips
+------------
+Outcomes are counted in a sliding window of `window` seconds split into time
+buckets, so old failures age out. The breaker opens when, within the window,
+at least `fail_max` calls failed and the failure rate reaches `failure_rate`,
+or at least `fail_max` calls were slower than `slow_call_seconds` and the
+slow-call rate reaches `slow_call_rate`. After `reset_timeout` seconds OPEN it
+goes HALF_OPEN and admits only `half_open_calls` concurrent trial calls: one
+failure re-opens it, `half_open_calls` successes close it.
+
+All state changes happen without awaiting, so they are atomic on the event
+loop and need no lock: a call on a CLOSED breaker costs one state check and
+one bucket update.
+
+Breakers are per worker. With CIRCUIT_BREAKER_SHARED_STATE set, trips and
+forced changes are also shared with every other worker and pod (see
+app/utils/breaker_state.py), without touching the call path.
+
 Env Vars
 --------
-CB_FAIL_MAX       : max consecutive failures before opening (default 5)
-CB_RESET_TIMEOUT  : seconds breaker stays OPEN (default 30)
-CB_NAME_PREFIX    : prefix in logs (default "cb")
+CIRCUIT_BREAKER_FAIL_MAX_COUNT     : min failed (or slow) calls in the window before opening (default 3)
+CIRCUIT_BREAKER_RESET_TIMEOUT      : seconds breaker stays OPEN (default 30)
+CIRCUIT_BREAKER_PREFIX_NAME        : prefix in logs (default "cb")
+CIRCUIT_BREAKER_WINDOW_SECONDS     : length of the sliding window (default 60)
+CIRCUIT_BREAKER_WINDOW_BUCKETS     : number of time buckets in the window (default 10)
+CIRCUIT_BREAKER_FAILURE_RATE       : failure rate that opens the breaker (default 0.5)
+CIRCUIT_BREAKER_SLOW_CALL_SECONDS  : calls slower than this count as slow, 0 disables (default 0)
+CIRCUIT_BREAKER_SLOW_CALL_RATE     : slow-call rate that opens the breaker (default 1.0)
+CIRCUIT_BREAKER_HALF_OPEN_CALLS    : trial calls admitted while HALF_OPEN (default 1)
 """
 
 import asyncio
 import logging
-import os
 import time
 from enum import Enum, auto
 from functools import wraps
-from typing import Awaitable, Callable, Any, Dict
+from typing import Awaitable, Callable, Any, Dict, List, Optional
 from app.settings.config import config
 
 # ─────────────────── configuration ─────────────────────────────────────────
 
-_FAIL_MAX      = int(config.CIRCUIT_BREAKER_FAIL_MAX_COUNT)
-_RESET_TIMEOUT = int(config.CIRCUIT_BREAKER_RESET_TIMEOUT)
-_PREFIX        = config.CIRCUIT_BREAKER_PREFIX_NAME
+_FAIL_MAX          = int(config.CIRCUIT_BREAKER_FAIL_MAX_COUNT)
+_RESET_TIMEOUT     = int(config.CIRCUIT_BREAKER_RESET_TIMEOUT)
+_PREFIX            = config.CIRCUIT_BREAKER_PREFIX_NAME
+_WINDOW            = float(config.CIRCUIT_BREAKER_WINDOW_SECONDS)
+_BUCKETS           = int(config.CIRCUIT_BREAKER_WINDOW_BUCKETS)
+_FAILURE_RATE      = float(config.CIRCUIT_BREAKER_FAILURE_RATE)
+_SLOW_CALL_SECONDS = float(config.CIRCUIT_BREAKER_SLOW_CALL_SECONDS)
+_SLOW_CALL_RATE    = float(config.CIRCUIT_BREAKER_SLOW_CALL_RATE)
+_HALF_OPEN_CALLS   = int(config.CIRCUIT_BREAKER_HALF_OPEN_CALLS)
 
 # ─────────────────── states ────────────────────────────────────────────────
 class CircuitBreakerState(Enum):
@@ -46,18 +77,79 @@ class CircuitBreakerState(Enum):
     HALF_OPEN = auto()
 
 class CircuitBreakerError(RuntimeError):
-    """Raised when the circuit is OPEN."""
+    """Raised when the circuit is OPEN (or HALF_OPEN with every trial slot taken)."""
+
+# ─────────────────── sliding window ────────────────────────────────────────
+class SlidingWindow:
+    """Call outcomes of the last `window` seconds in `buckets` time buckets."""
+
+    def __init__(self, window: float, buckets: int):
+        self.buckets = max(1, buckets)
+        self.width = window / self.buckets
+        # per bucket: [bucket epoch, calls, failures, slow calls]
+        self._data: List[List[int]] = [[-1, 0, 0, 0] for _ in range(self.buckets)]
+
+    def record(self, failed: bool, slow: bool, now: float) -> None:
+        epoch = int(now / self.width)
+        bucket = self._data[epoch % self.buckets]
+        if bucket[0] != epoch:
+            bucket[0], bucket[1], bucket[2], bucket[3] = epoch, 0, 0, 0
+        bucket[1] += 1
+        bucket[2] += failed
+        bucket[3] += slow
+
+    def totals(self, now: float):
+        """(calls, failures, slow calls) over the buckets still inside the window."""
+        oldest = int(now / self.width) - self.buckets + 1
+        calls = failures = slow = 0
+        for epoch, c, f, s in self._data:
+            if epoch >= oldest:
+                calls += c
+                failures += f
+                slow += s
+        return calls, failures, slow
+
+    def reset(self) -> None:
+        for bucket in self._data:
+            bucket[0], bucket[1], bucket[2], bucket[3] = -1, 0, 0, 0
 
 # ─────────────────── core breaker class ────────────────────────────────────
 class CircuitBreaker:
-    def __init__(self, name: str, fail_max: int, reset_timeout: int):
+    def __init__(
+        self,
+        name: str,
+        fail_max: int,
+        reset_timeout: int,
+        *,
+        window: float = 60.0,
+        buckets: int = 10,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 0.0,
+        slow_call_rate: float = 1.0,
+        half_open_calls: int = 1,
+    ):
         self.name = name
         self.fail_max = fail_max
         self.reset_timeout = reset_timeout
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.half_open_calls = max(1, half_open_calls)
+        self._window = SlidingWindow(window, buckets)
         self._state = CircuitBreakerState.CLOSED
-        self._fail_counter = 0
         self._opened_at = 0.0
-        self._lock = asyncio.Lock()
+        # bumped on every transition: outcomes of calls admitted under an older state are not acted on
+        self._generation = 0
+        self._trials = 0
+        self._trial_successes = 0
+        # metrics
+        self._calls = 0
+        self._failures = 0
+        self._slow_calls = 0
+        self._rejections = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._transitions: Dict[str, int] = {}
 
     # ------------------------------------------------------------------ api
     def __call__(self, fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
@@ -73,57 +165,163 @@ class CircuitBreaker:
 
     async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs):
         """Inline wrapper usage: await breaker.call(coro, *args)."""
-        await self._pre_execute()
+        trial = False
+        if self._state is not CircuitBreakerState.CLOSED:
+            trial = self._admit()
+        generation = self._generation
+        start = time.monotonic()
         try:
             result = await fn(*args, **kwargs)
         except Exception:
-            await self._record_failure()
+            self._record(generation, start, failed=True)
             raise
-        await self._record_success()
-        return result
+        else:
+            self._record(generation, start, failed=False)
+            return result
+        finally:
+            if trial:
+                self._trials -= 1
+
+    def force_open(self) -> None:
+        self._transition(CircuitBreakerState.OPEN, "forced")
+
+    def force_close(self) -> None:
+        self._transition(CircuitBreakerState.CLOSED, "forced")
 
     # ---------------------------------------------------------------- state
-    async def _pre_execute(self):
-        async with self._lock:
-            if self._state is CircuitBreakerState.OPEN:
-                if (time.time() - self._opened_at) >= self.reset_timeout:
-                    # move to HALF‑OPEN for trial
-                    self._state = CircuitBreakerState.HALF_OPEN
-                    logging.warning("[%s] OPEN → HALF_OPEN", self.name)
-                else:
-                    raise CircuitBreakerError(f"Circuit {self.name} is OPEN")
-            # else CLOSED or HALF_OPEN: allow execution
-
-    async def _record_failure(self):
-        async with self._lock:
-            self._fail_counter += 1
-            if self._fail_counter >= self.fail_max:
-                self._state = CircuitBreakerState.OPEN
-                self._opened_at = time.time()
-                logging.error("[%s] CLOSED/HALF_OPEN → OPEN (failures=%s)",
-                              self.name, self._fail_counter)
-
-    async def _record_success(self):
-        async with self._lock:
-            if self._state in (CircuitBreakerState.HALF_OPEN, CircuitBreakerState.OPEN):
-                logging.info("[%s] %s → CLOSED", self.name, self._state.name)
-            self._state = CircuitBreakerState.CLOSED
-            self._fail_counter = 0
+    def _admit(self) -> bool:
+        """Admission while not CLOSED. Returns True for a half-open trial call, raises when rejected."""
+        if self._state is CircuitBreakerState.OPEN:
+            if time.time() - self._opened_at < self.reset_timeout:
+                self._rejections += 1
+                raise CircuitBreakerError(f"Circuit {self.name} is OPEN")
+            self._transition(CircuitBreakerState.HALF_OPEN, "reset timeout elapsed")
+        if self._trials >= self.half_open_calls:
+            self._rejections += 1
+            raise CircuitBreakerError(f"Circuit {self.name} is HALF_OPEN and its trial calls are taken")
+        self._trials += 1
+        return True
+
+    def _record(self, generation: int, start: float, failed: bool) -> None:
+        latency = time.monotonic() - start
+        slow = self.slow_call_seconds > 0 and latency >= self.slow_call_seconds
+        self._calls += 1
+        self._failures += failed
+        self._slow_calls += slow
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+        if generation != self._generation:
+            return  # admitted before the last transition
+
+        if self._state is CircuitBreakerState.HALF_OPEN:
+            if failed or slow:
+                self._transition(CircuitBreakerState.OPEN, "trial call failed" if failed else "trial call slow")
+            else:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self._transition(CircuitBreakerState.CLOSED, "trial calls succeeded")
+            return
+
+        now = time.time()
+        self._window.record(failed, slow, now)
+        if failed or slow:
+            calls, failures, slow_calls = self._window.totals(now)
+            if failures >= self.fail_max and failures / calls >= self.failure_rate:
+                self._transition(CircuitBreakerState.OPEN, f"failure rate {failures}/{calls}")
+            elif slow_calls >= self.fail_max and slow_calls / calls >= self.slow_call_rate:
+                self._transition(CircuitBreakerState.OPEN, f"slow-call rate {slow_calls}/{calls}")
+
+    def apply_shared(self, state: CircuitBreakerState, opened_at: float) -> None:
+        """Adopt a state another worker published (not published again)."""
+        if state is self._state and (state is not CircuitBreakerState.OPEN or opened_at == self._opened_at):
+            return
+        self._transition(state, "shared state", publish=False)
+        if state is CircuitBreakerState.OPEN:
+            # keep the reset timeout aligned with the worker that tripped
+            self._opened_at = opened_at
+
+    def _transition(self, state: CircuitBreakerState, reason: str, publish: bool = True) -> None:
+        previous = self._state
+        self._state = state
+        self._generation += 1
+        self._trial_successes = 0
+        if state is CircuitBreakerState.OPEN:
+            self._opened_at = time.time()
+        if state is not CircuitBreakerState.HALF_OPEN:
+            self._window.reset()
+        key = f"{previous.name}->{state.name}"
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        log = logging.error if state is CircuitBreakerState.OPEN else logging.warning
+        log("[%s] %s → %s (%s)", self.name, previous.name, state.name, reason)
+        if publish and _on_transition is not None:
+            _on_transition(self)
 
     # expose for introspection
     @property
     def current_state(self) -> CircuitBreakerState:
         return self._state
 
+    @property
+    def opened_at(self) -> float:
+        return self._opened_at
+
+    def metrics(self) -> Dict[str, Any]:
+        calls, failures, slow = self._window.totals(time.time())
+        return {
+            "name": self.name,
+            "state": self._state.name,
+            "window": {
+                "calls": calls,
+                "failure_rate": round(failures / calls, 4) if calls else 0.0,
+                "slow_call_rate": round(slow / calls, 4) if calls else 0.0,
+            },
+            "calls": self._calls,
+            "failures": self._failures,
+            "slow_calls": self._slow_calls,
+            "rejections": self._rejections,
+            "transitions": dict(self._transitions),
+            "avg_latency_ms": round(self._latency_total / self._calls * 1000, 3) if self._calls else 0.0,
+            "max_latency_ms": round(self._latency_max * 1000, 3),
+        }
+
 # ─────────────────── factory/cache ─────────────────────────────────────────
 _breakers: Dict[str, CircuitBreaker] = {}
 
+# shared-state hooks (app/utils/breaker_state.py); both must return without awaiting
+_on_transition: Optional[Callable[[CircuitBreaker], None]] = None
+_on_create: Optional[Callable[[CircuitBreaker], None]] = None
+
+def set_hooks(on_transition: Optional[Callable[[CircuitBreaker], None]],
+              on_create: Optional[Callable[[CircuitBreaker], None]]) -> None:
+    """Called with a breaker after each local state change / when a breaker is created."""
+    global _on_transition, _on_create
+    _on_transition, _on_create = on_transition, on_create
+
+def breakers() -> List[CircuitBreaker]:
+    return list(_breakers.values())
+
 def _make(name: str) -> CircuitBreaker:
     full = f"{_PREFIX}:{name}"
-    return CircuitBreaker(full, _FAIL_MAX, _RESET_TIMEOUT)
+    return CircuitBreaker(
+        full,
+        _FAIL_MAX,
+        _RESET_TIMEOUT,
+        window=_WINDOW,
+        buckets=_BUCKETS,
+        failure_rate=_FAILURE_RATE,
+        slow_call_seconds=_SLOW_CALL_SECONDS,
+        slow_call_rate=_SLOW_CALL_RATE,
+        half_open_calls=_HALF_OPEN_CALLS,
+    )
 
 def cb(name: str) -> CircuitBreaker:
     """Get a named circuit breaker (creates once, re‑uses thereafter)."""
     if name not in _breakers:
         _breakers[name] = _make(name)
+        if _on_create is not None:
+            _on_create(_breakers[name])
     return _breakers[name]
+
+def all_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every breaker created in this worker, keyed by name."""
+    return {name: breaker.metrics() for name, breaker in _breakers.items()}
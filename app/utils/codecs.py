@@ -0,0 +1,198 @@
+# app/utils/codecs.py
+"""
+Binary codecs for cached values.
+
+Every encoded value starts with a 4 byte header:
+
+    magic (0xAC) | header version | codec id | compression id
+
+so the decoder always knows how a value was written. Changing CACHING_CODEC or
+CACHING_COMPRESSION therefore never requires flushing the cache: old entries
+keep decoding with the codec that wrote them. Values without the header are
+read as the plain JSON written before codecs existed.
+
+Codecs (all round-trip ObjectId, datetime and Decimal128)
+------
+json    : stdlib JSON with `$oid` / `$date` / `$decimal` / `$binary` tags
+msgpack : msgpack with extension types (needs `msgpack`)
+bson    : BSON from pymongo, always available (datetimes kept to the millisecond, like Mongo)
+
+Compression (applied only above `threshold` bytes, and only when it helps)
+-----------
+none, zlib, lz4 (needs `lz4`)
+"""
+
+import base64
+import datetime
+import json
+import struct
+import zlib
+from typing import Any, Callable, Dict, Tuple
+
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.decimal128 import Decimal128
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # msgpack codec unavailable
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None  # lz4 compression unavailable
+
+MAGIC = 0xAC
+HEADER_VERSION = 1
+_HEADER = struct.Struct("BBBB")
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=datetime.timezone.utc)
+
+
+class CodecError(ValueError):
+    """Raised when a value cannot be encoded/decoded with the requested codec."""
+
+
+# ─────────────────── json ──────────────────────────────────────────────────
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return {"$oid": str(obj)}
+    if isinstance(obj, datetime.datetime):
+        return {"$date": obj.isoformat()}
+    if isinstance(obj, Decimal128):
+        return {"$decimal": str(obj)}
+    if isinstance(obj, bytes):
+        return {"$binary": base64.b64encode(obj).decode()}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        (tag, value), = obj.items()
+        if tag == "$oid":
+            return ObjectId(value)
+        if tag == "$date":
+            return datetime.datetime.fromisoformat(value)
+        if tag == "$decimal":
+            return Decimal128(value)
+        if tag == "$binary":
+            return base64.b64decode(value)
+    return obj
+
+
+def _json_encode(value: Any) -> bytes:
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+
+def _json_decode(data: bytes) -> Any:
+    return json.loads(data, object_hook=_json_hook)
+
+
+# ─────────────────── msgpack ───────────────────────────────────────────────
+_EXT_OBJECTID = 1
+_EXT_DATETIME = 2
+_EXT_DECIMAL128 = 3
+_DATETIME = struct.Struct(">qB")  # microseconds since epoch, tz-aware flag
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return msgpack.ExtType(_EXT_OBJECTID, obj.binary)
+    if isinstance(obj, datetime.datetime):
+        # Mongo hands out naive UTC datetimes; keep naive/aware as it was
+        aware = obj.tzinfo is not None
+        delta = obj - (_EPOCH_UTC if aware else _EPOCH)
+        micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+        return msgpack.ExtType(_EXT_DATETIME, _DATETIME.pack(micros, aware))
+    if isinstance(obj, Decimal128):
+        return msgpack.ExtType(_EXT_DECIMAL128, obj.bid)
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_OBJECTID:
+        return ObjectId(data)
+    if code == _EXT_DATETIME:
+        micros, aware = _DATETIME.unpack(data)
+        return (_EPOCH_UTC if aware else _EPOCH) + datetime.timedelta(microseconds=micros)
+    if code == _EXT_DECIMAL128:
+        return Decimal128.from_bid(data)
+    return msgpack.ExtType(code, data)
+
+
+def _msgpack_encode(value: Any) -> bytes:
+    return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+
+
+def _msgpack_decode(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+
+
+# ─────────────────── bson ──────────────────────────────────────────────────
+_BSON_OPTIONS = CodecOptions(tz_aware=False)
+
+
+def _bson_encode(value: Any) -> bytes:
+    # BSON documents must be mappings, so every value is wrapped
+    return bson.encode({"v": value})
+
+
+def _bson_decode(data: bytes) -> Any:
+    return bson.decode(data, codec_options=_BSON_OPTIONS)["v"]
+
+
+# ─────────────────── registries ────────────────────────────────────────────
+Codec = Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]
+
+CODECS: Dict[str, Tuple[int, Codec]] = {
+    "json": (1, (_json_encode, _json_decode)),
+    "bson": (3, (_bson_encode, _bson_decode)),
+}
+if msgpack is not None:
+    CODECS["msgpack"] = (2, (_msgpack_encode, _msgpack_decode))
+
+COMPRESSIONS: Dict[str, Tuple[int, Codec]] = {
+    "none": (0, (bytes, bytes)),
+    "zlib": (1, (lambda data: zlib.compress(data, 1), zlib.decompress)),
+}
+if lz4_frame is not None:
+    COMPRESSIONS["lz4"] = (2, (lz4_frame.compress, lz4_frame.decompress))
+
+_CODECS_BY_ID = {codec_id: codec for codec_id, codec in CODECS.values()}
+_COMPRESSIONS_BY_ID = {comp_id: comp for comp_id, comp in COMPRESSIONS.values()}
+
+
+class CacheCodec:
+    def __init__(self, codec: str = "msgpack", compression: str = "none", threshold: int = 1024):
+        if codec not in CODECS:
+            raise CodecError(f"Cache codec '{codec}' is unknown or its package is not installed.")
+        if compression not in COMPRESSIONS:
+            raise CodecError(f"Cache compression '{compression}' is unknown or its package is not installed.")
+        self.codec_id, (self._encode, _) = CODECS[codec]
+        self.compression_id, (self._compress, _) = COMPRESSIONS[compression]
+        self.threshold = threshold
+
+    def encode(self, value: Any) -> bytes:
+        data = self._encode(value)
+        compression_id = 0
+        if self.compression_id and len(data) >= self.threshold:
+            compressed = self._compress(data)
+            if len(compressed) < len(data):
+                data, compression_id = compressed, self.compression_id
+        return _HEADER.pack(MAGIC, HEADER_VERSION, self.codec_id, compression_id) + data
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        if len(data) < _HEADER.size or data[0] != MAGIC:
+            # written before codecs existed
+            return json.loads(data)
+        _, version, codec_id, compression_id = _HEADER.unpack_from(data)
+        if version != HEADER_VERSION or codec_id not in _CODECS_BY_ID or compression_id not in _COMPRESSIONS_BY_ID:
+            raise CodecError(f"Unsupported cache value header {data[:_HEADER.size]!r}")
+        payload = data[_HEADER.size:]
+        if compression_id:
+            payload = _COMPRESSIONS_BY_ID[compression_id][1](payload)
+        return _CODECS_BY_ID[codec_id][1](payload)
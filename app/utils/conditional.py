@@ -0,0 +1,51 @@
+# app/utils/conditional.py
+"""
+Conditional GET helpers (ETag / If-None-Match / 304).
+
+ETags are a hash of the JSON representation of a value, so they change exactly
+when the response body would. Any route can use them:
+
+from app.utils.conditional import conditional_response
+
+@router.get("/api/thing/{id}")
+async def get_thing(id: str, request: Request):
+    thing = await load_thing(id)
+    return conditional_response(request, thing)
+
+Routes cached with `route_cache(..., etag=True)` store the ETag next to the
+value, so a matching `If-None-Match` is answered with a 304 straight from the
+cache without running the endpoint.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+from app.utils.fast_json import FastJSONResponse, dumps
+
+
+def etag_for(value: Any) -> str:
+    """Strong ETag of the JSON representation of `value` (or of an already serialized body)."""
+    body = value if isinstance(value, bytes) else dumps(value, sort_keys=True)
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True when the client's If-None-Match header matches `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def conditional_response(request: Request, value: Any, etag: Optional[str] = None) -> Response:
+    """A 304 without body when the client already has `value`, else the JSON with its ETag."""
+    etag = etag or etag_for(value)
+    if if_none_match(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return FastJSONResponse(value, headers={"ETag": etag})
@@ -0,0 +1,53 @@
+# app/utils/cpu_pool.py
+"""
+Bounded thread pool for CPU-heavy calls that would otherwise block the event loop.
+
+While a coroutine runs CPU-bound code (RS256 signature checks, hashing, large
+(de)serialization), every other request on the worker waits. Running it on a
+small pool lets the loop keep serving I/O in between: the interpreter switches
+threads every few milliseconds, and native code that releases the GIL runs fully
+in parallel. The pool is small on purpose, so a burst cannot start more threads
+than there are cores to run them.
+
+Usage
+-----
+from app.utils.cpu_pool import run_cpu_bound
+
+payload = await run_cpu_bound(decode, token, key, algorithms=["RS256"])
+
+Env Vars
+--------
+CPU_POOL_THREADS : threads in the pool (default 2)
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from app.settings.config import config
+
+_THREADS = int(config.CPU_POOL_THREADS)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """The worker's pool, created on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_THREADS, thread_name_prefix="cpu-pool")
+    return _executor
+
+
+async def run_cpu_bound(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run `fn(*args, **kwargs)` on the pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), partial(fn, *args, **kwargs))
+
+
+def shutdown_cpu_pool() -> None:
+    """Wait for running calls and stop the threads (called from the app lifespan)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
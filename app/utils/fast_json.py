@@ -0,0 +1,62 @@
+# app/utils/fast_json.py
+"""
+Fast JSON serialization for Mongo documents.
+
+`dumps` is built on orjson and writes `ObjectId` and `Decimal128` as strings
+and `datetime` as ISO 8601, so documents can be returned exactly as Motor hands
+them out, without patching `_id` by hand. It falls back to the stdlib `json`
+(same output) when orjson is not installed.
+
+`FastJSONResponse` is the app's default response class. Returning one from a
+route skips FastAPI's `jsonable_encoder` pass entirely:
+
+from app.utils.fast_json import FastJSONResponse
+
+@router.get("/api/thing/{id}")
+async def get_thing(id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    return FastJSONResponse(await db.things.find_one({"id": id}))
+
+Content that is already `bytes` is taken as serialized JSON and sent as is, so
+a cached body goes to the client without being decoded and re-encoded.
+"""
+
+import datetime
+import decimal
+import json
+from typing import Any
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # stdlib json fallback
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (ObjectId, Decimal128, decimal.Decimal)):
+        return str(obj)
+    if orjson is None and isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(value: Any, *, sort_keys: bool = False) -> bytes:
+    """Serialize `value` to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(value, default=_default, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            # pre-serialized body (e.g. from the cache)
+            return bytes(content)
+        return dumps(content)
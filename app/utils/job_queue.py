@@ -0,0 +1,653 @@
+# app/utils/job_queue.py
+"""
+Durable async job queue with a bounded worker pool.
+
+Jobs are named coroutine functions (handlers) called with JSON-serializable
+arguments. Enqueueing stores a job record and returns at once; a `WorkerPool`
+claims due jobs, highest priority first (FIFO within a priority), runs at most
+`concurrency` of them at a time and records the outcome on the job:
+
+queued ──claim──▶ running ──▶ succeeded
+   ▲                 │
+   └──retry (backoff)┤
+                     └──────▶ failed   (after `max_attempts`)
+
+- retries: a handler that raises is retried after a full-jitter exponential
+  backoff (`backoff_delay`) until it has run `max_attempts` times
+- idempotency keys: enqueueing again with the key of a job that is still known
+  returns that job instead of creating a new one
+- leases: a claimed job is leased for `timeout + 30s`. A job whose worker died
+  (recycled or crashed process) is handed to another worker once its lease
+  expires, so delivery is at-least-once: handlers should be idempotent. Jobs
+  cut short by a graceful `stop()` go back to the queue at once, and that run
+  does not count towards `max_attempts`. Each claim gets a new lease token and
+  only its holder can record the outcome, so a worker that outlived its lease
+  cannot overwrite the run that replaced it.
+- finished jobs (and their idempotency keys) are kept for `result_ttl` seconds
+
+Stores
+------
+MemoryJobStore : in-process, for tests and local development (lost with the process)
+RedisJobStore  : sorted sets + one hash per job, every state change in one Lua script;
+                 shared by the API workers and any number of worker processes
+
+Usage
+-----
+queue = JobQueue(MemoryJobStore(result_ttl=3600))
+
+@queue.task
+async def send_email(to: str):
+    ...
+
+job = await queue.enqueue(send_email, "a@b.c", priority=5, idempotency_key="welcome:a@b.c")
+await queue.get(job["id"])      # {"status": "queued", "attempts": 0, ...}
+
+pool = WorkerPool(queue, concurrency=4)
+await pool.start()
+...
+await pool.stop(grace=10)
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
+
+from app.utils.fast_json import dumps, loads
+from app.utils.metrics import Counter, Histogram
+from app.utils.resilience import backoff_delay
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+# extra lease time on top of the job timeout before a job counts as abandoned
+_LEASE_MARGIN = 30
+
+JOBS = Counter("jobs_total", "Job runs by handler and outcome (succeeded, retried, failed).", ("name", "outcome"))
+JOB_DURATION = Histogram("job_duration_seconds", "Job run time in seconds, by handler.", ("name",),
+                         buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300))
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+def _new_job(name: str, args: list, kwargs: dict, priority: int, run_at: float,
+             idempotency_key: Optional[str], max_attempts: int) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "name": name,
+        "args": args,
+        "kwargs": kwargs,
+        "priority": priority,
+        "idempotency_key": idempotency_key,
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "enqueued_at": now,
+        "run_at": max(now, run_at),
+        "started_at": None,
+        "finished_at": None,
+        "error": None,
+        "result": None,
+        "lease_token": None,
+    }
+
+
+class BaseJobStore(ABC):
+    @abstractmethod
+    async def enqueue(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Store `job`, or return the known job holding the same idempotency key."""
+        pass
+
+    @abstractmethod
+    async def claim(self, lease: float) -> Optional[Dict[str, Any]]:
+        """
+        Lease the next due job for `lease` seconds and mark it running, or return None.
+        The job's `lease_token` must be passed back to `complete`, `retry` or `fail`.
+        """
+        pass
+
+    @abstractmethod
+    async def complete(self, job_id: str, lease_token: str, result: Any) -> None:
+        pass
+
+    @abstractmethod
+    async def retry(self, job_id: str, lease_token: str, error: str, run_at: float,
+                    count_attempt: bool = True) -> None:
+        """
+        Put a running job back in the queue, due at `run_at`. With `count_attempt=False`
+        the run that was cut short does not count towards `max_attempts`.
+        """
+        pass
+
+    @abstractmethod
+    async def fail(self, job_id: str, lease_token: str, error: str) -> None:
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """Jobs waiting (due or delayed) and running."""
+        pass
+
+    async def close(self) -> None:
+        """Release connections held by the store."""
+
+
+class MemoryJobStore(BaseJobStore):
+    """
+    In-process store. Due jobs sit in a heap ordered by (priority, arrival), delayed
+    ones (retries) in a heap ordered by due time. No method awaits, so each one is
+    atomic on the event loop.
+    """
+
+    def __init__(self, result_ttl: float = 3600):
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._ready: List[Tuple[int, int, str]] = []     # (-priority, seq, id)
+        self._delayed: List[Tuple[float, int, str]] = []  # (run_at, seq, id)
+        self._running: Dict[str, float] = {}              # id -> lease expiry
+        self._keys: Dict[str, str] = {}                   # idempotency key -> id
+        self._finished: Deque[Tuple[float, str]] = deque()
+        self._seq = itertools.count()
+
+    def _schedule(self, job: Dict[str, Any], now: float) -> None:
+        job["status"] = QUEUED
+        if job["run_at"] > now:
+            heapq.heappush(self._delayed, (job["run_at"], next(self._seq), job["id"]))
+        else:
+            heapq.heappush(self._ready, (-job["priority"], next(self._seq), job["id"]))
+
+    def _finish(self, job: Dict[str, Any], status: str, now: float) -> None:
+        job["status"] = status
+        job["finished_at"] = now
+        self._finished.append((now + self.result_ttl, job["id"]))
+
+    def _sweep(self, now: float) -> None:
+        while self._finished and self._finished[0][0] <= now:
+            job = self._jobs.pop(self._finished.popleft()[1], None)
+            if job is not None and job["idempotency_key"] is not None:
+                self._keys.pop(job["idempotency_key"], None)
+
+    async def enqueue(self, job):
+        now = time.time()
+        self._sweep(now)
+        key = job["idempotency_key"]
+        if key is not None and key in self._keys:
+            return dict(self._jobs[self._keys[key]])
+        self._jobs[job["id"]] = job
+        if key is not None:
+            self._keys[key] = job["id"]
+        self._schedule(job, now)
+        return dict(job)
+
+    async def claim(self, lease):
+        now = time.time()
+        self._sweep(now)
+        while self._delayed and self._delayed[0][0] <= now:
+            _, seq, job_id = heapq.heappop(self._delayed)
+            heapq.heappush(self._ready, (-self._jobs[job_id]["priority"], seq, job_id))
+        for job_id, expires in list(self._running.items()):
+            if expires <= now:
+                # the worker running it is gone
+                del self._running[job_id]
+                job = self._jobs[job_id]
+                if job["attempts"] >= job["max_attempts"]:
+                    job["error"] = "lease expired"
+                    self._finish(job, FAILED, now)
+                else:
+                    self._schedule(job, now)
+        if not self._ready:
+            return None
+        job = self._jobs[heapq.heappop(self._ready)[2]]
+        job["status"] = RUNNING
+        job["attempts"] += 1
+        job["started_at"] = now
+        job["lease_token"] = uuid.uuid4().hex
+        self._running[job["id"]] = now + lease
+        return dict(job)
+
+    def _release(self, job_id: str, lease_token: str) -> Optional[Dict[str, Any]]:
+        # the lease expired: the job was requeued or failed, or another worker claimed it since
+        job = self._jobs.get(job_id)
+        if job_id not in self._running or job is None or job["lease_token"] != lease_token:
+            return None
+        del self._running[job_id]
+        job["lease_token"] = None
+        return job
+
+    async def complete(self, job_id, lease_token, result):
+        job = self._release(job_id, lease_token)
+        if job is not None:
+            job["result"] = result
+            job["error"] = None
+            self._finish(job, SUCCEEDED, time.time())
+
+    async def retry(self, job_id, lease_token, error, run_at, count_attempt=True):
+        job = self._release(job_id, lease_token)
+        if job is not None:
+            if not count_attempt:
+                job["attempts"] -= 1
+            job["error"] = error
+            job["run_at"] = run_at
+            self._schedule(job, time.time())
+
+    async def fail(self, job_id, lease_token, error):
+        job = self._release(job_id, lease_token)
+        if job is not None:
+            job["error"] = error
+            self._finish(job, FAILED, time.time())
+
+    async def get(self, job_id):
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def counts(self):
+        return {"queued": len(self._ready) + len(self._delayed), "running": len(self._running)}
+
+
+class RedisJobStore(BaseJobStore):
+    """
+    Redis store: `<prefix>:ready` (score: priority, then arrival), `<prefix>:delayed`
+    (score: due time) and `<prefix>:running` (score: lease expiry) sorted sets of job
+    ids, a `<prefix>:job:<id>` hash per job and `<prefix>:idem:<key>` pointers. Finished
+    jobs and their keys expire after `result_ttl`.
+    """
+
+    # ready-set score: higher priority first, then arrival time (seconds fit below 1e11)
+    PRIORITY_WEIGHT = 1e11
+
+    # KEYS: job, ready, delayed, idempotency pointer
+    # ARGV: id, has idempotency key, now, run_at, ready score, then field / value pairs
+    ENQUEUE_LUA = """
+    if ARGV[2] == '1' then
+        local existing = redis.call('GET', KEYS[4])
+        if existing then
+            return existing
+        end
+        redis.call('SET', KEYS[4], ARGV[1])
+    end
+    redis.call('HSET', KEYS[1], unpack(ARGV, 6))
+    if tonumber(ARGV[4]) > tonumber(ARGV[3]) then
+        redis.call('ZADD', KEYS[3], ARGV[4], ARGV[1])
+    else
+        redis.call('ZADD', KEYS[2], ARGV[5], ARGV[1])
+    end
+    return ARGV[1]
+    """
+
+    # KEYS: ready, delayed, running
+    # ARGV: now, lease, key prefix, result ttl, priority weight, lease token
+    CLAIM_LUA = """
+    local now = tonumber(ARGV[1])
+    local prefix = ARGV[3]
+    local function ready(id)
+        local priority = tonumber(redis.call('HGET', prefix .. ':job:' .. id, 'priority') or 0)
+        redis.call('HSET', prefix .. ':job:' .. id, 'status', 'queued')
+        redis.call('ZADD', KEYS[1], -priority * tonumber(ARGV[5]) + now, id)
+    end
+    for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now, 'LIMIT', 0, 100)) do
+        redis.call('ZREM', KEYS[2], id)
+        ready(id)
+    end
+    -- leases that expired: the worker running the job is gone
+    for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now, 'LIMIT', 0, 100)) do
+        redis.call('ZREM', KEYS[3], id)
+        local key = prefix .. ':job:' .. id
+        local state = redis.call('HMGET', key, 'attempts', 'max_attempts', 'idempotency_key')
+        if tonumber(state[1] or 0) >= tonumber(state[2] or 1) then
+            redis.call('HSET', key, 'status', 'failed', 'error', 'lease expired', 'finished_at', now)
+            redis.call('EXPIRE', key, ARGV[4])
+            if state[3] and state[3] ~= '' then
+                redis.call('EXPIRE', prefix .. ':idem:' .. state[3], ARGV[4])
+            end
+        else
+            ready(id)
+        end
+    end
+    local top = redis.call('ZPOPMIN', KEYS[1])
+    if #top == 0 then
+        return false
+    end
+    local id = top[1]
+    local key = prefix .. ':job:' .. id
+    redis.call('ZADD', KEYS[3], now + tonumber(ARGV[2]), id)
+    redis.call('HINCRBY', key, 'attempts', 1)
+    redis.call('HSET', key, 'status', 'running', 'started_at', now, 'lease_token', ARGV[6])
+    return redis.call('HGETALL', key)
+    """
+
+    # KEYS: running, delayed, job
+    # ARGV: id, lease token, status, run_at, result ttl, idempotency pointer or '',
+    #       uncount attempt ('1' / '0'), then field / value pairs
+    FINISH_LUA = """
+    -- only the holder of the current lease may record the outcome
+    if redis.call('HGET', KEYS[3], 'lease_token') ~= ARGV[2] then
+        return 0
+    end
+    if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+        return 0
+    end
+    if ARGV[7] == '1' then
+        redis.call('HINCRBY', KEYS[3], 'attempts', -1)
+    end
+    redis.call('HSET', KEYS[3], 'lease_token', '', unpack(ARGV, 8))
+    if ARGV[3] == 'queued' then
+        redis.call('ZADD', KEYS[2], ARGV[4], ARGV[1])
+    else
+        redis.call('EXPIRE', KEYS[3], ARGV[5])
+        if ARGV[6] ~= '' then
+            redis.call('EXPIRE', ARGV[6], ARGV[5])
+        end
+    end
+    return 1
+    """
+
+    _INT_FIELDS = ("priority", "attempts", "max_attempts")
+    _FLOAT_FIELDS = ("enqueued_at", "run_at", "started_at", "finished_at")
+    _JSON_FIELDS = ("args", "kwargs", "result")
+
+    def __init__(self, redis, prefix: str = "jobs", result_ttl: float = 3600):
+        self.redis = redis
+        self.prefix = prefix
+        self.result_ttl = int(result_ttl)
+        self._ready = f"{prefix}:ready"
+        self._delayed = f"{prefix}:delayed"
+        self._running = f"{prefix}:running"
+        self._enqueue = redis.register_script(self.ENQUEUE_LUA)
+        self._claim = redis.register_script(self.CLAIM_LUA)
+        self._finish = redis.register_script(self.FINISH_LUA)
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def _idem_key(self, key: str) -> str:
+        return f"{self.prefix}:idem:{key}"
+
+    def _encode(self, fields: Dict[str, Any]) -> list:
+        pairs = []
+        for name, value in fields.items():
+            if name in self._JSON_FIELDS:
+                value = dumps(value)
+            elif value is None:
+                value = ""  # hash fields cannot hold None
+            pairs += [name, value]
+        return pairs
+
+    def _decode(self, raw: Dict[bytes, bytes]) -> Dict[str, Any]:
+        job: Dict[str, Any] = {}
+        for name, value in raw.items():
+            name = name.decode()
+            value = value.decode()
+            if name in self._JSON_FIELDS:
+                job[name] = loads(value)
+            elif value == "":
+                job[name] = None
+            elif name in self._INT_FIELDS:
+                job[name] = int(value)
+            elif name in self._FLOAT_FIELDS:
+                job[name] = float(value)
+            else:
+                job[name] = value
+        return job
+
+    async def enqueue(self, job):
+        key = job["idempotency_key"]
+        score = -job["priority"] * self.PRIORITY_WEIGHT + job["enqueued_at"]
+        job_id = await self._enqueue(
+            keys=[self._job_key(job["id"]), self._ready, self._delayed, self._idem_key(key or "")],
+            args=[job["id"], "1" if key is not None else "0", job["enqueued_at"], job["run_at"], score,
+                  *self._encode(job)],
+        )
+        job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
+        if job_id == job["id"]:
+            return job
+        existing = await self.get(job_id)
+        # the pointer outlived its job by a moment: the key is free again
+        return existing if existing is not None else job
+
+    async def claim(self, lease):
+        raw = await self._claim(
+            keys=[self._ready, self._delayed, self._running],
+            args=[time.time(), lease, self.prefix, self.result_ttl, self.PRIORITY_WEIGHT, uuid.uuid4().hex],
+        )
+        if not raw:
+            return None
+        return self._decode(dict(zip(raw[::2], raw[1::2])))
+
+    async def _finish_job(self, job_id: str, lease_token: str, status: str, fields: Dict[str, Any],
+                          run_at: float = 0, count_attempt: bool = True) -> None:
+        job_key = self._job_key(job_id)
+        key = await self.redis.hget(job_key, "idempotency_key")
+        pointer = self._idem_key(key.decode()) if key else ""
+        await self._finish(
+            keys=[self._running, self._delayed, job_key],
+            args=[job_id, lease_token, status, run_at, self.result_ttl, pointer, "0" if count_attempt else "1",
+                  *self._encode({"status": status, **fields})],
+        )
+
+    async def complete(self, job_id, lease_token, result):
+        await self._finish_job(job_id, lease_token, SUCCEEDED,
+                               {"result": result, "error": None, "finished_at": time.time()})
+
+    async def retry(self, job_id, lease_token, error, run_at, count_attempt=True):
+        await self._finish_job(job_id, lease_token, QUEUED, {"error": error, "run_at": run_at}, run_at=run_at,
+                               count_attempt=count_attempt)
+
+    async def fail(self, job_id, lease_token, error):
+        await self._finish_job(job_id, lease_token, FAILED, {"error": error, "finished_at": time.time()})
+
+    async def get(self, job_id):
+        raw = await self.redis.hgetall(self._job_key(job_id))
+        return self._decode(raw) if raw else None
+
+    async def counts(self):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zcard(self._ready)
+            pipe.zcard(self._delayed)
+            pipe.zcard(self._running)
+            ready, delayed, running = await pipe.execute()
+        return {"queued": ready + delayed, "running": running}
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class JobQueue:
+    """Handler registry and producer side of the queue."""
+
+    def __init__(self, store: BaseJobStore, max_attempts: int = 3):
+        self.store = store
+        self.max_attempts = max_attempts
+        self.handlers: Dict[str, Handler] = {}
+        self._wakeup = asyncio.Event()  # lets an in-process pool pick new jobs up at once
+
+    def task(self, fn: Optional[Handler] = None, *, name: Optional[str] = None):
+        """Register a coroutine function as a job handler, under `name` or its own name."""
+        def register(handler: Handler) -> Handler:
+            if not asyncio.iscoroutinefunction(handler):
+                raise TypeError(f"Job handler {handler.__name__} must be an async function")
+            self.handlers[name or handler.__name__] = handler
+            return handler
+
+        return register(fn) if fn is not None else register
+
+    async def enqueue(
+        self,
+        task: Union[str, Handler],
+        *args,
+        priority: int = 0,
+        delay: float = 0,
+        idempotency_key: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Queue a run of `task` (a registered handler or its name) and return the job
+        record. Higher `priority` runs first; `delay` postpones the first run.
+        """
+        name = task if isinstance(task, str) else task.__name__
+        if name not in self.handlers:
+            raise ValueError(f"No job handler registered as '{name}'")
+        job = _new_job(name, list(args), kwargs, priority, time.time() + delay, idempotency_key,
+                       max_attempts or self.max_attempts)
+        job = await self.store.enqueue(job)
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.store.get(job_id)
+
+
+class WorkerPool:
+    """
+    Runs queued jobs, at most `concurrency` at a time. One dispatcher claims a job
+    whenever a slot is free and sleeps `poll_interval` when the queue is empty (or
+    until a job is enqueued by this process). Failed runs are retried after
+    `backoff_delay(attempt, base_delay, max_delay)`; runs longer than `timeout`
+    are cancelled and count as failed.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int = 4,
+        poll_interval: float = 0.5,
+        timeout: float = 300,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self._store_down = False
+        # outcomes, for introspection
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+    async def stop(self, grace: float = 10) -> None:
+        """Stop claiming, give running jobs `grace` seconds, then hand the rest back to the queue."""
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        self._dispatcher = None
+        if self._running:
+            _, pending = await asyncio.wait(self._running, timeout=grace)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+    async def _dispatch(self) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            await slots.acquire()
+            self.queue._wakeup.clear()
+            job = await self._claim()
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(self.queue._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.ensure_future(self._run(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        try:
+            job = await self.queue.store.claim(self.timeout + _LEASE_MARGIN)
+        except Exception as e:
+            if not self._store_down:
+                self._store_down = True
+                logging.error("[Jobs] job store unavailable: %s", e)
+            return None
+        if self._store_down:
+            self._store_down = False
+            logging.warning("[Jobs] job store available again")
+        return job
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        store = self.queue.store
+        name = job["name"]
+        lease_token = job["lease_token"]
+        handler = self.queue.handlers.get(name)
+        try:
+            if handler is None:
+                self.failed += 1
+                JOBS.labels(name, FAILED).inc()
+                logging.error("[Jobs] no handler registered as '%s', job %s failed", name, job["id"])
+                await store.fail(job["id"], lease_token, f"No job handler registered as '{name}'")
+                return
+
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(handler(*job["args"], **job["kwargs"]), self.timeout)
+            except asyncio.CancelledError:
+                # pool shutdown: the next worker runs it again, without using up an attempt
+                await store.retry(job["id"], lease_token, "interrupted by shutdown", time.time(), count_attempt=False)
+                raise
+            except Exception as e:
+                JOB_DURATION.labels(name).observe(time.perf_counter() - start)
+                error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                if job["attempts"] < job["max_attempts"]:
+                    delay = backoff_delay(job["attempts"] - 1, self.base_delay, self.max_delay)
+                    self.retried += 1
+                    JOBS.labels(name, "retried").inc()
+                    logging.warning("[Jobs] %s %s failed (%s), attempt %d/%d, retrying in %.3fs",
+                                    name, job["id"], error, job["attempts"], job["max_attempts"], delay)
+                    await store.retry(job["id"], lease_token, error, time.time() + delay)
+                else:
+                    self.failed += 1
+                    JOBS.labels(name, FAILED).inc()
+                    logging.error("[Jobs] %s %s failed after %d attempts: %s", name, job["id"], job["attempts"], error)
+                    await store.fail(job["id"], lease_token, error)
+                return
+
+            JOB_DURATION.labels(name).observe(time.perf_counter() - start)
+            self.succeeded += 1
+            JOBS.labels(name, SUCCEEDED).inc()
+            try:
+                result = loads(dumps(result))
+            except TypeError:
+                result = repr(result)
+            await store.complete(job["id"], lease_token, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # the outcome could not be recorded: the job runs again once its lease expires
+            logging.error("[Jobs] could not record the outcome of %s %s: %s", name, job["id"], e)
+
+    # expose for introspection
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._dispatcher is not None,
+            "concurrency": self.concurrency,
+            "in_progress": len(self._running),
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
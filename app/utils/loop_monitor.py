@@ -0,0 +1,185 @@
+# app/utils/loop_monitor.py
+"""
+Event loop lag monitor and blocking-call watchdog.
+
+A heartbeat coroutine sleeps `interval` seconds over and over; how much later
+than asked it wakes up is the loop lag, i.e. how long every other ready
+coroutine (every in-flight request) had to wait at that moment. Lag samples feed
+the `event_loop_lag_seconds` histogram and p50 / p90 / p99 / max gauges over the
+last minute (`/metrics`).
+
+A watchdog thread checks the heartbeat. When it is more than `threshold` late,
+something is holding the loop: the watchdog reads the loop thread's stack at that
+moment (the blocking call itself), logs it once per stall, counts it in
+`event_loop_stalls_total` and keeps the last few stalls for `GET /ops/loop`. When
+the loop comes back, the stall's total duration is filled in.
+
+Usage
+-----
+from app.utils.loop_monitor import loop_monitor, start_loop_monitor, stop_loop_monitor
+
+await start_loop_monitor()   # app lifespan
+...
+await stop_loop_monitor()
+
+loop_monitor.stats()         # lag percentiles, stall count
+
+Env Vars
+--------
+LOOP_MONITOR_ENABLED      : "true" / "false" (default "true")
+LOOP_MONITOR_INTERVAL_MS  : heartbeat interval (default 100)
+LOOP_STALL_THRESHOLD_MS   : lag that counts as a stall and captures a stack (default 200)
+LOOP_STALL_MAX_CAPTURES   : stalls kept for /ops/loop (default 20)
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.settings.config import config
+from app.utils.metrics import Counter, Gauge, Histogram, register_collector
+from app.utils.profiler import stack_of
+
+# ─────────────────── configuration ─────────────────────────────────────────
+
+_ENABLED = str(config.LOOP_MONITOR_ENABLED).lower() in ("true", "1", "yes")
+_INTERVAL = int(config.LOOP_MONITOR_INTERVAL_MS) / 1000
+_THRESHOLD = int(config.LOOP_STALL_THRESHOLD_MS) / 1000
+_MAX_CAPTURES = int(config.LOOP_STALL_MAX_CAPTURES)
+
+_WINDOW_SECONDS = 60
+_QUANTILES = (("0.5", 0.5), ("0.9", 0.9), ("0.99", 0.99), ("1", 1.0))
+
+LAG = Histogram("event_loop_lag_seconds", "Event loop lag: how late the loop ran a ready callback.",
+                buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+LAG_QUANTILES = Gauge("event_loop_lag_quantile_seconds", "Event loop lag quantiles over the last minute (max over workers).",
+                      ("quantile",), mode="max")
+STALLS = Counter("event_loop_stalls_total", "Times the event loop was blocked for longer than LOOP_STALL_THRESHOLD_MS.")
+
+
+class LoopMonitor:
+    def __init__(self, interval: float, threshold: float, max_captures: int):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=max_captures)
+        self._lags: Deque[float] = deque(maxlen=max(1, int(_WINDOW_SECONDS / interval)))
+        self._beat = 0.0
+        self._stall: Optional[Dict[str, Any]] = None  # open stall, closed by the next beat
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread = 0
+        self.stall_count = 0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.ensure_future(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # ------------------------------------------------------------ internals
+    async def _heartbeat(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - started - self.interval)
+            self._beat = now
+            self._lags.append(lag)
+            LAG.labels().observe(lag)
+            stall = self._stall
+            if stall is not None:
+                stall["blocked_ms"] = round(lag * 1000, 3)
+                self._stall = None
+
+    def _watch(self) -> None:
+        # runs in its own thread: it keeps working while the loop is blocked
+        reported = 0.0
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._beat
+            late = time.monotonic() - beat - self.interval
+            if late <= self.threshold or beat == reported:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            reported = beat
+            self._record(late, frame)
+
+    def _record(self, late: float, frame) -> None:
+        stall = {
+            "at": time.time(),
+            "blocked_ms": None,  # set when the loop runs again
+            "detected_after_ms": round(late * 1000, 3),
+            "stack": stack_of(frame),
+        }
+        self.stalls.append(stall)
+        self._stall = stall
+        # metrics are written from the loop thread only, see `_collect_lag`
+        self.stall_count += 1
+        logging.warning("[LoopMonitor] event loop blocked for %.0fms, in:\n%s",
+                        late * 1000, "".join(traceback.format_stack(frame)).rstrip())
+
+    def quantiles(self) -> Dict[str, float]:
+        lags = sorted(self._lags)
+        if not lags:
+            return {name: 0.0 for name, _ in _QUANTILES}
+        return {name: lags[min(len(lags) - 1, int(q * len(lags)))] for name, q in _QUANTILES}
+
+    # expose for introspection
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "stall_threshold_ms": self.threshold * 1000,
+            "lag_ms": {name: round(value * 1000, 3) for name, value in self.quantiles().items()},
+            "stalls": self.stall_count,
+        }
+
+    def recent_stalls(self) -> List[Dict[str, Any]]:
+        return list(reversed(self.stalls))
+
+
+def _collect_lag() -> None:
+    for name, value in loop_monitor.quantiles().items():
+        LAG_QUANTILES.labels(name).set(value)
+    STALLS.labels().set(loop_monitor.stall_count)
+
+
+loop_monitor = LoopMonitor(_INTERVAL, _THRESHOLD, _MAX_CAPTURES)
+_collector_registered = False
+
+
+async def start_loop_monitor() -> None:
+    """Start the heartbeat and the watchdog (called from the app lifespan; no-op when disabled)."""
+    global _collector_registered
+    if not _ENABLED:
+        return
+    if not _collector_registered:
+        register_collector(_collect_lag)
+        _collector_registered = True
+    await loop_monitor.start()
+
+
+async def stop_loop_monitor() -> None:
+    await loop_monitor.stop()
@@ -0,0 +1,424 @@
+# app/utils/metrics.py
+"""
+Low-overhead metrics with a Prometheus text exposition, aggregated across workers.
+
+Counters, gauges and fixed-bucket histograms. A labelled child is resolved once
+and cached, and each of its samples owns a slot in a per-worker value store, so
+an update is a list index and, in multiprocess mode, one `struct.pack_into` into
+a memory-mapped file. Nothing takes a lock: every worker only ever writes its own
+slots, from its event loop thread.
+
+Multiprocess mode (METRICS_MULTIPROC_DIR set) gives every worker a file
+`metrics_<pid>.db` in that directory. `render()` reads all of them, so whichever
+worker serves `/metrics` reports the whole host:
+
+- counters and histograms are summed over every file, including workers that
+  have exited (their requests still happened)
+- gauges are summed (`mode="sum"`) or maxed (`mode="max"`) over live workers only
+
+Use a directory that is emptied when the service (re)starts, e.g. a tmpfs or an
+`emptyDir` volume. Without METRICS_MULTIPROC_DIR each worker reports only itself.
+
+Values that subsystems already count (cache hits, pool usage, breaker states)
+are mirrored by collectors: `register_collector(fn)` runs `fn` before every
+render and, in multiprocess mode, every METRICS_COLLECT_INTERVAL_SECONDS in
+every worker (`start_metrics()`), so the files stay fresh.
+
+Usage
+-----
+from app.utils.metrics import Counter, Gauge, Histogram, render
+
+REQUESTS = Counter("http_requests_total", "HTTP requests", ("method", "route", "status"))
+REQUESTS.labels("GET", "/health", "200").inc()
+
+LATENCY = Histogram("http_request_duration_seconds", "Request latency", ("method", "route"))
+LATENCY.labels("GET", "/health").observe(0.003)
+
+body = render()  # Prometheus text format 0.0.4
+
+Env Vars
+--------
+METRICS_ENABLED                  : "true" / "false", per-request HTTP metrics (default "true")
+METRICS_MULTIPROC_DIR            : directory shared by the workers of one host, "" = per worker (default "")
+METRICS_COLLECT_INTERVAL_SECONDS : how often each worker refreshes collected values (default 5)
+METRICS_LATENCY_BUCKETS          : comma-separated histogram buckets in seconds
+                                   (default "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10")
+"""
+
+import asyncio
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.settings.config import config
+
+# ─────────────────── configuration ─────────────────────────────────────────
+
+_DIR = str(config.METRICS_MULTIPROC_DIR)
+_COLLECT_INTERVAL = float(config.METRICS_COLLECT_INTERVAL_SECONDS)
+DEFAULT_BUCKETS = tuple(float(b) for b in str(config.METRICS_LATENCY_BUCKETS).split(",") if b.strip())
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_FILE_PATTERN = re.compile(r"^metrics_(\d+)\.db$")
+_USED = struct.Struct("<I")     # file header: bytes in use
+_KEY_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+
+
+# ─────────────────── value stores ──────────────────────────────────────────
+class _MemoryStore:
+    """This worker's values, one slot per sample key."""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.values: List[float] = []
+
+    def slot(self, key: str) -> int:
+        self.keys.append(key)
+        self.values.append(0.0)
+        return len(self.values) - 1
+
+    def add(self, slot: int, amount: float) -> None:
+        self.values[slot] += amount
+
+    def set(self, slot: int, value: float) -> None:
+        self.values[slot] = value
+
+    def read(self) -> Dict[int, Dict[str, float]]:
+        """Values of every worker that wrote to this store, keyed by pid."""
+        return {os.getpid(): dict(zip(self.keys, self.values))}
+
+
+class _FileStore(_MemoryStore):
+    """
+    `_MemoryStore` written through to `<directory>/metrics_<pid>.db`.
+
+    Layout: a uint32 count of bytes in use, then entries of
+    [uint32 key length][key, padded so the value is 8-byte aligned][float64 value].
+    An entry is complete before the count is raised, so readers never see half of one.
+    """
+
+    def __init__(self, directory: str, initial_size: int = 64 * 1024):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"metrics_{os.getpid()}.db")
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        self._size = initial_size
+        os.ftruncate(self._fd, self._size)
+        self._mm = mmap.mmap(self._fd, self._size)
+        self._used = 8
+        self._offsets: List[int] = []
+        _USED.pack_into(self._mm, 0, self._used)
+
+    def slot(self, key: str) -> int:
+        index = super().slot(key)
+        encoded = key.encode()
+        padded = len(encoded) + (-(_KEY_LENGTH.size + len(encoded)) % 8)
+        entry = _KEY_LENGTH.size + padded + _VALUE.size
+        while self._used + entry > self._size:
+            self._grow()
+        position = self._used
+        _KEY_LENGTH.pack_into(self._mm, position, len(encoded))
+        self._mm[position + 4:position + 4 + len(encoded)] = encoded
+        offset = position + _KEY_LENGTH.size + padded
+        _VALUE.pack_into(self._mm, offset, 0.0)
+        self._offsets.append(offset)
+        self._used += entry
+        _USED.pack_into(self._mm, 0, self._used)
+        return index
+
+    def add(self, slot: int, amount: float) -> None:
+        value = self.values[slot] + amount
+        self.values[slot] = value
+        _VALUE.pack_into(self._mm, self._offsets[slot], value)
+
+    def set(self, slot: int, value: float) -> None:
+        self.values[slot] = value
+        _VALUE.pack_into(self._mm, self._offsets[slot], value)
+
+    def _grow(self) -> None:
+        self._size *= 2
+        os.ftruncate(self._fd, self._size)
+        self._mm.close()
+        self._mm = mmap.mmap(self._fd, self._size)
+
+    def read(self) -> Dict[int, Dict[str, float]]:
+        workers = {}
+        for name in os.listdir(self.directory):
+            match = _FILE_PATTERN.match(name)
+            if match is None:
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            workers[int(match.group(1))] = _parse(data)
+        return workers
+
+
+def _parse(data: bytes) -> Dict[str, float]:
+    values = {}
+    if len(data) < 8:
+        return values
+    used = min(_USED.unpack_from(data, 0)[0], len(data))
+    position = 8
+    while position + _KEY_LENGTH.size <= used:
+        length = _KEY_LENGTH.unpack_from(data, position)[0]
+        padded = length + (-(_KEY_LENGTH.size + length) % 8)
+        offset = position + _KEY_LENGTH.size + padded
+        if offset + _VALUE.size > used:
+            break
+        values[data[position + 4:position + 4 + length].decode()] = _VALUE.unpack_from(data, offset)[0]
+        position = offset + _VALUE.size
+    return values
+
+
+_store: Optional[_MemoryStore] = None
+
+
+def _get_store() -> _MemoryStore:
+    global _store
+    if _store is None:
+        _store = _FileStore(_DIR) if _DIR else _MemoryStore()
+    return _store
+
+
+def _key(name: str, suffix: str, labels: Sequence[Tuple[str, str]]) -> str:
+    return json.dumps([name, suffix, list(labels)], separators=(",", ":"))
+
+
+# ─────────────────── metric types ──────────────────────────────────────────
+class _Value:
+    __slots__ = ("_store", "_slot")
+
+    def __init__(self, store: _MemoryStore, slot: int):
+        self._store = store
+        self._slot = slot
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._store.add(self._slot, amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._store.add(self._slot, -amount)
+
+    def set(self, value: float) -> None:
+        """Gauges; counters only to mirror a count kept elsewhere (collectors)."""
+        self._store.set(self._slot, value)
+
+
+class _HistogramValue:
+    __slots__ = ("_store", "_bounds", "_buckets", "_sum")
+
+    def __init__(self, store: _MemoryStore, bounds: Tuple[float, ...], buckets: List[int], sum_slot: int):
+        self._store = store
+        self._bounds = bounds
+        self._buckets = buckets
+        self._sum = sum_slot
+
+    def observe(self, value: float) -> None:
+        # buckets are stored per interval and made cumulative when rendered
+        self._store.add(self._buckets[bisect_left(self._bounds, value)], 1.0)
+        self._store.add(self._sum, value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        if name in _metrics:
+            raise ValueError(f"Metric '{name}' is already registered")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        _metrics[name] = self
+
+    def labels(self, *values):
+        """The child for these label values, in `labelnames` order (created once)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"Metric '{self.name}' expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._child(tuple(zip(self.labelnames, map(str, values))))
+        return child
+
+    def _child(self, labels: Tuple[Tuple[str, str], ...]):
+        store = _get_store()
+        return _Value(store, store.slot(_key(self.name, "", labels)))
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), mode: str = "sum"):
+        if mode not in ("sum", "max"):
+            raise ValueError("Gauge mode must be 'sum' or 'max'")
+        super().__init__(name, documentation, labelnames)
+        self.mode = mode
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(float(b) for b in buckets if not math.isinf(float(b))))
+
+    def _child(self, labels):
+        store = _get_store()
+        buckets = [store.slot(_key(self.name, "_bucket", labels + (("le", _format(bound)),)))
+                   for bound in self.bounds + (math.inf,)]
+        return _HistogramValue(store, self.bounds, buckets, store.slot(_key(self.name, "_sum", labels)))
+
+
+# ─────────────────── registry ──────────────────────────────────────────────
+_metrics: Dict[str, _Metric] = {}
+_collectors: List[Callable[[], None]] = []
+_collector_task: Optional[asyncio.Task] = None
+
+
+def _reset_after_fork() -> None:
+    # a forked worker writes its own file: drop the parent's store and every child bound to it
+    global _store, _collector_task
+    _store = None
+    _collector_task = None
+    for metric in _metrics.values():
+        metric._children.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def register_collector(collector: Callable[[], None]) -> None:
+    """Run `collector` (which sets metric values from existing stats) before each render."""
+    _collectors.append(collector)
+
+
+def collect() -> None:
+    for collector in _collectors:
+        try:
+            collector()
+        except Exception as e:
+            logging.warning("[Metrics] collector %s failed: %s", getattr(collector, "__name__", collector), e)
+
+
+async def start_metrics() -> None:
+    """In multiprocess mode, keep refreshing this worker's collected values (called from the app lifespan)."""
+    global _collector_task
+    if _DIR and _collectors and _collector_task is None:
+        _collector_task = asyncio.ensure_future(_collect_forever())
+
+
+async def stop_metrics() -> None:
+    global _collector_task
+    if _collector_task is not None:
+        _collector_task.cancel()
+        try:
+            await _collector_task
+        except asyncio.CancelledError:
+            pass
+        _collector_task = None
+
+
+async def _collect_forever() -> None:
+    while True:
+        collect()
+        await asyncio.sleep(_COLLECT_INTERVAL)
+
+
+# ─────────────────── exposition ────────────────────────────────────────────
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _aggregate() -> Dict[Tuple[str, str, Tuple[Tuple[str, str], ...]], float]:
+    samples: Dict[Tuple[str, str, Tuple[Tuple[str, str], ...]], float] = {}
+    for pid, values in _get_store().read().items():
+        alive = None
+        for key, value in values.items():
+            name, suffix, labels = json.loads(key)
+            metric = _metrics.get(name)
+            if metric is None:
+                continue  # written by a different version of the app
+            sample = (name, suffix, tuple(map(tuple, labels)))
+            if metric.kind == "gauge":
+                if alive is None:
+                    alive = _alive(pid)
+                if not alive:
+                    continue
+                if metric.mode == "max" and sample in samples:
+                    samples[sample] = max(samples[sample], value)
+                    continue
+            samples[sample] = samples.get(sample, 0.0) + value
+    return samples
+
+
+def render() -> str:
+    """Every registered metric in Prometheus text format, aggregated over all workers."""
+    collect()
+    samples = _aggregate()
+    by_name: Dict[str, List[Tuple[str, Tuple[Tuple[str, str], ...], float]]] = {}
+    for (name, suffix, labels), value in samples.items():
+        by_name.setdefault(name, []).append((suffix, labels, value))
+
+    lines = []
+    for metric in _metrics.values():
+        lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        entries = by_name.get(metric.name, [])
+        if metric.kind != "histogram":
+            for _, labels, value in sorted(entries):
+                lines.append(f"{metric.name}{_labels(labels)} {_format(value)}")
+            continue
+
+        values = {(suffix, labels): value for suffix, labels, value in entries}
+        for labels in sorted(labels for suffix, labels, _ in entries if suffix == "_sum"):
+            cumulative = 0.0
+            for bound in metric.bounds + (math.inf,):
+                le = _format(bound)
+                cumulative += values.get(("_bucket", labels + (("le", le),)), 0.0)
+                lines.append(f"{metric.name}_bucket{_labels(labels + (('le', le),))} {_format(cumulative)}")
+            lines.append(f"{metric.name}_sum{_labels(labels)} {_format(values[('_sum', labels)])}")
+            lines.append(f"{metric.name}_count{_labels(labels)} {_format(cumulative)}")
+    return "\n".join(lines) + "\n"
+
+
+def _format(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
@@ -0,0 +1,221 @@
+# app/utils/profiler.py
+"""
+Low-overhead sampling profiler for the running worker.
+
+A daemon thread wakes every `interval` seconds, reads the event loop thread's
+current stack with `sys._current_frames()` and counts it. Nothing is traced or
+instrumented, so the loop pays only for the GIL hand-offs (~1% CPU at 200 Hz),
+and only while something is being profiled: the thread exits once the last
+session or watched request is gone.
+
+Output is the "collapsed stack" format (`root;caller;leaf count`, one stack per
+line), which flamegraph.pl, speedscope and inferno read as is.
+
+Two kinds of consumers share the sampler:
+
+- sessions (`await profile(seconds)`): every sample of the loop thread (or of
+  every thread), idle time included
+- watched requests (`watch(task)`): only samples taken while the request's own
+  task is running on the loop are kept; samples taken while it is waiting on I/O
+  or on other tasks are counted as `<waiting>`. Work the request hands to other
+  tasks or threads is not attributed to it.
+
+Usage
+-----
+from app.utils.profiler import profile, watch, unwatch, collapsed
+
+stacks = await profile(10)          # Counter of collapsed stacks
+text = collapsed(stacks)
+
+watched = watch(asyncio.current_task())
+...
+unwatch(watched)
+text = collapsed(watched.stacks)
+
+Env Vars
+--------
+PROFILER_INTERVAL_MS : sampling interval (default 5)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Set
+
+from app.settings.config import config
+
+# ─────────────────── configuration ─────────────────────────────────────────
+
+_INTERVAL = int(config.PROFILER_INTERVAL_MS) / 1000
+
+WAITING = "<waiting>"
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_labels: Dict[tuple, str] = {}
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    key = (code, frame.f_lineno)
+    label = _labels.get(key)
+    if label is None:
+        filename = code.co_filename
+        for prefix in (_ROOT + os.sep, "site-packages" + os.sep):
+            index = filename.find(prefix)
+            if index >= 0:
+                filename = filename[index + len(prefix):]
+                break
+        else:
+            filename = os.path.basename(filename)
+        label = _labels[key] = f"{code.co_qualname} ({filename}:{frame.f_lineno})".replace(";", ":")
+    return label
+
+
+def stack_of(frame, prefix: str = "") -> str:
+    """Collapsed stack of `frame`, outermost call first."""
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    if prefix:
+        labels.append(prefix)
+    return ";".join(reversed(labels))
+
+
+def collapsed(stacks: Counter) -> str:
+    """`stack count` lines, most frequent first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+# ─────────────────── consumers ─────────────────────────────────────────────
+class Session:
+    def __init__(self, all_threads: bool = False):
+        self.all_threads = all_threads
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+
+class WatchedRequest:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+
+
+# ─────────────────── sampler ───────────────────────────────────────────────
+class Sampler:
+    """Samples one event loop's thread while there is at least one session or watched request."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._sessions: Set[Session] = set()
+        self._watched: Dict[asyncio.Task, WatchedRequest] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self.overhead = 0.0  # seconds spent taking samples
+
+    def add_session(self, session: Session) -> None:
+        with self._lock:
+            self._sessions.add(session)
+            self._ensure_thread()
+
+    def remove_session(self, session: Session) -> None:
+        with self._lock:
+            self._sessions.discard(session)
+
+    def watch(self, task: asyncio.Task) -> WatchedRequest:
+        watched = WatchedRequest(task)
+        with self._lock:
+            self._watched[task] = watched
+            self._ensure_thread()
+        return watched
+
+    def unwatch(self, watched: WatchedRequest) -> None:
+        with self._lock:
+            self._watched.pop(watched.task, None)
+
+    def _ensure_thread(self) -> None:
+        # called from the loop thread, with the lock held
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._sessions and not self._watched:
+                    self._thread = None
+                    return
+                sessions = list(self._sessions)
+                watched = list(self._watched.values())
+            started = time.perf_counter()
+            self._sample(sessions, watched)
+            self.overhead += time.perf_counter() - started
+            time.sleep(self.interval)
+
+    def _sample(self, sessions, watched) -> None:
+        frames = sys._current_frames()
+        frame = frames.get(self._loop_thread)
+        if frame is None:
+            return
+        stack = None
+        if watched:
+            # with an explicit loop this is safe to call from the sampler thread
+            running = asyncio.current_task(self._loop)
+            for request in watched:
+                request.samples += 1
+                if request.task is running:
+                    stack = stack or stack_of(frame)
+                    request.stacks[stack] += 1
+                else:
+                    request.stacks[WAITING] += 1
+        for session in sessions:
+            session.samples += 1
+            if not session.all_threads:
+                stack = stack or stack_of(frame)
+                session.stacks[stack] += 1
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, thread_frame in frames.items():
+                if ident != threading.get_ident():
+                    session.stacks[stack_of(thread_frame, prefix=names.get(ident, str(ident)))] += 1
+
+
+_sampler = Sampler(_INTERVAL)
+
+
+async def profile(seconds: float, all_threads: bool = False) -> Counter:
+    """Sample for `seconds` and return the collapsed stacks seen (the loop thread, or every thread)."""
+    session = Session(all_threads)
+    _sampler.add_session(session)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        _sampler.remove_session(session)
+    return session.stacks
+
+
+def watch(task: asyncio.Task) -> WatchedRequest:
+    """Start attributing samples to the request running in `task`."""
+    return _sampler.watch(task)
+
+
+def unwatch(watched: WatchedRequest) -> None:
+    _sampler.unwatch(watched)
+
+
+def sampler_stats() -> Dict[str, float]:
+    return {
+        "interval_ms": _sampler.interval * 1000,
+        "running": _sampler._thread is not None,
+        "watched_requests": len(_sampler._watched),
+        "overhead_seconds": round(_sampler.overhead, 4),
+    }
@@ -1,24 +1,41 @@
 from redis.asyncio import Redis
-from typing import Any
-import json
+from typing import Any, List, Optional
+import logging
+from app.utils.async_cache import AsyncCache
+from app.utils.codecs import CacheCodec, CodecError
 
-class AsyncRedisTTLCache:
+class AsyncRedisTTLCache(AsyncCache):
     """
-    Minimal TTL cache with the same async interface expected by
-    cachetools_async.cached().
-    Stores JSON-serialisable objects by default; you can swap to pickle.
+    Minimal TTL cache on Redis with the async interface of `AsyncCache`
+    (get / set / delete / get_or_set).
+    Values are serialised by a `CacheCodec` (msgpack by default, see app/utils/codecs.py),
+    so the Redis client must be created with `decode_responses=False`.
     """
-    def __init__(self, redis: Redis, ttl: int, prefix: str = "acache"):
+    def __init__(self, redis: Redis, ttl: int, prefix: str = "acache", codec: Optional[CacheCodec] = None, **kwargs):
+        super().__init__(ttl, **kwargs)
         self.r = redis
-        self.ttl = ttl
         self.prefix = prefix
+        self.codec = codec or CacheCodec()
 
     def _k(self, key: str) -> str:
         return f"{self.prefix}:{key}"
 
-    async def get(self, key: str) -> Any:
+    async def _load(self, key: str) -> Optional[List[Any]]:
         raw = await self.r.get(self._k(key))
-        return None if raw is None else json.loads(raw)
+        if raw is None:
+            return None
+        try:
+            envelope = self.codec.decode(raw)
+        except (CodecError, ValueError) as e:
+            # written by a codec this worker does not know: treat as a miss
+            logging.warning("[Cache] cannot decode '%s': %s", key, e)
+            return None
+        # bare values from before envelopes existed are a miss as well
+        return envelope if isinstance(envelope, list) and len(envelope) == 3 else None
 
-    async def set(self, key: str, value: Any) -> None:
-        await self.r.set(self._k(key), json.dumps(value), ex=self.ttl)
+    async def _store(self, key: str, envelope: List[Any], ttl: float) -> None:
+        await self.r.set(self._k(key), self.codec.encode(envelope), px=max(1, int(ttl * 1000)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.r.delete(*(self._k(key) for key in keys))
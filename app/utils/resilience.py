@@ -0,0 +1,131 @@
+# app/utils/resilience.py
+"""
+Timeouts, retries with jittered backoff, and one decorator combining them with
+a bulkhead and a circuit breaker.
+
+Usage
+-----
+from app.utils.resilience import policy, retry, timeout
+
+@policy(breaker="user-api", bulkhead="user-api", timeout=2.0, retries=2)
+async def fetch_user(user_id: str):
+    ...
+
+@retry(attempts=3, base_delay=0.05)
+@timeout(1.0)
+async def ping():
+    ...
+
+`policy` layers them as
+
+    retry → bulkhead → circuit breaker → timeout → call
+
+- a retry re-enters the bulkhead, so waiting for a backoff never holds a slot
+- bulkhead rejections are load on our side and do not count against the breaker
+- a timed out call is a breaker failure (and is retried)
+- rejections (`BulkheadFullError`, `CircuitBreakerError`) are raised at once and
+  never retried: they exist to fail fast
+"""
+
+import asyncio
+import logging
+import random
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+
+from app.utils.bulkhead import BulkheadFullError, bulkhead as get_bulkhead
+from app.utils.circuit_breaker import CircuitBreakerError, cb
+
+AsyncFn = Callable[..., Awaitable[Any]]
+
+# never retried: retrying a rejection only adds load to whatever rejected it
+_FAST_FAIL = (BulkheadFullError, CircuitBreakerError)
+
+
+def _check_async(fn: AsyncFn) -> None:
+    if not asyncio.iscoroutinefunction(fn):
+        raise TypeError("resilience decorators support async callables only")
+
+
+def timeout(seconds: float) -> Callable[[AsyncFn], AsyncFn]:
+    """Cancel the call after `seconds` and raise `asyncio.TimeoutError`."""
+
+    def decorator(fn: AsyncFn) -> AsyncFn:
+        _check_async(fn)
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await asyncio.wait_for(fn(*args, **kwargs), seconds)
+
+        return wrapper
+
+    return decorator
+
+
+_timeout = timeout  # `policy` has a parameter of the same name
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """'Full jitter' exponential backoff: uniform in [0, min(max_delay, base_delay * 2**attempt)]."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def retry(
+    attempts: int = 3,
+    base_delay: float = 0.1,
+    max_delay: float = 2.0,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+) -> Callable[[AsyncFn], AsyncFn]:
+    """Run up to `attempts` times, sleeping a jittered exponential backoff between tries."""
+
+    def decorator(fn: AsyncFn) -> AsyncFn:
+        _check_async(fn)
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return await fn(*args, **kwargs)
+                except _FAST_FAIL:
+                    raise
+                except retry_on as e:
+                    if attempt == attempts - 1:
+                        raise
+                    delay = backoff_delay(attempt, base_delay, max_delay)
+                    logging.warning("[Retry] %s failed (%r), attempt %d/%d, retrying in %.3fs",
+                                    fn.__name__, e, attempt + 1, attempts, delay)
+                    await asyncio.sleep(delay)
+
+        return wrapper
+
+    return decorator
+
+
+def policy(
+    *,
+    breaker: Optional[str] = None,
+    bulkhead: Optional[str] = None,
+    timeout: Optional[float] = None,
+    retries: int = 0,
+    base_delay: float = 0.1,
+    max_delay: float = 2.0,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+) -> Callable[[AsyncFn], AsyncFn]:
+    """
+    Wrap an async callable in any combination of a named bulkhead, a named circuit
+    breaker, a per-call timeout and `retries` extra attempts (see module docstring).
+    """
+    def decorator(fn: AsyncFn) -> AsyncFn:
+        _check_async(fn)
+        wrapped = fn
+        if timeout is not None:
+            wrapped = _timeout(timeout)(wrapped)
+        if breaker is not None:
+            wrapped = cb(breaker)(wrapped)
+        if bulkhead is not None:
+            wrapped = get_bulkhead(bulkhead)(wrapped)
+        if retries > 0:
+            wrapped = retry(retries + 1, base_delay, max_delay, retry_on)(wrapped)
+        return wrapped
+
+    return decorator
@@ -0,0 +1,206 @@
+# app/utils/route_cache.py
+"""
+FastAPI-aware route caching.
+
+Keys are built only from the endpoint parameters named in a key template, never
+from injected objects like the database handle. "Not found" results are cached
+for a short negative TTL, and write endpoints declare the keys / tags they
+invalidate, so reads can use long TTLs safely.
+
+Usage
+-----
+from app.settings.caching import cache
+from app.utils.route_cache import route_cache, invalidates
+
+@router.get("/api/user/{id}")
+@route_cache(cache, "user:{id}", tags=["users"])
+async def get_user(id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    ...
+
+@router.post("/api/user")
+@invalidates(cache, keys=["user:{user.id}"], tags=["users"])
+async def create_user(user: UserRequest, db: AsyncIOMotorDatabase = Depends(get_db)):
+    ...
+
+Key templates use `str.format` syntax over the endpoint's parameters, including
+attribute access on request bodies (`{user.id}`).
+
+With `etag=True` the response carries an ETag computed once when the value is
+cached, and a client sending a matching `If-None-Match` gets a 304 served from
+the cache alone (see app/utils/conditional.py).
+
+With `raw=True` the value is cached as its serialized JSON body and hits are
+sent as those bytes, with no decoding / re-encoding (and no `response_model`).
+Such endpoints can return Mongo documents as is (see app/utils/fast_json.py).
+
+Tags are generational: each tag has a version stored in the cache, and entries
+of routes that carry the tag remember the versions they were built with.
+Invalidating a tag bumps its version, so every older entry is recomputed on its
+next read.
+"""
+
+import inspect
+import string
+import uuid
+from functools import wraps
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from fastapi import HTTPException, Request, status
+
+from app.settings.config import config
+from app.utils.async_cache import AsyncCache
+from app.utils.conditional import conditional_response, etag_for
+from app.utils.fast_json import FastJSONResponse, dumps
+
+_NOT_FOUND = "__route_cache_not_found__"
+_REQUEST_PARAM = "route_cache_request"
+_TAG_TTL = 7 * 24 * 3600
+
+# every role a request can carry, so role-varying keys can be invalidated as a whole
+_ROLES = [None, "local-user"] + [role.strip() for role in str(config.ROLES).split(",")]
+
+
+def route_cache(
+    cache: AsyncCache,
+    key: str,
+    *,
+    ttl: Optional[int] = None,
+    negative_ttl: Optional[int] = None,
+    vary_on_role: bool = False,
+    tags: Sequence[str] = (),
+    etag: bool = False,
+    raw: bool = False,
+) -> Callable:
+    """
+    Cache a GET endpoint's result under `key` (a template over its parameters).
+    A 404 `HTTPException` is cached for `negative_ttl` seconds and re-raised on hits.
+    With `etag`, responses carry an ETag stored with the value and a matching
+    `If-None-Match` gets a 304 without running the endpoint. With `raw`, the serialized
+    body is cached and served as is.
+    """
+    negative_ttl = int(config.CACHING_NEGATIVE_EXPIRY_TIME_IN_SECONDS) if negative_ttl is None else negative_ttl
+
+    def ttl_for(record: dict) -> Optional[int]:
+        return negative_ttl if _is_not_found(record["value"]) else ttl
+
+    def decorator(fn: Callable) -> Callable:
+        signature = _checked_signature(fn, key)
+        wants_request = (vary_on_role or etag) and _REQUEST_PARAM not in signature.parameters
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.pop(_REQUEST_PARAM) if wants_request else kwargs.get(_REQUEST_PARAM)
+            bound = signature.bind_partial(*args, **kwargs)
+            cache_key = key.format(**bound.arguments)
+            if vary_on_role:
+                cache_key = _with_role(cache_key, getattr(request.state, "role", None))
+            versions = await _tag_versions(cache, tags) if tags else None
+
+            async def load():
+                try:
+                    value = await fn(*args, **kwargs)
+                except HTTPException as e:
+                    if e.status_code != status.HTTP_404_NOT_FOUND:
+                        raise
+                    return {"value": {_NOT_FOUND: e.detail}, "tags": versions, "etag": None}
+                if raw:
+                    value = dumps(value)
+                return {"value": value, "tags": versions, "etag": etag_for(value) if etag else None}
+
+            record = await cache.get_or_set(cache_key, load, ttl_for=ttl_for)
+            if record["tags"] != versions:
+                # built before one of its tags was invalidated
+                await cache.delete(cache_key)
+                record = await cache.get_or_set(cache_key, load, ttl_for=ttl_for)
+
+            value = record["value"]
+            if _is_not_found(value):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=value[_NOT_FOUND])
+            if etag:
+                return conditional_response(request, value, record["etag"])
+            if raw:
+                return FastJSONResponse(value)
+            return value
+
+        if wants_request:
+            wrapper.__signature__ = _with_request_param(signature)
+        return wrapper
+
+    return decorator
+
+
+def invalidates(cache: AsyncCache, *, keys: Iterable[str] = (), tags: Iterable[str] = ()) -> Callable:
+    """
+    After the endpoint succeeds, drop `keys` (templates over its parameters, all role
+    variants included) and bump the version of every tag in `tags`.
+    """
+    keys, tags = list(keys), list(tags)
+
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+        for template in keys:
+            _checked_signature(fn, template)
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            result = await fn(*args, **kwargs)
+            bound = signature.bind_partial(*args, **kwargs)
+            await invalidate(cache, *(template.format(**bound.arguments) for template in keys), tags=tags)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate(cache: AsyncCache, *keys: str, tags: Iterable[str] = ()) -> None:
+    """Drop `keys` (all role variants included) and bump the version of every tag in `tags`."""
+    stale = [_with_role(key, role) for key in keys for role in _ROLES]
+    await cache.delete(*dict.fromkeys(stale))
+    for tag in tags:
+        await cache.set(_tag_key(tag), uuid.uuid4().hex[:12], ttl=_TAG_TTL)
+
+
+# ─────────────────── helpers ───────────────────────────────────────────────
+def _checked_signature(fn: Callable, template: str) -> inspect.Signature:
+    signature = inspect.signature(fn)
+    for _, field, _, _ in string.Formatter().parse(template):
+        if field is None:
+            continue
+        root = field.split(".", 1)[0].split("[", 1)[0]
+        if root not in signature.parameters:
+            raise TypeError(f"Cache key '{template}' uses '{root}', which is not a parameter of {fn.__name__}")
+    return signature
+
+
+def _with_request_param(signature: inspect.Signature) -> inspect.Signature:
+    params = list(signature.parameters.values())
+    request = inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+    # keyword-only parameters must come before **kwargs
+    index = next((i for i, p in enumerate(params) if p.kind is inspect.Parameter.VAR_KEYWORD), len(params))
+    params.insert(index, request)
+    return signature.replace(parameters=params)
+
+
+def _with_role(key: str, role: Optional[str]) -> str:
+    return key if role is None else f"{key}|role={role}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
+async def _tag_versions(cache: AsyncCache, tags: Sequence[str]) -> str:
+    """Current version of every tag, created on first use."""
+    versions = []
+    for tag in tags:
+        version = await cache.get(_tag_key(tag))
+        if version is None:
+            version = uuid.uuid4().hex[:12]
+            await cache.set(_tag_key(tag), version, ttl=_TAG_TTL)
+        versions.append(version)
+    return ",".join(versions)
+
+
+def _is_not_found(value: Any) -> bool:
+    return isinstance(value, dict) and _NOT_FOUND in value
@@ -0,0 +1,121 @@
+# app/utils/tiered_cache.py
+"""
+Two-tier cache: a small per-worker L1 in front of a shared Redis L2.
+
+Reads try L1 first and only go to Redis on an L1 miss, filling L1 on the way
+back. Writes and deletes go to both tiers and are broadcast on a Redis pub/sub
+channel; every other worker drops the key from its L1, so the tiers stay
+coherent. Values a loader just computed (misses, stale refreshes) are stored
+in both tiers but not broadcast: they come from the source of truth, so other
+workers' copies are no more wrong than before, and a broadcast would evict
+them on every fill. L1 entries also expire after `l1_ttl`, which bounds
+staleness if an invalidation message is ever missed (the L1 is cleared on
+every resubscribe).
+
+Stampede protection (single-flight, stale-while-revalidate, early expiration)
+comes from `AsyncCache` and applies to the tiered cache as a whole.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+
+from redis.asyncio import Redis
+
+from app.utils.async_cache import AsyncCache, MemoryTTLCache
+from app.utils.codecs import CacheCodec
+from app.utils.redis_cache import AsyncRedisTTLCache
+
+
+class TieredCache(AsyncCache):
+    def __init__(
+        self,
+        redis: Redis,
+        ttl: int,
+        *,
+        l1_maxsize: int,
+        l1_ttl: int,
+        channel: str = "acache:invalidate",
+        codec: CacheCodec | None = None,
+        **kwargs,
+    ):
+        super().__init__(ttl, **kwargs)
+        self.l1 = MemoryTTLCache(maxsize=l1_maxsize, ttl=l1_ttl)
+        self.l2 = AsyncRedisTTLCache(redis, ttl=ttl, codec=codec)
+        self.l1_ttl = l1_ttl
+        self.redis = redis
+        self.channel = channel
+        self._origin = uuid.uuid4().hex
+        self._listener: asyncio.Task | None = None
+
+    # ------------------------------------------------------------ backend
+    async def _load(self, key):
+        self._ensure_listener()
+        envelope = await self.l1._load(key)
+        if envelope is not None:
+            return envelope
+        envelope = await self.l2._load(key)
+        if envelope is not None:
+            # never keep an L1 copy longer than the L2 entry would have lived
+            remaining = envelope[1] + self.stale_ttl - time.time()
+            if remaining > 0:
+                await self.l1._store(key, envelope, min(self.l1_ttl, remaining))
+        return envelope
+
+    async def _fill(self, key, envelope, ttl):
+        self._ensure_listener()
+        await self.l1._store(key, envelope, min(self.l1_ttl, ttl))
+        await self.l2._store(key, envelope, ttl)
+
+    async def _store(self, key, envelope, ttl):
+        await self._fill(key, envelope, ttl)
+        await self._publish(key)
+
+    async def delete(self, *keys):
+        if not keys:
+            return
+        self._ensure_listener()
+        await self.l1.delete(*keys)
+        await self.l2.delete(*keys)
+        for key in keys:
+            await self._publish(key)
+
+    # ------------------------------------------------------- invalidation
+    async def _publish(self, key: str) -> None:
+        await self.redis.publish(self.channel, f"{self._origin}:{key}")
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.ensure_future(self._listen())
+
+    async def _listen(self) -> None:
+        backoff = 0.1
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                # anything published while we were not subscribed is lost: start clean
+                self.l1.clear()
+                backoff = 0.1
+                async for message in pubsub.listen():
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    origin, _, key = data.partition(":")
+                    if origin != self._origin:
+                        await self.l1.delete(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning("[TieredCache] invalidation listener error, resubscribing: %s", e)
+                self.l1.clear()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+            finally:
+                await pubsub.aclose()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
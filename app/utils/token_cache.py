@@ -0,0 +1,94 @@
+# app/utils/token_cache.py
+"""
+Bounded in-process cache of already verified JWTs.
+
+Verifying an RS256 signature is by far the most expensive step of a request,
+and clients keep re-sending the same bearer token until it expires. Once a
+token has been verified we remember its decoded claims, keyed by a SHA-256
+digest of the token (the raw token is never stored), until the token's `exp`.
+
+Usage
+-----
+from app.utils.token_cache import TokenCache
+
+token_cache = TokenCache(maxsize=10000, max_ttl=300)
+
+claims = token_cache.get(token)
+if claims is None:
+    payload = decode(token, public_key, algorithms=["RS256"])
+    claims = {"role": payload.get("extension_Roles"), "user_id": payload.get("user_id")}
+    token_cache.set(token, claims, payload.get("exp"))
+
+Env Vars
+--------
+AUTH_TOKEN_CACHE_SIZE    : max number of cached tokens, 0 disables (default 10000)
+AUTH_TOKEN_CACHE_MAX_TTL : upper bound in seconds for a cache entry (default 300)
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class TokenCache:
+    def __init__(self, maxsize: int, max_ttl: int):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    # ------------------------------------------------------------------ api
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached claims of a verified token, or None."""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires, claims = entry
+        if time.time() >= expires:
+            # token expired since it was verified: force a real decode
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def set(self, token: str, claims: Dict[str, Any], exp: Optional[float]) -> None:
+        """Remember `claims` for `token` until `exp` (capped by `max_ttl`)."""
+        if self.maxsize <= 0:
+            return
+
+        now = time.time()
+        expires = now + self.max_ttl
+        if exp is not None:
+            expires = min(expires, float(exp))
+        if expires <= now:
+            return
+
+        key = self._key(token)
+        self._entries[key] = (expires, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    # expose for introspection
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
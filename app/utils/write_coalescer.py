@@ -0,0 +1,165 @@
+# app/utils/write_coalescer.py
+"""
+Group-commit write coalescing.
+
+Inserts are buffered for up to `window_ms` or `max_docs` documents and flushed
+as one unordered `insert_many`. Every caller still gets its own outcome: the
+inserted `_id`, or the exception of its own document (`DuplicateKeyError` for
+a duplicate key, `WriteError` otherwise), mapped back from the bulk write
+result by index. Throughput stops being "Mongo latency x pool size" at the cost
+of up to `window_ms` added latency per insert.
+
+Usage
+-----
+from app.utils.write_coalescer import collection_writer
+
+try:
+    inserted_id = await collection_writer(db.users).insert(doc)
+except DuplicateKeyError:
+    raise HTTPException(409, "User already exists")
+
+Env Vars
+--------
+WRITE_COALESCING_ENABLED       : opt-in switch for routes that support it (default false)
+WRITE_COALESCING_WINDOW_MS     : max time an insert waits for others (default 5)
+WRITE_COALESCING_MAX_DOCS      : a batch is flushed as soon as it holds this many documents (default 100)
+WRITE_COALESCING_WRITE_CONCERN : `w` of the batched writes, e.g. 1 or majority; empty keeps the client default
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteConcernError, WriteError
+from pymongo.write_concern import WriteConcern
+
+from app.settings.config import config
+
+_DUPLICATE_KEY = 11000
+
+
+class WriteCoalescer:
+    def __init__(self, collection: AsyncIOMotorCollection, *, window_ms: float = 5, max_docs: int = 100):
+        self.collection = collection
+        self.window = window_ms / 1000
+        self.max_docs = max_docs
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes = set()  # strong refs to running batches
+        # metrics
+        self.batches = 0
+        self.docs = 0
+        self.max_seen_batch = 0
+        self.total_latency = 0.0
+        self.errors = 0
+
+    # ------------------------------------------------------------------ api
+    async def insert(self, doc: Dict[str, Any]) -> Any:
+        """Insert `doc` with the next batch and return its `_id`; raises this document's own error."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((doc, future))
+        if len(self._pending) >= self.max_docs:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        # the batch is written whether or not this caller is still waiting
+        return await asyncio.shield(future)
+
+    # expose for introspection
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "docs": self.docs,
+            "pending": len(self._pending),
+            "avg_batch_size": round(self.docs / self.batches, 2) if self.batches else 0,
+            "max_batch_size": self.max_seen_batch,
+            "avg_latency_ms": round(self.total_latency / self.batches * 1000, 3) if self.batches else 0,
+            "errors": self.errors,
+        }
+
+    # ------------------------------------------------------------ internals
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        docs = [doc for doc, _ in batch]
+        failed: Dict[int, Exception] = {}
+        concern_error: Optional[Exception] = None
+        start = time.monotonic()
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = _write_error(error)
+            if e.details.get("writeConcernErrors"):
+                concern = e.details["writeConcernErrors"][0]
+                concern_error = WriteConcernError(concern.get("errmsg"), concern.get("code"), concern)
+        except Exception as e:
+            # nothing is known about individual documents: every caller gets the error
+            self.errors += 1
+            logging.warning("[WriteCoalescer] batch of %d documents failed: %s", len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.batches += 1
+            self.docs += len(batch)
+            self.max_seen_batch = max(self.max_seen_batch, len(batch))
+            self.total_latency += time.monotonic() - start
+
+        for index, (doc, future) in enumerate(batch):
+            if future.done():
+                continue
+            error = failed.get(index, concern_error)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(doc["_id"])
+
+
+def _write_error(error: Dict[str, Any]) -> Exception:
+    if error.get("code") == _DUPLICATE_KEY:
+        return DuplicateKeyError(error.get("errmsg"), error["code"], error)
+    return WriteError(error.get("errmsg"), error.get("code"), error)
+
+
+# ─────────────────── registry ──────────────────────────────────────────────
+_writers: Dict[str, WriteCoalescer] = {}
+
+
+def collection_writer(collection: AsyncIOMotorCollection) -> WriteCoalescer:
+    """The worker's write coalescer for `collection`, configured from WRITE_COALESCING_*."""
+    writer = _writers.get(collection.full_name)
+    if writer is None:
+        w = str(config.WRITE_COALESCING_WRITE_CONCERN or "")
+        if w:
+            collection = collection.with_options(write_concern=WriteConcern(w=int(w) if w.isdigit() else w))
+        writer = WriteCoalescer(
+            collection,
+            window_ms=float(config.WRITE_COALESCING_WINDOW_MS),
+            max_docs=int(config.WRITE_COALESCING_MAX_DOCS),
+        )
+        _writers[collection.full_name] = writer
+    return writer
+
+
+def reset_writers() -> None:
+    """Forget every collection writer: they are bound to a client (and loop) that is being closed."""
+    _writers.clear()
+
+
+def writer_stats() -> Dict[str, Dict[str, float]]:
+    """Metrics of every collection writer, keyed by collection name."""
+    return {name: writer.stats() for name, writer in _writers.items()}
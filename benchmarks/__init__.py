@@ -0,0 +1,16 @@
+"""
+Micro-benchmarks, run from the repository root: `python -m benchmarks.<name>`.
+
+Importing the package fills in placeholder values for the environment variables
+`Config` requires, so benchmarks run without a `.env` file.
+"""
+
+import os
+
+os.environ.setdefault("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_NAME", "bench")
+os.environ.setdefault("ROLES", "admin")
+os.environ.setdefault("ENVIRONMENT", "bench")
+os.environ.setdefault("NEW_RELIC_LICENSE_KEY", "bench")
+# fail fast when no MongoDB is reachable (startup warm-up, /ready)
+os.environ.setdefault("MONGODB_CONNECTION_TIMEOUT_MS", "200")
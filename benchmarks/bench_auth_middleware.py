@@ -0,0 +1,91 @@
+"""
+Requests/sec on `/health` with the auth middleware enabled.
+
+Compares the previous `BaseHTTPMiddleware` implementation (kept below as
+`LegacyTokenMiddleware`) with the pure ASGI `TokenMiddleware`. Requests are
+driven straight through the ASGI interface so the numbers only contain the
+framework + middleware cost, not a network stack.
+
+Run:
+    python -m benchmarks.bench_auth_middleware [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middlewares.auth import TokenMiddleware, config, string_to_list
+
+
+class LegacyTokenMiddleware(BaseHTTPMiddleware):
+    """The public-endpoint path of the original middleware, for comparison."""
+
+    async def dispatch(self, request: Request, call_next):
+        public_endpoints = string_to_list(config.public_endpoints)
+        if request.url.path in public_endpoints:
+            return await call_next(request)
+        return JSONResponse(status_code=401, content={"error": "Token is missing"})
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware)
+
+    @app.get("/health")
+    async def get_health():
+        return {"health": "Ok"}
+
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # warm up routing / dependency caches
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    before = asyncio.run(run(build_app(LegacyTokenMiddleware), args.requests))
+    after = asyncio.run(run(build_app(TokenMiddleware), args.requests))
+
+    print(f"BaseHTTPMiddleware : {before:10.0f} req/s")
+    print(f"pure ASGI          : {after:10.0f} req/s")
+    print(f"speedup            : {after / before:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Encode/decode time and bytes stored per cache codec.
+
+Values are realistic user documents as Motor returns them (ObjectId, naive UTC
+datetimes, Decimal128, nested address / preferences, a free-text bio), wrapped
+in the cache envelope `[value, expires_at, delta]` exactly like
+`AsyncRedisTTLCache` stores them. The `legacy json` row is the previous
+`json.dumps` path, which cannot round-trip the Mongo types at all (it needs
+`default=str` just to encode).
+
+Run:
+    python -m benchmarks.bench_codecs [--iterations 2000]
+"""
+
+import argparse
+import datetime
+import json
+import random
+import string
+import time
+
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+
+from app.utils.codecs import CODECS, COMPRESSIONS, CacheCodec
+
+
+def user_document(i: int, bio_words: int) -> dict:
+    rnd = random.Random(i)
+    word = lambda: "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 9)))  # noqa: E731
+    now = datetime.datetime(2026, 1, 1) + datetime.timedelta(seconds=rnd.randint(0, 10**7))
+    return {
+        "_id": ObjectId(),
+        "id": f"user-{i:08d}",
+        "name": f"{word().title()} {word().title()}",
+        "email": f"{word()}.{word()}@example.com",
+        "roles": ["user"] + (["admin"] if i % 10 == 0 else []),
+        "created_at": now,
+        "updated_at": now + datetime.timedelta(minutes=rnd.randint(0, 10**4)),
+        "balance": Decimal128(f"{rnd.randint(0, 10**6)}.{rnd.randint(0, 99):02d}"),
+        "address": {"street": f"{rnd.randint(1, 999)} {word().title()} St", "city": word().title(), "zip": f"{rnd.randint(10000, 99999)}"},
+        "preferences": {"newsletter": rnd.random() > 0.5, "theme": rnd.choice(["dark", "light"]), "language": "en"},
+        "login_count": rnd.randint(0, 5000),
+        "tags": [word() for _ in range(rnd.randint(0, 8))],
+        "bio": " ".join(word() for _ in range(bio_words)),
+    }
+
+
+def bench(encode, decode, values, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for value in values:
+            encode(value)
+    encode_us = (time.perf_counter() - start) / (iterations * len(values)) * 1e6
+
+    encoded = [encode(value) for value in values]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for data in encoded:
+            decode(data)
+    decode_us = (time.perf_counter() - start) / (iterations * len(values)) * 1e6
+
+    return encode_us, decode_us, sum(len(data) for data in encoded) / len(encoded)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    for label, bio_words in (("small user document", 10), ("large user document", 400)):
+        values = [[user_document(i, bio_words), time.time() + 60, 0.002] for i in range(20)]
+        print(f"\n{label}")
+        print(f"{'codec':<22}{'encode µs':>12}{'decode µs':>12}{'bytes':>10}")
+
+        legacy = bench(lambda v: json.dumps(v, default=str), json.loads, values, args.iterations)
+        print(f"{'legacy json':<22}{legacy[0]:>12.1f}{legacy[1]:>12.1f}{legacy[2]:>10.0f}")
+
+        for codec in CODECS:
+            for compression in COMPRESSIONS:
+                cache_codec = CacheCodec(codec, compression, threshold=1024)
+                assert cache_codec.decode(cache_codec.encode(values[0])) == values[0]
+                result = bench(cache_codec.encode, cache_codec.decode, values, args.iterations)
+                name = f"{codec}+{compression}"
+                print(f"{name:<22}{result[0]:>12.1f}{result[1]:>12.1f}{result[2]:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
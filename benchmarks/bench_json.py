@@ -0,0 +1,78 @@
+"""
+Serialization time and memory per JSON response of a user document.
+
+Rows:
+  legacy jsonable_encoder : the previous path. `_id` (and Decimal128) patched with
+                            `str(...)` by hand, FastAPI's `jsonable_encoder`, then
+                            `JSONResponse` (stdlib json)
+  FastJSONResponse        : the document as Motor returns it, rendered by orjson
+  pre-serialized bytes    : a body cached by `route_cache(..., raw=True)`, sent as is
+
+Memory is the tracemalloc peak above the baseline while building one response,
+so it includes every temporary copy made on the way to the body bytes.
+
+Run:
+    python -m benchmarks.bench_json [--iterations 2000]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.bench_codecs import user_document
+from app.utils.fast_json import FastJSONResponse, dumps, orjson
+
+
+def legacy(doc):
+    doc = dict(doc, _id=str(doc["_id"]), balance=str(doc["balance"]))
+    return JSONResponse(jsonable_encoder(doc))
+
+
+def fast(doc):
+    return FastJSONResponse(doc)
+
+
+def bench(build, values, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for value in values:
+            build(value)
+    micros = (time.perf_counter() - start) / (iterations * len(values)) * 1e6
+
+    tracemalloc.start()
+    peaks = []
+    for value in values:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        response = build(value)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        del response
+    tracemalloc.stop()
+    return micros, sum(peaks) / len(peaks), len(build(values[0]).body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"serializer: {'orjson ' + orjson.__version__ if orjson is not None else 'stdlib json (orjson not installed)'}")
+    for label, bio_words in (("small user document", 10), ("large user document", 400)):
+        docs = [user_document(i, bio_words) for i in range(20)]
+        bodies = [dumps(doc) for doc in docs]
+        print(f"\n{label}")
+        print(f"{'path':<26}{'µs/response':>13}{'peak KiB':>11}{'bytes':>8}")
+        for name, build, values in (
+            ("legacy jsonable_encoder", legacy, docs),
+            ("FastJSONResponse", fast, docs),
+            ("pre-serialized bytes", fast, bodies),
+        ):
+            micros, peak, size = bench(build, values, args.iterations)
+            print(f"{name:<26}{micros:>13.1f}{peak / 1024:>11.1f}{size:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Logging cost per request, paid on the event loop thread.
+
+Compares the previous setup (a `RotatingFileHandler` and a `StreamHandler` on the
+root logger, written synchronously by the caller) with `setup_logging()`, where
+the caller only enqueues records and a background thread writes them.
+
+Each simulated request logs what the request path used to log (the token
+verification message at INFO) plus one formatted INFO line. With the new setup the
+token message is DEBUG and is skipped by the level check. Two console sinks are
+measured: a fast one, and a slow one (200µs per write, like a blocked stdout pipe
+or a busy disk) that shows how much a slow sink costs the caller. `dropped` counts
+records discarded because the queue was full (LOG_QUEUE_FULL_POLICY=drop).
+
+Run:
+    python -m benchmarks.bench_logging [--requests 20000]
+"""
+
+import argparse
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from app.settings import logging as app_logging
+
+auth_logger = logging.getLogger("app.middlewares.auth")
+
+
+class SlowStream(io.StringIO):
+    def write(self, s):
+        time.sleep(0.0002)
+        return len(s)
+
+
+def legacy_setup(log_file: str):
+    """The original handler setup: both handlers run on the caller's thread."""
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
+    file_handler = RotatingFileHandler(log_file)
+    file_handler.setLevel(logging.ERROR)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logging.root.addHandler(file_handler)
+    logging.root.addHandler(console_handler)
+    logging.root.setLevel(logging.INFO)
+
+
+def legacy_request(i: int):
+    logging.info(f"successfully verified token")
+    logging.info("GET /api/user/%s 200", i)
+
+
+def new_request(i: int):
+    auth_logger.debug("successfully verified token")
+    logging.info("GET /api/user/%s 200", i)
+
+
+def run(setup, request, stream, requests: int) -> float:
+    stderr, sys.stderr = sys.stderr, stream
+    try:
+        setup()
+    finally:
+        sys.stderr = stderr
+    start = time.perf_counter()
+    for i in range(requests):
+        request(i)
+    elapsed = time.perf_counter() - start
+    app_logging.stop_logging()
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
+        handler.close()
+    return elapsed / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    log_file = os.path.join(tempfile.mkdtemp(), "bench.log")
+    os.environ["LOG_FILE"] = log_file
+
+    print(f"{'setup':<34}{'console sink':<14}{'µs/request':>11}{'dropped':>9}")
+    for sink, stream_factory in (("fast", io.StringIO), ("slow 200µs", SlowStream)):
+        legacy = run(lambda: legacy_setup(log_file), legacy_request, stream_factory(), args.requests)
+        print(f"{'legacy (sync handlers)':<34}{sink:<14}{legacy:>11.2f}{'-':>9}")
+        for policy in ("drop", "block"):
+            os.environ["LOG_QUEUE_FULL_POLICY"] = policy
+            queued = run(app_logging.setup_logging, new_request, stream_factory(), args.requests)
+            dropped = app_logging.logging_stats()["dropped"]
+            print(f"{'setup_logging (queue, ' + policy + ')':<34}{sink:<14}{queued:>11.2f}{dropped:>9}")
+
+
+if __name__ == "__main__":
+    main()
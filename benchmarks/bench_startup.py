@@ -0,0 +1,101 @@
+"""
+Worker startup time: `import app`, lifespan startup, and time to the first served request.
+
+Every run is a fresh interpreter, like a new gunicorn worker or autoscaled pod.
+The child imports the app, runs its lifespan (logging, New Relic, Mongo warm-up
+and migrations) and serves one `GET /health` through the ASGI interface, with
+nothing else imported beforehand.
+
+Without a reachable MongoDB the warm-up fails after MONGODB_CONNECTION_TIMEOUT_MS
+(200ms by default here) and the app starts anyway, so the lifespan figure includes
+that timeout. Point MONGODB_CONNECTION_STRING at a real server for true numbers.
+
+The median time to the first request is checked against `--budget-ms`, and the
+exit status is 1 when it is over budget, so CI can catch startup regressions.
+
+Run:
+    python -m benchmarks.bench_startup [--runs 5] [--budget-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import time
+start = time.perf_counter()
+import asyncio
+import json
+from app import app
+imported = time.perf_counter()
+
+async def first_request():
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/health", "raw_path": b"/health", "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        served = time.perf_counter()
+    return started, served, statuses[0]
+
+started, served, status = asyncio.run(first_request())
+print(json.dumps({
+    "import": imported - start,
+    "lifespan": started - imported,
+    "first_request": served - start,
+    "status": status,
+}))
+"""
+
+
+def run_once(root: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=root, env=os.environ.copy(),
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_FILE", os.devnull)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = [run_once(root) for _ in range(args.runs)]
+    if any(sample["status"] != 200 for sample in samples):
+        print(f"first request failed: {[sample['status'] for sample in samples]}")
+        sys.exit(1)
+
+    print(f"{'phase':<22}{'median ms':>11}{'max ms':>10}")
+    for phase in ("import", "lifespan", "first_request"):
+        values = [sample[phase] * 1000 for sample in samples]
+        print(f"{phase:<22}{statistics.median(values):>11.1f}{max(values):>10.1f}")
+
+    median = statistics.median(sample["first_request"] * 1000 for sample in samples)
+    if median > args.budget_ms:
+        print(f"\nOVER BUDGET: first request after {median:.0f}ms > {args.budget_ms:.0f}ms")
+        sys.exit(1)
+    print(f"\nwithin budget: {median:.0f}ms <= {args.budget_ms:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()